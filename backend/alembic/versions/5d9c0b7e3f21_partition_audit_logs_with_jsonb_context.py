@@ -0,0 +1,116 @@
+"""Partition audit_logs by month and index context_data as JSONB
+
+Revision ID: 5d9c0b7e3f21
+Revises: e8a35c7f0b12
+Create Date: 2026-10-18 18:21:40.115374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9c0b7e3f21'
+down_revision: Union[str, Sequence[str], None] = 'e8a35c7f0b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created ahead of now; later ones are created by the
+# application workers (partition_keeper) and `python -m app.tasks.maintenance partitions`.
+PREMAKE_MONTHS = 3
+
+COLUMNS = (
+    'id, created_at, user_id, organization_id, action, resource_type, resource_id, '
+    'context_data, ip_address, user_agent, updated_at'
+)
+
+
+def _columns(created_at_nullable: bool, context_type) -> list:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=created_at_nullable),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('organization_id', sa.UUID(), nullable=True),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('resource_type', sa.String(length=50), nullable=False),
+        sa.Column('resource_id', sa.String(length=100), nullable=True),
+        sa.Column('context_data', context_type, nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=500), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('UPDATE audit_logs SET created_at = now() WHERE created_at IS NULL')
+    op.rename_table('audit_logs', 'audit_logs_old')
+    op.execute('ALTER TABLE audit_logs_old RENAME CONSTRAINT audit_logs_pkey TO audit_logs_old_pkey')
+
+    op.create_table('audit_logs',
+    *_columns(created_at_nullable=False, context_type=postgresql.JSONB(astext_type=sa.Text())),
+    sa.PrimaryKeyConstraint('id', 'created_at', name='audit_logs_pkey'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # One partition per month from the oldest existing event through PREMAKE_MONTHS ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            part_month date := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM audit_logs_old), now()) AT TIME ZONE 'utc')::date;
+            last_part_month date := (date_trunc('month', now() AT TIME ZONE 'utc') + interval '{PREMAKE_MONTHS} months')::date;
+        BEGIN
+            WHILE part_month <= last_part_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_p' || to_char(part_month, 'YYYYMM'),
+                    part_month::timestamp AT TIME ZONE 'utc',
+                    (part_month + interval '1 month')::timestamp AT TIME ZONE 'utc'
+                );
+                part_month := (part_month + interval '1 month')::date;
+            END LOOP;
+        END
+        $$;
+    """)
+
+    # Catches events for months whose partition was never created, instead of failing them
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+
+    op.execute(
+        f'INSERT INTO audit_logs ({COLUMNS}) '
+        f"SELECT {COLUMNS.replace('context_data', 'context_data::jsonb')} FROM audit_logs_old"
+    )
+    op.drop_table('audit_logs_old')
+
+    # Created on the parent after the copy, so every partition gets them in one build
+    op.create_index('idx_audit_logs_org_created_at', 'audit_logs', ['organization_id', 'created_at'], unique=False)
+    op.create_index('idx_audit_logs_user_action_created_at', 'audit_logs', ['user_id', 'action', 'created_at'], unique=False)
+    # jsonb_path_ops only supports containment (@>) but is smaller and faster than the default opclass
+    op.create_index('idx_audit_logs_context_data', 'audit_logs', ['context_data'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'context_data': 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('audit_logs', 'audit_logs_old')
+    op.execute('ALTER TABLE audit_logs_old RENAME CONSTRAINT audit_logs_pkey TO audit_logs_old_pkey')
+    op.drop_index('idx_audit_logs_context_data', table_name='audit_logs_old')
+    op.drop_index('idx_audit_logs_user_action_created_at', table_name='audit_logs_old')
+    op.drop_index('idx_audit_logs_org_created_at', table_name='audit_logs_old')
+
+    op.create_table('audit_logs',
+    *_columns(created_at_nullable=True, context_type=sa.JSON()),
+    sa.PrimaryKeyConstraint('id', name='audit_logs_pkey')
+    )
+    op.execute(
+        f'INSERT INTO audit_logs ({COLUMNS}) '
+        f"SELECT {COLUMNS.replace('context_data', 'context_data::json')} FROM audit_logs_old"
+    )
+    # Dropping the partitioned parent drops every partition with it
+    op.drop_table('audit_logs_old')
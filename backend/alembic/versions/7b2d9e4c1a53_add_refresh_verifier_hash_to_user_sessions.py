@@ -0,0 +1,30 @@
+"""Add refresh_verifier_hash to user_sessions
+
+Revision ID: 7b2d9e4c1a53
+Revises: 31fa4045ceda
+Create Date: 2026-10-18 09:12:04.318277
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d9e4c1a53'
+down_revision: Union[str, Sequence[str], None] = '31fa4045ceda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable and unindexed: rows with NULL still hold legacy opaque tokens,
+    # which keep working through refresh_token_hash until they are rotated.
+    op.add_column('user_sessions', sa.Column('refresh_verifier_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_sessions', 'refresh_verifier_hash')
@@ -0,0 +1,140 @@
+"""Partition user_sessions by month on created_at
+
+Revision ID: c4e1f8a2b6d9
+Revises: 7b2d9e4c1a53
+Create Date: 2026-10-18 14:37:51.904112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1f8a2b6d9'
+down_revision: Union[str, Sequence[str], None] = '7b2d9e4c1a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created ahead of now; later ones are created by the
+# application workers (partition_keeper) and `python -m app.tasks.maintenance partitions`.
+PREMAKE_MONTHS = 3
+
+COLUMNS = (
+    'id, created_at, user_id, session_id, refresh_token_hash, refresh_verifier_hash, '
+    'device_id, device_name, device_type, user_agent, ip_address, expires_at, '
+    'last_activity_at, status, revoked_at, revoked_reason, refresh_count, '
+    'max_refresh_count, updated_at'
+)
+
+INDEXES = (
+    ('idx_user_sessions_expires_at', ['expires_at']),
+    ('idx_user_sessions_session_id_status', ['session_id', 'status']),
+    ('idx_user_sessions_user_status', ['user_id', 'status']),
+    ('ix_user_sessions_device_id', ['device_id']),
+    ('ix_user_sessions_expires_at', ['expires_at']),
+    ('ix_user_sessions_refresh_token_hash', ['refresh_token_hash']),
+    ('ix_user_sessions_status', ['status']),
+    ('ix_user_sessions_user_id', ['user_id']),
+)
+
+
+def _columns(created_at_nullable: bool) -> list:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=created_at_nullable),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('session_id', sa.String(length=255), nullable=False),
+        sa.Column('refresh_token_hash', sa.String(length=255), nullable=False),
+        sa.Column('refresh_verifier_hash', sa.String(length=64), nullable=True),
+        sa.Column('device_id', sa.String(length=255), nullable=True),
+        sa.Column('device_name', sa.String(length=255), nullable=True),
+        sa.Column('device_type', sa.String(length=50), nullable=True),
+        sa.Column('user_agent', sa.Text(), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('last_activity_at', sa.DateTime(), nullable=False),
+        sa.Column('status', postgresql.ENUM('ACTIVE', 'EXPIRED', 'REVOKED', name='sessionstatus', create_type=False), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.Column('revoked_reason', sa.String(length=255), nullable=True),
+        sa.Column('refresh_count', sa.Integer(), nullable=False),
+        sa.Column('max_refresh_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    ]
+
+
+def _move_aside_unpartitioned() -> None:
+    """Rename the old table and free its index and constraint names."""
+    op.rename_table('user_sessions', 'user_sessions_old')
+    op.execute('ALTER TABLE user_sessions_old RENAME CONSTRAINT user_sessions_pkey TO user_sessions_old_pkey')
+    op.execute('ALTER TABLE user_sessions_old DROP CONSTRAINT IF EXISTS user_sessions_user_id_fkey')
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='user_sessions_old')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('UPDATE user_sessions SET created_at = now() WHERE created_at IS NULL')
+    op.drop_index('ix_user_sessions_session_id', table_name='user_sessions')
+    _move_aside_unpartitioned()
+
+    op.create_table('user_sessions',
+    *_columns(created_at_nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at', name='user_sessions_pkey'),
+    sa.UniqueConstraint('session_id', 'created_at', name='uq_user_sessions_session_id_created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # One partition per month from the oldest existing session through PREMAKE_MONTHS ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            part_month date := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM user_sessions_old), now()) AT TIME ZONE 'utc')::date;
+            last_part_month date := (date_trunc('month', now() AT TIME ZONE 'utc') + interval '{PREMAKE_MONTHS} months')::date;
+        BEGIN
+            WHILE part_month <= last_part_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF user_sessions FOR VALUES FROM (%L) TO (%L)',
+                    'user_sessions_p' || to_char(part_month, 'YYYYMM'),
+                    part_month::timestamp AT TIME ZONE 'utc',
+                    (part_month + interval '1 month')::timestamp AT TIME ZONE 'utc'
+                );
+                part_month := (part_month + interval '1 month')::date;
+            END LOOP;
+        END
+        $$;
+    """)
+
+    # Catches inserts for months whose partition was never created, instead of failing them
+    op.execute('CREATE TABLE user_sessions_default PARTITION OF user_sessions DEFAULT')
+
+    op.execute(f'INSERT INTO user_sessions ({COLUMNS}) SELECT {COLUMNS} FROM user_sessions_old')
+    op.drop_table('user_sessions_old')
+
+    # Created on the parent, so every partition (current and future) gets them
+    for name, columns in INDEXES:
+        op.create_index(name, 'user_sessions', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('user_sessions', 'user_sessions_old')
+    op.execute('ALTER TABLE user_sessions_old RENAME CONSTRAINT user_sessions_pkey TO user_sessions_old_pkey')
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='user_sessions_old')
+
+    op.create_table('user_sessions',
+    *_columns(created_at_nullable=True),
+    sa.PrimaryKeyConstraint('id', name='user_sessions_pkey')
+    )
+    op.execute(f'INSERT INTO user_sessions ({COLUMNS}) SELECT {COLUMNS} FROM user_sessions_old')
+    # Dropping the partitioned parent drops every partition with it
+    op.drop_table('user_sessions_old')
+
+    op.create_index(op.f('ix_user_sessions_session_id'), 'user_sessions', ['session_id'], unique=True)
+    for name, columns in INDEXES:
+        op.create_index(name, 'user_sessions', columns, unique=False)
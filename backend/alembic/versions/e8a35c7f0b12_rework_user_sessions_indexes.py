@@ -0,0 +1,78 @@
+"""Rework user_sessions indexes around the session service queries
+
+Revision ID: e8a35c7f0b12
+Revises: c4e1f8a2b6d9
+Create Date: 2026-10-18 16:05:22.571930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a35c7f0b12'
+down_revision: Union[str, Sequence[str], None] = 'c4e1f8a2b6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Duplicates (expires_at twice, session_id prefixes of the unique constraint),
+# indexes no query uses (device_id, status alone) and indexes on columns that
+# every refresh-token rotation rewrites (expires_at).
+DROPPED_INDEXES = (
+    ('idx_user_sessions_expires_at', ['expires_at']),
+    ('ix_user_sessions_expires_at', ['expires_at']),
+    ('idx_user_sessions_session_id_status', ['session_id', 'status']),
+    ('idx_user_sessions_user_status', ['user_id', 'status']),
+    ('ix_user_sessions_device_id', ['device_id']),
+    ('ix_user_sessions_status', ['status']),
+    ('ix_user_sessions_refresh_token_hash', ['refresh_token_hash']),
+)
+
+# Free space left on each page so rotations can stay HOT updates
+FILLFACTOR = 80
+
+
+def _set_partition_fillfactor(fillfactor: int) -> None:
+    op.execute(f"""
+        DO $$
+        DECLARE
+            partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'user_sessions'
+            LOOP
+                EXECUTE format('ALTER TABLE %I SET (fillfactor = {fillfactor})', partition_name);
+            END LOOP;
+        END
+        $$;
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, _ in DROPPED_INDEXES:
+        op.drop_index(name, table_name='user_sessions')
+
+    op.create_index('idx_user_sessions_active_user', 'user_sessions', ['user_id'], unique=False,
+                    postgresql_where=sa.text("status = 'ACTIVE'"))
+    op.create_index('idx_user_sessions_active_refresh_token_hash', 'user_sessions', ['refresh_token_hash'], unique=False,
+                    postgresql_where=sa.text("status = 'ACTIVE'"))
+
+    # Only affects newly written pages; existing ones gain headroom as they are rewritten
+    _set_partition_fillfactor(FILLFACTOR)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_partition_fillfactor(100)
+
+    op.drop_index('idx_user_sessions_active_refresh_token_hash', table_name='user_sessions')
+    op.drop_index('idx_user_sessions_active_user', table_name='user_sessions')
+
+    for name, columns in DROPPED_INDEXES:
+        op.create_index(name, 'user_sessions', columns, unique=False)
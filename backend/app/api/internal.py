@@ -0,0 +1,62 @@
+"""
+Internal operational endpoints (stats, metrics).
+
+These are not part of the public API. They are only served when
+INTERNAL_API_TOKEN is configured and the caller presents it in the
+X-Internal-Token header; otherwise they respond as if they did not exist.
+"""
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.core.admission import admission_controller
+from app.core.audit import audit_log
+from app.core.config import settings
+from app.core.db_pool import pool_metrics
+from app.core.hashing import password_hasher
+from app.core.loop_watchdog import loop_watchdog
+from app.core.metrics import render_latest
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import rate_limiter
+from app.core.revocation import revocation_list
+from app.core.token_cache import token_cache
+from app.services.partition_service import partition_keeper
+
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(default=None)) -> None:
+    """Reject callers that do not present the configured internal token."""
+    expected = settings.INTERNAL_API_TOKEN
+    if (
+        expected is None
+        or x_internal_token is None
+        or not hmac.compare_digest(x_internal_token.encode(), expected.get_secret_value().encode())
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+router = APIRouter(include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+
+
+@router.get("/stats")
+async def get_stats() -> dict:
+    """Return this worker's in-process counters for the auth hot path and database pool."""
+    return {
+        "admission": admission_controller.stats(),
+        "audit_log": audit_log.stats(),
+        "database_pool": pool_metrics.stats(),
+        "loop_watchdog": loop_watchdog.stats(),
+        "partition_keeper": partition_keeper.stats(),
+        "password_hasher": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "revocation_list": revocation_list.stats(),
+        "token_cache": token_cache.stats(),
+    }
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """Return Prometheus metrics aggregated across all worker processes."""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
@@ -1,30 +1,66 @@
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.principal import AuthPrincipal
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_list
 from app.core.security import decode_token
 from app.models.user import User
-from app.schemas.user_schemas import User as UserSchema
+from app.services.auth_service import AuthService
 
 security = HTTPBearer()
+auth_service = AuthService()
 
 
-def get_current_user(
+async def _load_principal(db: AsyncSession, user_id: str) -> Optional[AuthPrincipal]:
+    """
+    Resolve a token subject to a principal, consulting the principal cache first.
+
+    Args:
+        db: Database session, only used on a cache miss
+        user_id: The JWT subject
+
+    Returns:
+        Optional[AuthPrincipal]: The principal, or None if the user does not exist
+    """
+    try:
+        uuid.UUID(user_id)
+    except ValueError:
+        return None
+
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        cached = await principal_cache.get(user_id)
+        if cached is not None:
+            return AuthPrincipal.from_dict(cached)
+
+    principal = await auth_service.get_principal(db, user_id=user_id)
+    if principal is None:
+        return None
+
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        await principal_cache.set(user_id, principal.to_dict())
+    return principal
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_read_db)
+) -> AuthPrincipal:
     """
     Get the current authenticated user from JWT token.
-    
+
     Args:
         credentials: Bearer token from Authorization header
         db: Database session
-        
+
     Returns:
-        User: The authenticated user object
-        
+        AuthPrincipal: The authenticated principal
+
     Raises:
         HTTPException: If token is invalid or user not found
     """
@@ -33,40 +69,39 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
         # Decode the JWT token
         payload = decode_token(credentials.credentials)
-        if payload is None:
+        if payload is None or revocation_list.is_revoked(payload):
             raise credentials_exception
-            
+
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-            
+
     except Exception:
         raise credentials_exception
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+
+    principal = await _load_principal(db, user_id)
+    if principal is None:
         raise credentials_exception
-        
-    return user
+
+    return principal
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthPrincipal = Depends(get_current_user)
+) -> AuthPrincipal:
     """
     Get the current authenticated and active user.
-    
+
     Args:
         current_user: User from get_current_user dependency
-        
+
     Returns:
-        User: The authenticated and active user object
-        
+        AuthPrincipal: The authenticated and active principal
+
     Raises:
         HTTPException: If user is inactive
     """
@@ -79,17 +114,17 @@ def get_current_active_user(
 
 
 def get_current_verified_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthPrincipal = Depends(get_current_active_user)
+) -> AuthPrincipal:
     """
     Get the current authenticated, active, and verified user.
-    
+
     Args:
         current_user: User from get_current_active_user dependency
-        
+
     Returns:
-        User: The authenticated, active, and verified user object
-        
+        AuthPrincipal: The authenticated, active, and verified principal
+
     Raises:
         HTTPException: If user is not verified
     """
@@ -102,35 +137,64 @@ def get_current_verified_user(
     return current_user
 
 
-def get_optional_current_user(
+async def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_read_db)
+) -> Optional[AuthPrincipal]:
     """
     Get the current user if authenticated, otherwise return None.
     This is useful for endpoints that work for both authenticated and anonymous users.
-    
+
     Args:
         credentials: Optional Bearer token from Authorization header
         db: Database session
-        
+
     Returns:
-        Optional[User]: The authenticated user object or None
+        Optional[AuthPrincipal]: The authenticated principal or None
     """
     if credentials is None:
         return None
-        
+
     try:
         payload = decode_token(credentials.credentials)
-        if payload is None:
+        if payload is None or revocation_list.is_revoked(payload):
             return None
-            
+
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
-            
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
-        
+
+        return await _load_principal(db, user_id)
+
     except Exception:
         return None
+
+
+async def get_current_user_entity(
+    current_user: AuthPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get the full ORM User for the current principal.
+
+    Only use this for endpoints that need columns or relationships beyond
+    the principal; it costs an extra database round trip.
+
+    Args:
+        current_user: Principal from get_current_active_user dependency
+        db: Database session
+
+    Returns:
+        User: The ORM user entity
+
+    Raises:
+        HTTPException: If the user no longer exists
+    """
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from fastapi import Query
+
+from app.schemas.common_schemas import CursorParams
+
+
+def get_cursor_params(
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    limit: int = Query(default=20, ge=1, le=100),
+) -> CursorParams:
+    """Read keyset pagination parameters from the query string."""
+    return CursorParams(cursor=cursor, limit=limit)
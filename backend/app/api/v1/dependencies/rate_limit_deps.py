@@ -0,0 +1,49 @@
+import hashlib
+import math
+from typing import Callable, Optional
+
+from fastapi import Request
+
+from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limit import RateLimit, RateLimitPolicy, rate_limiter
+
+
+async def _identity(request: Request, key_by: str) -> Optional[str]:
+    """Resolve the value a policy counts hits against, or None to skip the policy."""
+    if key_by == "ip":
+        return request.client.host if request.client else "unknown"
+    if key_by == "route":
+        return "all"
+    if key_by == "email":
+        try:
+            email = (await request.json()).get("email")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(email, str):
+            return None
+        # Keys carry a digest rather than the address itself
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+    raise ValueError(f"Unknown rate limit key: {key_by}")
+
+
+def rate_limit(*policies: RateLimitPolicy) -> Callable:
+    """
+    Build a dependency that enforces the given policies before the endpoint runs.
+
+    Use it in the route decorator's ``dependencies`` so an over-limit request
+    is rejected before any of the endpoint's own work.
+    """
+    async def enforce_rate_limit(request: Request) -> None:
+        limits = []
+        for policy in policies:
+            identity = await _identity(request, policy.key_by)
+            if identity is not None:
+                limits.append(RateLimit(f"{policy.name}:{identity}", policy.limit, policy.window_seconds))
+
+        allowed, retry_after = await rate_limiter.hit(limits)
+        if not allowed:
+            raise RateLimitExceededError(
+                "Too many requests, please try again later", retry_after=max(1, math.ceil(retry_after))
+            )
+
+    return enforce_rate_limit
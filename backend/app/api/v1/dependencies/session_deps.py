@@ -0,0 +1,10 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.user_session_service import UserSessionService
+
+
+def get_user_session_service(db: AsyncSession = Depends(get_db)) -> UserSessionService:
+    """Provide a UserSessionService bound to the request's database session."""
+    return UserSessionService(db)
@@ -1,19 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.dependencies.auth_deps import get_current_active_user
+from app.api.v1.dependencies.pagination_deps import get_cursor_params
+from app.api.v1.dependencies.rate_limit_deps import rate_limit
+from app.api.v1.dependencies.session_deps import get_user_session_service
+from app.core.audit import audit_log
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.exceptions import InvalidCredentialsError
+from app.core.principal import AuthPrincipal
+from app.core.rate_limit import RateLimitPolicy
 from app.core.security import create_access_token
+from app.models.user_session import UserSession
 from app.schemas.user_schemas import UserCreate, User
-from app.schemas.auth_schemas import UserLogin
-from app.schemas.token import Token
+from app.schemas.auth_schemas import UserLogin, RefreshTokenRequest, LogoutRequest, SessionInfo, Token
+from app.schemas.common_schemas import CursorPage, CursorParams
 from app.services.auth_service import AuthService
+from app.services.user_session_service import UserSessionService
 
 router = APIRouter()
 
-@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+# Checked before the request body reaches AuthService, so throttled attempts never cost a bcrypt hash
+REGISTER_RATE_LIMIT = rate_limit(
+    RateLimitPolicy("register:ip", settings.RATE_LIMIT_REGISTER_PER_IP_PER_HOUR, 3600),
+)
+LOGIN_RATE_LIMIT = rate_limit(
+    RateLimitPolicy("login:ip", settings.RATE_LIMIT_LOGIN_PER_IP_PER_MINUTE, 60),
+    RateLimitPolicy("login:email", settings.RATE_LIMIT_LOGIN_PER_EMAIL_PER_15_MINUTES, 900, key_by="email"),
+)
+REFRESH_RATE_LIMIT = rate_limit(
+    RateLimitPolicy("refresh:ip", settings.RATE_LIMIT_REFRESH_PER_IP_PER_MINUTE, 60),
+)
+
+@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(REGISTER_RATE_LIMIT)])
 async def register(
     *,
     db: AsyncSession = Depends(get_db),
+    request: Request,
     user_in: UserCreate,
     auth_service: AuthService = Depends(AuthService)
 ) -> User:
@@ -27,13 +52,16 @@ async def register(
             detail="The user with this email already exists in the system.",
         )
     new_user = await auth_service.register(db=db, user_create=user_in)
+    audit_log.record("user.register", "user", resource_id=new_user.id, user_id=new_user.id, request=request)
     return new_user
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(LOGIN_RATE_LIMIT)])
 async def login(
     *,
     db: AsyncSession = Depends(get_db),
+    request: Request,
     auth_service: AuthService = Depends(AuthService),
+    session_service: UserSessionService = Depends(get_user_session_service),
     user_login: UserLogin
 ) -> Token:
     """
@@ -43,10 +71,85 @@ async def login(
         db, email=user_login.email, password=user_login.password
     )
     if not user:
+        audit_log.record("user.login_failed", "user", context={"email": user_login.email}, request=request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(subject=str(user.id))
-    return {"access_token": access_token, "token_type": "bearer"}
+    session, refresh_token = await session_service.create_session(
+        user_id=user.id,
+        device_info={"user_agent": request.headers.get("user-agent")},
+        ip_address=request.client.host if request.client else None,
+    )
+    access_token = create_access_token(
+        subject=str(user.id), additional_claims={"sid": session.session_id}
+    )
+    audit_log.record("user.login", "session", resource_id=session.session_id, user_id=user.id, request=request)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/refresh", response_model=Token, dependencies=[Depends(REFRESH_RATE_LIMIT)])
+async def refresh(
+    *,
+    request: Request,
+    session_service: UserSessionService = Depends(get_user_session_service),
+    refresh_in: RefreshTokenRequest
+) -> Token:
+    """
+    Rotate a refresh token and issue a new access token.
+    """
+    try:
+        session, refresh_token = await session_service.refresh_session(
+            refresh_in.refresh_token,
+            ip_address=request.client.host if request.client else None,
+        )
+    except InvalidCredentialsError:
+        audit_log.record("session.refresh_failed", "session", request=request)
+        raise
+    audit_log.record(
+        "session.refresh", "session", resource_id=session.session_id, user_id=session.user_id, request=request
+    )
+    access_token = create_access_token(
+        subject=str(session.user_id), additional_claims={"sid": session.session_id}
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    *,
+    request: Request,
+    session_service: UserSessionService = Depends(get_user_session_service),
+    logout_in: LogoutRequest
+) -> Response:
+    """
+    Terminate the session that owns the given refresh token.
+    """
+    terminated = await session_service.terminate_session(logout_in.refresh_token)
+    selector = UserSession.split_refresh_token(logout_in.refresh_token)
+    audit_log.record(
+        "session.logout", "session", resource_id=selector[0] if selector else None,
+        context={"terminated": terminated}, request=request,
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/sessions", response_model=CursorPage[SessionInfo])
+async def list_sessions(
+    *,
+    current_user: AuthPrincipal = Depends(get_current_active_user),
+    session_service: UserSessionService = Depends(get_user_session_service),
+    params: CursorParams = Depends(get_cursor_params),
+    include_total: bool = False
+) -> CursorPage[SessionInfo]:
+    """
+    List the current user's active sessions, newest first, one cursor page at a time.
+    """
+    page = await session_service.get_user_sessions_page(
+        current_user.id, limit=params.limit, cursor=params.cursor, with_total=include_total
+    )
+    return CursorPage[SessionInfo](
+        items=[SessionInfo.model_validate(session) for session in page.items],
+        next_cursor=page.next_cursor,
+        has_more=page.has_more,
+        limit=page.limit,
+        approximate_total=page.approximate_total,
+    )
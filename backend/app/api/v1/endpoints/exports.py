@@ -0,0 +1,98 @@
+import uuid
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies.auth_deps import get_current_active_user
+from app.core.audit import audit_log
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.exceptions import PermissionDeniedError
+from app.core.principal import AuthPrincipal
+from app.models.membership import Membership, MemberRole
+from app.models.organization import Organization
+from app.services.export_service import MEDIA_TYPES, ExportService
+
+router = APIRouter()
+
+
+async def require_organization_admin(
+    db: AsyncSession, principal: AuthPrincipal, organization_id: uuid.UUID
+) -> None:
+    """Allow only the organization's owner and admins through."""
+    allowed = await db.scalar(
+        select(
+            or_(
+                exists().where(
+                    Organization.id == organization_id,
+                    Organization.owner_id == principal.id,
+                ),
+                exists().where(
+                    Membership.organization_id == organization_id,
+                    Membership.user_id == principal.id,
+                    Membership.role.in_([MemberRole.OWNER, MemberRole.ADMIN]),
+                ),
+            )
+        )
+    )
+    if not allowed:
+        raise PermissionDeniedError("Exports require an organization owner or admin")
+
+
+@router.get("/{organization_id}/exports/{dataset}")
+async def export_dataset(
+    *,
+    request: Request,
+    organization_id: uuid.UUID,
+    dataset: Literal["audit_logs", "user_sessions"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fetch_size: Optional[int] = Query(default=None, ge=100, le=50000),
+    current_user: AuthPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream an organization's audit log or session history as NDJSON or CSV.
+    """
+    await require_organization_admin(db, current_user, organization_id)
+
+    # Request-scoped sessions are closed before a streaming body is sent, so
+    # the export reads through its own session for the lifetime of the response.
+    # Exports are read-only and can be long, so they run on the replica if there is one.
+    export_db = AsyncSessionLocal(info={"replica": True})
+    try:
+        chunks = ExportService(export_db, fetch_size=fetch_size).stream(
+            dataset, organization_id, fmt=format, compress=gzip, since=since, until=until
+        )
+    except Exception:
+        await export_db.close()
+        raise
+
+    async def body():
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await export_db.close()
+
+    audit_log.record(
+        "organization.export", "organization", resource_id=str(organization_id),
+        user_id=current_user.id, organization_id=organization_id,
+        context={
+            "dataset": dataset, "format": format,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None,
+        },
+        request=request,
+    )
+
+    filename = f"{dataset}-{organization_id}.{format}{'.gz' if gzip else ''}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        return StreamingResponse(body(), media_type="application/gzip", headers=headers)
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[format], headers=headers)
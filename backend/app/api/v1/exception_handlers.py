@@ -37,7 +37,9 @@ from app.core.exceptions import (
     NotFoundError,
     ValidationError,
     PermissionDeniedError,
-    InsufficientCreditsError
+    InsufficientCreditsError,
+    RateLimitExceededError,
+    ServiceUnavailableError
 )
 from app.schemas.common_schemas import APIErrorResponse, APIErrorDetail
 
@@ -117,3 +119,29 @@ def setup_exception_handlers(app):
                 )
             ).model_dump()
         )
+
+    @app.exception_handler(RateLimitExceededError)
+    async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=APIErrorResponse(
+                error=APIErrorDetail(
+                    code="RATE_LIMITED",
+                    message=str(exc)
+                )
+            ).model_dump(),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(ServiceUnavailableError)
+    async def service_unavailable_handler(request: Request, exc: ServiceUnavailableError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=APIErrorResponse(
+                error=APIErrorDetail(
+                    code="SERVICE_UNAVAILABLE",
+                    message=str(exc)
+                )
+            ).model_dump(),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
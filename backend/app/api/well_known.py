@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.core import keys
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/jwks.json", tags=["Authentication"])
+async def get_jwks(request: Request, response: Response):
+    """
+    Publish the public keys that verify access tokens.
+
+    The response is cacheable; its ETag changes whenever the key ring does.
+    """
+    etag = f'"{keys.key_ring.version}"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return keys.key_ring.jwks()
@@ -0,0 +1,260 @@
+"""
+Adaptive admission control for CPU-heavy routes.
+
+Login and registration spend most of their time in bcrypt. When more of them
+arrive than a worker can hash, queueing them only makes every request on that
+worker slow, until the worker misses GUNICORN_TIMEOUT and is killed. This
+middleware caps the number of in-flight requests per route class and rejects
+the excess immediately with 503 and Retry-After.
+
+The cap adapts AIMD-style (additive increase, multiplicative decrease):
+
+- A request that finishes under the class's target latency raises the limit
+  by 1/limit, i.e. by about one per ``limit`` good completions, but only if
+  at least half the limit was in flight when it was admitted. A limit that
+  is not being reached has not been shown to be safe, so quiet periods do
+  not ratchet it up to the maximum.
+- A request that is slower than the target, or is answered with a 503 by a
+  saturated subsystem such as the password hashing pool, cuts the limit by
+  ``backoff``. At most one cut is made per target-latency interval, so a
+  single slow batch cannot collapse the limit.
+- Rate-limit rejections (429) and validation errors (422) are answered
+  before any real work, so they say nothing about capacity and leave the
+  limit unchanged. Other 4xx responses are sampled: a failed login still
+  pays for a full bcrypt verify, and during credential stuffing most logins
+  are 401s.
+
+Event-loop lag is sampled by a background task. While it exceeds
+ADMISSION_LOOP_LAG_SHED_MS, limited classes admit nothing new. Routes outside
+every class, such as /health, are never limited.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses produced without doing the route's work, which say nothing about capacity
+UNSAMPLED_STATUSES = frozenset({422, 429})
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """Requests sharing one adaptive concurrency limit."""
+    name: str
+    routes: FrozenSet[Tuple[str, str]]  # (method, path)
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    target_latency: float  # seconds
+    backoff: float = 0.9
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit with in-flight and shed counters for one route class."""
+
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.limit = float(route_class.initial_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+        self.admitted = 0
+        self.shed = 0
+        self.increases = 0
+        self.decreases = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, latency: float, overloaded: bool, concurrency: int, sample: bool = True) -> None:
+        """
+        Finish a request and adapt the limit.
+
+        Args:
+            latency: Seconds the request took
+            overloaded: Whether it was answered with a 503
+            concurrency: Requests in flight when it was admitted, itself included
+            sample: False for responses that say nothing about capacity
+        """
+        self.in_flight -= 1
+        if not sample:
+            return
+        spec = self.route_class
+        now = time.monotonic()
+        if overloaded or latency > spec.target_latency:
+            if now - self._last_decrease >= spec.target_latency:
+                self.limit = max(spec.min_limit, self.limit * spec.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        elif self.limit < spec.max_limit and concurrency >= self.limit / 2:
+            self.limit = min(spec.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0  # seconds, exponentially weighted
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag += self.smoothing * (lag - self.lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class AdmissionController:
+    """Per-worker admission state shared by AdmissionMiddleware and /internal/stats."""
+
+    def __init__(self, route_classes, lag_shed_threshold: float, retry_after: int = 1, enabled: bool = True):
+        self.enabled = enabled
+        self.lag_shed_threshold = lag_shed_threshold
+        self.retry_after = retry_after
+        self.loop_lag = LoopLagMonitor()
+        self.limits: Dict[str, AdaptiveLimit] = {spec.name: AdaptiveLimit(spec) for spec in route_classes}
+        self._by_route: Dict[Tuple[str, str], AdaptiveLimit] = {
+            route: self.limits[spec.name] for spec in route_classes for route in spec.routes
+        }
+        self.lag_shed = 0
+
+    def limit_for(self, method: str, path: str) -> Optional[AdaptiveLimit]:
+        return self._by_route.get((method, path.rstrip("/") or "/"))
+
+    def admit(self, limit: AdaptiveLimit) -> bool:
+        if self.loop_lag.lag > self.lag_shed_threshold:
+            self.lag_shed += 1
+            limit.shed += 1
+            return False
+        return limit.try_acquire()
+
+    def start(self) -> None:
+        if self.enabled:
+            self.loop_lag.start()
+
+    async def stop(self) -> None:
+        await self.loop_lag.stop()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "loop_lag_ms": self.loop_lag.lag * 1000,
+            "max_loop_lag_ms": self.loop_lag.max_lag * 1000,
+            "lag_shed": self.lag_shed,
+            "classes": {name: limit.stats() for name, limit in self.limits.items()},
+        }
+
+
+_SHED_BODY = json.dumps({
+    "error": {"code": "SERVICE_OVERLOADED", "message": "Server is busy, please retry shortly", "field": None}
+}).encode()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds requests of saturated route classes before routing."""
+
+    def __init__(self, app, controller: "AdmissionController"):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and self.controller.enabled:
+            limit = self.controller.limit_for(scope["method"], scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.controller.admit(limit):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_SHED_BODY)).encode()),
+                    (b"retry-after", str(self.controller.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _SHED_BODY})
+            return
+
+        concurrency = limit.in_flight
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limit.release(
+                time.monotonic() - started,
+                overloaded=status == 503,
+                concurrency=concurrency,
+                sample=status not in UNSAMPLED_STATUSES,
+            )
+
+
+AUTH_CPU_ROUTES = RouteClass(
+    name="auth_cpu",
+    routes=frozenset({
+        ("POST", f"{settings.API_V1_STR}/auth/login"),
+        ("POST", f"{settings.API_V1_STR}/auth/register"),
+    }),
+    initial_limit=settings.ADMISSION_AUTH_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_AUTH_MIN_LIMIT,
+    max_limit=settings.ADMISSION_AUTH_MAX_LIMIT,
+    target_latency=settings.ADMISSION_AUTH_TARGET_LATENCY_MS / 1000,
+)
+
+admission_controller = AdmissionController(
+    route_classes=[AUTH_CPU_ROUTES],
+    lag_shed_threshold=settings.ADMISSION_LOOP_LAG_SHED_MS / 1000,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    enabled=settings.ADMISSION_CONTROL_ENABLED,
+)
@@ -0,0 +1,341 @@
+"""
+Buffered audit log writer.
+
+Auth endpoints record audit events without touching the database: record()
+appends to a bounded in-process buffer and returns immediately. A background
+flusher writes the buffer to audit_logs in multi-row INSERTs whenever a batch
+fills up or the flush interval elapses.
+
+If Postgres is slow or down, events accumulate up to AUDIT_BUFFER_MAX_EVENTS.
+Beyond that the overflow policy applies:
+
+- ``drop``: the oldest events are discarded and counted.
+- ``spill``: the oldest events are appended to AUDIT_SPILL_PATH as NDJSON and
+  replayed once writes succeed again. record() never does file I/O itself:
+  it wakes the flusher, which spills from a worker thread. Only if the
+  buffer reaches twice max_events before the flusher catches up are the
+  oldest events dropped.
+
+Each worker process spills to its own ``<AUDIT_SPILL_PATH>.<pid>`` file, and
+claims the files of workers that are no longer running by renaming them, so
+no two processes ever replay the same file. Writes skip events whose
+(id, created_at) is already stored, which makes replaying a batch again after
+a crash, or retrying one whose commit timed out, harmless.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from fastapi import Request
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "spill")
+_UUID_FIELDS = ("id", "user_id", "organization_id")
+
+
+def _to_json(event: dict) -> str:
+    return json.dumps(event, default=str, separators=(",", ":"))
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _from_json(line: str) -> dict:
+    event = json.loads(line)
+    for key in _UUID_FIELDS:
+        if event.get(key) is not None:
+            event[key] = uuid.UUID(event[key])
+    event["created_at"] = datetime.fromisoformat(event["created_at"])
+    return event
+
+
+class AuditBuffer:
+    """Bounded buffer of audit events with a batching background flusher."""
+
+    def __init__(
+        self,
+        max_events: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        write_timeout: float = 5.0,
+        overflow_policy: str = "drop",
+        spill_path: Optional[str] = None,
+        enabled: bool = True,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+        if overflow_policy == "spill" and not spill_path:
+            raise ValueError("AUDIT_SPILL_PATH is required for the spill overflow policy")
+
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.write_timeout = write_timeout
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.enabled = enabled
+        self.engine: Optional[AsyncEngine] = None
+
+        self._events: Deque[dict] = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+
+    def bind(self, engine: Optional[AsyncEngine]) -> None:
+        """Attach (or detach) the engine the flusher writes through."""
+        self.engine = engine
+
+    def record(
+        self,
+        action: str,
+        resource_type: str,
+        *,
+        resource_id: Optional[str] = None,
+        user_id: Optional[uuid.UUID] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        context: Optional[dict] = None,
+        request: Optional[Request] = None,
+    ) -> None:
+        """Queue an audit event. Never blocks and never raises on a full buffer."""
+        if not self.enabled:
+            return
+        user_agent = request.headers.get("user-agent") if request is not None else None
+        self._events.append({
+            "id": uuid.uuid4(),
+            "created_at": datetime.now(timezone.utc),
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": str(resource_id) if resource_id is not None else None,
+            "user_id": user_id,
+            "organization_id": organization_id,
+            "context_data": context or {},
+            "ip_address": request.client.host if request is not None and request.client else None,
+            "user_agent": user_agent[:500] if user_agent else None,
+        })
+        self.recorded += 1
+
+        if len(self._events) > self.max_events:
+            self._shed()
+        if len(self._events) >= self.batch_size:
+            self._batch_ready.set()
+
+    def _shed(self) -> None:
+        """Drop events beyond the overflow policy's in-memory limit, oldest first. No I/O."""
+        limit = self.max_events
+        if self.overflow_policy == "spill":
+            # The flusher spills down to max_events; until it gets to it, allow some slack
+            self._batch_ready.set()
+            limit = self.max_events * 2
+        overflow = len(self._events) - limit
+        if overflow <= 0:
+            return
+        for _ in range(overflow):
+            self._events.popleft()
+        self.dropped += overflow
+
+    @property
+    def _spill_file(self) -> str:
+        # Per process, since every gunicorn worker is configured with the same AUDIT_SPILL_PATH
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def _orphaned_spill(self) -> Optional[str]:
+        """A spill or replay file left behind by a worker that is no longer running."""
+        if os.path.exists(self.spill_path):
+            return self.spill_path  # Written before spill files were per process
+        directory, prefix = os.path.split(self.spill_path)
+        pattern = re.compile(re.escape(prefix) + r"\.(\d+)(\.replay)?$")
+        for name in sorted(os.listdir(directory or ".")):
+            match = pattern.match(name)
+            if match and int(match.group(1)) != os.getpid() and not _process_alive(int(match.group(1))):
+                return os.path.join(directory, name)
+        return None
+
+    def _append_to_spill(self, events: List[dict]) -> None:
+        with open(self._spill_file, "a", encoding="utf-8") as spill:
+            spill.writelines(_to_json(event) + "\n" for event in events)
+
+    async def _spill(self, events: List[dict]) -> bool:
+        try:
+            await asyncio.to_thread(self._append_to_spill, events)
+        except OSError as e:
+            logger.error(f"Failed to spill {len(events)} audit events to {self._spill_file}: {e}")
+            self.dropped += len(events)
+            return False
+        self.spilled += len(events)
+        return True
+
+    async def _spill_overflow(self) -> None:
+        """Under the spill policy, move events beyond max_events to the spill file."""
+        overflow = len(self._events) - self.max_events
+        if self.overflow_policy != "spill" or overflow <= 0:
+            return
+        # Spill at least a whole batch so the file is appended to in chunks
+        count = min(max(overflow, self.batch_size), len(self._events))
+        await self._spill([self._events.popleft() for _ in range(count)])
+
+    async def _write(self, events: List[dict]) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(AuditLog.__table__).values(events).on_conflict_do_nothing())
+
+    async def _write_batch(self, events: List[dict]) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._write(events), timeout=self.write_timeout)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.warning(f"Failed to write {len(events)} audit events: {e}")
+            return False
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.written += len(events)
+        return True
+
+    async def flush(self) -> None:
+        """Write everything currently buffered, then replay any spilled events."""
+        await self._spill_overflow()
+        if self.engine is None:
+            return
+        while self._events:
+            batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            if not await self._write_batch(batch):
+                # Put the batch back in order; the overflow policy bounds the buffer
+                self._events.extendleft(reversed(batch))
+                self._shed()
+                await self._spill_overflow()
+                return
+        await self._replay_spill()
+
+    def _read_spill(self, replaying: str) -> Optional[List[dict]]:
+        if not os.path.exists(replaying):
+            source = self._spill_file if os.path.exists(self._spill_file) else self._orphaned_spill()
+            if source is None:
+                return None
+            try:
+                os.replace(source, replaying)
+            except FileNotFoundError:
+                return None  # Another worker claimed the orphaned file first
+        with open(replaying, encoding="utf-8") as spill:
+            return [_from_json(line) for line in spill if line.strip()]
+
+    def _rewrite_spill(self, replaying: str, events: List[dict]) -> None:
+        # Written aside and renamed, so a failed rewrite leaves the previous file intact
+        with open(f"{replaying}.tmp", "w", encoding="utf-8") as spill:
+            spill.writelines(_to_json(event) + "\n" for event in events)
+        os.replace(f"{replaying}.tmp", replaying)
+
+    async def _replay_spill(self) -> None:
+        if not self.spill_path:
+            return
+        replaying = f"{self._spill_file}.replay"
+        try:
+            # A leftover .replay file means an earlier replay was interrupted; finish it first
+            events = await asyncio.to_thread(self._read_spill, replaying)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read spilled audit events: {e}")
+            return
+        if events is None:
+            return
+
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            if not await self._write_batch(batch):
+                # Keep the unwritten remainder on disk for the next attempt
+                try:
+                    await asyncio.to_thread(self._rewrite_spill, replaying, events[start:])
+                except OSError as e:
+                    logger.error(
+                        f"Failed to rewrite {replaying}: {e}; "
+                        f"its {start} already written events will be skipped on replay"
+                    )
+                return
+            self.replayed += len(batch)
+        try:
+            await asyncio.to_thread(os.remove, replaying)
+        except OSError as e:
+            logger.error(f"Failed to remove {replaying}: {e}; its events will be skipped on the next replay")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and make a final attempt to write buffered events."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._events:
+            remaining = list(self._events)
+            self._events.clear()
+            if self.overflow_policy == "spill":
+                await self._spill(remaining)
+            else:
+                self.dropped += len(remaining)
+                logger.warning(f"Discarding {len(remaining)} unwritten audit events on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._events),
+            "max_events": self.max_events,
+            "overflow_policy": self.overflow_policy,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+audit_log = AuditBuffer(
+    max_events=settings.AUDIT_BUFFER_MAX_EVENTS,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    overflow_policy=settings.AUDIT_OVERFLOW_POLICY,
+    spill_path=settings.AUDIT_SPILL_PATH,
+    enabled=settings.AUDIT_ENABLED,
+)
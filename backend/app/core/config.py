@@ -1,10 +1,21 @@
 import logging
 from typing import Any, List, Optional
 
-from pydantic import PostgresDsn, field_validator, SecretStr
+from pydantic import BaseModel, PostgresDsn, field_validator, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class SigningKeyConfig(BaseModel):
+    """An asymmetric JWT signing key; see app/core/keys.py for rotation stages."""
+    kid: str
+    algorithm: str = "ES256"
+    status: str = "active"  # "next", "active" or "retired"
+    private_key: Optional[SecretStr] = None  # PEM
+    private_key_file: Optional[str] = None
+    public_key: Optional[str] = None  # PEM, enough for "next"/"retired" keys
+    public_key_file: Optional[str] = None
+
+
 class Settings(BaseSettings):
     """
     Enterprise-grade application settings with comprehensive validation.
@@ -22,7 +33,60 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     ALGORITHM: str = "HS256"
+    # Asymmetric signing keys as a JSON list; when empty, tokens are HS256-signed with SECRET_KEY
+    JWT_SIGNING_KEYS: List[SigningKeyConfig] = []
+    # Keep verifying kid-less HS256 tokens while migrating to asymmetric keys
+    JWT_ACCEPT_SYMMETRIC_TOKENS: bool = True
+    JWKS_MAX_AGE_SECONDS: int = 300
+    JWT_BACKEND: str = "jose"  # "jose" or "hmac"; see app/core/jwt_backends.py
+    # Verified access-token payloads kept per worker; 0 disables the cache
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # How often each worker pulls new access-token revocations from Redis
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 2.0
     MAX_SESSIONS_PER_USER: int = 10
+    SESSION_CLEANUP_BATCH_SIZE: int = 1000
+    # Accept pre-selector/verifier opaque refresh tokens during the migration window
+    LEGACY_REFRESH_TOKENS_ACCEPTED: bool = True
+
+    # Audit log buffering (see app/core/audit.py)
+    AUDIT_ENABLED: bool = True
+    AUDIT_BUFFER_MAX_EVENTS: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_OVERFLOW_POLICY: str = "drop"  # "drop" or "spill"
+    AUDIT_SPILL_PATH: Optional[str] = None
+
+    # Rate limits (see app/core/rate_limit.py and the policies in app/api/v1/endpoints/auth.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOGIN_PER_IP_PER_MINUTE: int = 20
+    RATE_LIMIT_LOGIN_PER_EMAIL_PER_15_MINUTES: int = 10
+    RATE_LIMIT_REGISTER_PER_IP_PER_HOUR: int = 10
+    RATE_LIMIT_REFRESH_PER_IP_PER_MINUTE: int = 120
+
+    # Adaptive admission control for bcrypt-bound routes, per worker (see app/core/admission.py)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_AUTH_INITIAL_LIMIT: int = 8
+    ADMISSION_AUTH_MIN_LIMIT: int = 1
+    ADMISSION_AUTH_MAX_LIMIT: int = 64
+    ADMISSION_AUTH_TARGET_LATENCY_MS: float = 1000.0
+    ADMISSION_LOOP_LAG_SHED_MS: float = 200.0  # Shed limited routes while the event loop lags this much
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Rows fetched per round trip by streaming exports (see app/services/export_service.py)
+    EXPORT_FETCH_SIZE: int = 1000
+
+    # Monthly table partitions (see app/services/partition_service.py)
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_DETACH_ONLY: bool = False  # Detach expired partitions for archiving instead of dropping them
+    PARTITION_ENSURE_INTERVAL_SECONDS: int = 21600  # Workers create upcoming partitions at startup and this often; 0 = startup only
+    SESSION_PARTITION_RETENTION_MONTHS: int = 6
+    AUDIT_RETENTION_MONTHS: int = 13
+
+    # Password Hashing
+    PASSWORD_HASH_POOL: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # Defaults to the CPU count
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Pending operations beyond the busy workers
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
 
     # CORS
     CORS_ORIGINS: List[str] = []
@@ -46,6 +110,18 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_PORT: int = 5432
     DATABASE_URL: Optional[PostgresDsn] = None
+    # Optional streaming read replica; see app/core/db_routing.py for what is routed to it
+    DATABASE_READ_URL: Optional[PostgresDsn] = None
+    # After a request writes, keep the client on the primary this long (cookie); 0 disables
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Per worker process: a node opens up to (DB_POOL_SIZE + DB_MAX_OVERFLOW) * WEB_CONCURRENCY connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = -1  # -1 never recycles; set below any server/proxy idle timeout
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout; False relies on recycle and retries
+    DB_POOL_USE_LIFO: bool = False  # LIFO lets surplus idle connections age out via recycle
+    DB_POOL_STATS_LOG_INTERVAL_SECONDS: float = 0.0  # 0 disables periodic pool usage logs
 
     @field_validator("DATABASE_URL", mode="before")
     def assemble_db_connection(cls, v: Optional[str], info) -> Any:
@@ -66,7 +142,26 @@ class Settings(BaseSettings):
     REDIS_PORT: int
     REDIS_DB: int
     REDIS_URL: Optional[str] = None
-    
+
+    # Principal Cache
+    # The local tier cannot be invalidated across workers, so keep its TTL short.
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_LOCAL_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = 300
+
+    # Per-request SQL profiling (see app/core/sql_profiler.py); adds a Server-Timing header
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Event-loop blocking detector (see app/core/loop_watchdog.py)
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100.0
+    LOOP_WATCHDOG_LOG_INTERVAL_SECONDS: float = 10.0
+
+    # Internal API (stats, metrics); disabled unless a token is configured
+    INTERNAL_API_TOKEN: Optional[SecretStr] = None
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -1,17 +1,76 @@
+from sqlalchemy import Select, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from typing import AsyncGenerator
 
+from app.core import metrics, sql_profiler
 from app.core.config import settings
+from app.core.db_pool import InstrumentedQueuePool, pool_metrics
+from app.core.db_routing import record_write, replica_reads_requested, request_pinned_to_primary
+
+_pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_use_lifo=settings.DB_POOL_USE_LIFO,
+)
 
 # Create async database engine
 # The DATABASE_URL must be compatible with an async driver, e.g., postgresql+asyncpg
-engine = create_async_engine(str(settings.DATABASE_URL), pool_pre_ping=True)
+engine = create_async_engine(str(settings.DATABASE_URL), poolclass=InstrumentedQueuePool, **_pool_options)
+pool_metrics.bind(engine)
+
+# Read replica engine; without DATABASE_READ_URL every query goes to the primary.
+# Its pool is sized by the same settings but not reported in pool_metrics.
+read_engine = (
+    create_async_engine(str(settings.DATABASE_READ_URL), **_pool_options)
+    if settings.DATABASE_READ_URL else engine
+)
+
+for _engine in {engine, read_engine}:
+    metrics.instrument_engine(_engine)
+    sql_profiler.instrument_engine(_engine)
+
+
+class RoutingSession(Session):
+    """Session that serves eligible reads from the replica; see app/core/db_routing.py."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            read_engine is not engine
+            and (self.info.get("replica") or replica_reads_requested())
+            and not self.info.get("primary")
+            and not self.info.get("wrote")
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not request_pinned_to_primary()
+        ):
+            return read_engine.sync_engine
+        return engine.sync_engine
+
+
+def _mark_written(session: Session) -> None:
+    session.info["wrote"] = True
+    record_write()
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _note_write_statement(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        _mark_written(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _note_flush(session, flush_context) -> None:
+    _mark_written(session)
+
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
-    bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -22,6 +81,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     FastAPI dependency that provides an asynchronous database session.
     This ensures that each request gets a dedicated session that is
     properly closed after the request is finished.
+
+    Reads are routed to the replica only inside @read_only service methods.
     """
     async with AsyncSessionLocal() as session:
         try:
@@ -29,3 +90,24 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency for read-only work: every plain SELECT goes to the
+    replica unless the request is pinned to the primary.
+    """
+    async with AsyncSessionLocal(info={"replica": True}) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency whose session never touches the replica, for requests
+    that must read the latest committed state.
+    """
+    async with AsyncSessionLocal(info={"primary": True}) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,159 @@
+"""
+Database connection pool instrumentation.
+
+Every worker process owns its own pool, so the number of Postgres connections
+a node can open is (DB_POOL_SIZE + DB_MAX_OVERFLOW) * WEB_CONCURRENCY. These
+metrics show how much of that each worker actually uses and how long requests
+wait for a connection, which is what pool sizing against ``max_connections``
+has to be based on.
+
+Checkout latency is measured around ``Pool.connect()``: it covers waiting for
+a free connection, opening a new overflow connection and the pre-ping, i.e.
+everything a request waits for before its first query can be sent.
+"""
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Checkout counters and wait-time histogram for the engine's pool."""
+
+    def __init__(self, log_interval: float = 0.0):
+        self.log_interval = log_interval
+        self.engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._wait_buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_errors = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def bind(self, engine: Optional[AsyncEngine]) -> None:
+        """Track the pool of an engine created with poolclass=InstrumentedQueuePool."""
+        self.engine = engine
+        if engine is not None:
+            # Pool events registered on the engine survive pool recreation on dispose()
+            event.listen(engine.sync_engine, "connect", self._on_connect)
+            event.listen(engine.sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+    def observe_checkout(self, wait_ms: float, error: Optional[BaseException] = None) -> None:
+        self._wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.wait_sum_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        if error is None:
+            self.checkouts += 1
+        elif isinstance(error, exc.TimeoutError):
+            self.checkout_timeouts += 1
+            logger.warning(f"Database pool checkout timed out after {wait_ms:.0f}ms: {self.summary()}")
+        else:
+            self.checkout_errors += 1
+
+    @property
+    def pool(self) -> Optional[QueuePool]:
+        if self.engine is None or not isinstance(self.engine.sync_engine.pool, QueuePool):
+            return None
+        return self.engine.sync_engine.pool
+
+    def summary(self) -> str:
+        pool = self.pool
+        if pool is None:
+            return "no pool bound"
+        return (
+            f"checked_out={pool.checkedout()} idle={pool.checkedin()} overflow={max(pool.overflow(), 0)} "
+            f"capacity={pool.size() + pool._max_overflow} timeouts={self.checkout_timeouts}"
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.log_interval)
+            attempts = self.checkouts + self.checkout_timeouts + self.checkout_errors
+            mean = self.wait_sum_ms / attempts if attempts else 0.0
+            logger.info(f"Database pool: {self.summary()} mean_wait={mean:.1f}ms max_wait={self.wait_max_ms:.1f}ms")
+
+    def start(self) -> None:
+        """Log a sizing summary and, if configured, pool usage every log_interval seconds."""
+        pool = self.pool
+        if pool is not None:
+            workers = os.getenv("WEB_CONCURRENCY")
+            per_worker = pool.size() + pool._max_overflow
+            node = f", up to {per_worker * int(workers)} per node with WEB_CONCURRENCY={workers}" if workers else ""
+            logger.info(f"Database pool: size={pool.size()} max_overflow={pool._max_overflow} "
+                        f"({per_worker} connections per worker{node})")
+        if self.log_interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        pool = self.pool
+        cumulative, buckets = 0, {}
+        for bound, count in zip(WAIT_BUCKETS_MS + (float("inf"),), self._wait_buckets):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "pool_size": pool.size() if pool else None,
+            "max_overflow": pool._max_overflow if pool else None,
+            "checked_out": pool.checkedout() if pool else None,
+            "idle": pool.checkedin() if pool else None,
+            "overflow": max(pool.overflow(), 0) if pool else None,  # Starts at -pool_size in SQLAlchemy
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_errors": self.checkout_errors,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "wait_ms": {
+                "buckets": buckets,
+                "count": cumulative,
+                "sum": self.wait_sum_ms,
+                "max": self.wait_max_ms,
+            },
+        }
+
+
+pool_metrics = PoolMetrics(log_interval=settings.DB_POOL_STATS_LOG_INTERVAL_SECONDS)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout latency and timeouts to pool_metrics."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception as e:
+            pool_metrics.observe_checkout((time.perf_counter() - started) * 1000, e)
+            raise
+        pool_metrics.observe_checkout((time.perf_counter() - started) * 1000)
+        return connection
@@ -0,0 +1,105 @@
+"""
+Routing state for read-replica database access.
+
+RoutingSession (app/core/database.py) sends a SELECT to the read replica only
+when all of the following hold:
+
+- it runs inside a method decorated with ``@read_only``, or on a session from
+  ``get_read_db``;
+- the session has not written anything yet, so a request always reads its
+  own writes back from the primary;
+- the request is not pinned to the primary (see PrimaryPinMiddleware);
+- it is a plain SELECT, not SELECT ... FOR UPDATE.
+
+Everything else, including flushes, Core INSERT/UPDATE/DELETE, text() and
+advisory-lock selects, goes to the primary.
+"""
+import functools
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+PIN_COOKIE = "db_primary_until"
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_request_routing: ContextVar[Optional[dict]] = ContextVar("request_routing", default=None)
+
+
+def read_only(method):
+    """Mark an async service method as safe to serve from the read replica."""
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+def replica_reads_requested() -> bool:
+    return _replica_reads.get()
+
+
+def request_pinned_to_primary() -> bool:
+    routing = _request_routing.get()
+    return routing is not None and (routing["pinned"] or routing["wrote"])
+
+
+def record_write() -> None:
+    """Note that the current request wrote to the primary."""
+    routing = _request_routing.get()
+    if routing is not None:
+        routing["wrote"] = True
+
+
+class PrimaryPinMiddleware:
+    """
+    Keep a client on the primary for a while after one of its requests writes.
+
+    Within a request, every session reads from the primary once any session
+    has written. With ``pin_seconds`` > 0, the response to a writing request
+    also sets a cookie that pins the client's following requests to the
+    primary until replication has most likely caught up.
+    """
+
+    def __init__(self, app, pin_seconds: float = 0.0, enabled: bool = True):
+        self.app = app
+        self.pin_seconds = pin_seconds
+        self.enabled = enabled
+
+    def _pinned_until(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(PIN_COOKIE)
+                if morsel is not None:
+                    try:
+                        return float(morsel.value)
+                    except ValueError:
+                        return 0.0
+        return 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        routing = {"pinned": self._pinned_until(scope) > time.time(), "wrote": False}
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and routing["wrote"] and self.pin_seconds > 0:
+                until = time.time() + self.pin_seconds
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{PIN_COOKIE}={until:.0f}; Max-Age={int(self.pin_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = _request_routing.set(routing)
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _request_routing.reset(token)
@@ -51,3 +51,17 @@ class NotFoundError(AppError):
 class PermissionDeniedError(AppError):
     """Raised when a user lacks permission for an operation."""
     pass
+
+class RateLimitExceededError(AppError):
+    """Raised when a client exceeds an endpoint's rate limit."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class ServiceUnavailableError(AppError):
+    """Raised when a subsystem is saturated and the caller should retry later."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
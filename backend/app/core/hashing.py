@@ -0,0 +1,152 @@
+"""
+Asynchronous password hashing.
+
+bcrypt is deliberately slow (hundreds of milliseconds per call), so running it
+inline in an async handler stalls the event loop for every other request on the
+worker. The PasswordHasher runs hashing and verification on a bounded executor
+and fails fast once the backlog is full instead of queueing indefinitely.
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import PASSWORD_HASH_SECONDS
+from app.core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run a function inside the worker and return its result with the compute time."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+@dataclass
+class HashingTiming:
+    """Timing breakdown for a single hashing operation."""
+    operation: str
+    queue_wait: float
+    compute: float
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded thread or process pool."""
+
+    def __init__(
+        self,
+        pool_kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: int = 32,
+        retry_after: int = 1,
+    ):
+        if pool_kind not in ("thread", "process"):
+            raise ValueError(f"Invalid password hash pool kind: {pool_kind}")
+        self.pool_kind = pool_kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+        self.calls = 0
+        self.rejected = 0
+        self.total_queue_wait = 0.0
+        self.total_compute = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of operations that may be running or queued at once."""
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Hash a plain-text password off the event loop."""
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a plain-text password against a hash off the event loop."""
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            logger.warning(
+                f"Password hashing pool saturated ({self._pending}/{self.capacity}), rejecting {operation}"
+            )
+            raise ServiceUnavailableError(
+                "Authentication is temporarily overloaded, please retry shortly.",
+                retry_after=self.retry_after,
+            )
+
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        try:
+            result, compute = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        elapsed = time.perf_counter() - submitted
+        self._record(HashingTiming(operation=operation, queue_wait=max(elapsed - compute, 0.0), compute=compute))
+        return result
+
+    def _record(self, timing: HashingTiming) -> None:
+        self.calls += 1
+        self.total_queue_wait += timing.queue_wait
+        self.total_compute += timing.compute
+        PASSWORD_HASH_SECONDS.labels(timing.operation, "queue").observe(timing.queue_wait)
+        PASSWORD_HASH_SECONDS.labels(timing.operation, "compute").observe(timing.compute)
+        logger.debug(
+            f"Password {timing.operation}: queue_wait={timing.queue_wait * 1000:.1f}ms "
+            f"compute={timing.compute * 1000:.1f}ms"
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def stats(self) -> dict:
+        """Return counters and average timings for the pool."""
+        return {
+            "pool": self.pool_kind,
+            "workers": self.max_workers,
+            "capacity": self.capacity,
+            "pending": self._pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": (self.total_queue_wait / self.calls * 1000) if self.calls else 0.0,
+            "avg_compute_ms": (self.total_compute / self.calls * 1000) if self.calls else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying executor; it is recreated lazily on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pool_kind=settings.PASSWORD_HASH_POOL,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,205 @@
+"""
+JWT encode/decode backends.
+
+Token checks run on every authenticated request, so the JWT implementation is
+pluggable and selected with the JWT_BACKEND setting:
+
+- ``jose``: python-jose, supports every algorithm in the key ring.
+- ``hmac``: a hand-rolled HS256/HS384/HS512 path on the standard library's
+  ``hmac`` with the key schedule precomputed once per key. Tokens signed with
+  asymmetric keys are delegated to the jose backend.
+
+Compare them with ``python -m benchmarks.jwt_backends``.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from calendar import timegm
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.keys import KeyRing, SigningKey
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, has a bad signature or invalid claims."""
+    pass
+
+
+class JWTBackend(ABC):
+    """Interface for encoding and verifying access tokens."""
+    name: str
+
+    @abstractmethod
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        """Sign claims with a key, adding its kid header if it has one."""
+
+    @abstractmethod
+    def decode(self, token: str, key_ring: KeyRing) -> dict:
+        """Verify a token against the key ring and return its claims."""
+
+
+def _verification_key(key_ring: KeyRing, header: dict) -> SigningKey:
+    """Look up the key named by an unverified header's kid, rejecting kids that are not strings."""
+    kid = header.get("kid")
+    if kid is not None and not isinstance(kid, str):
+        raise InvalidTokenError("Invalid kid header")
+    key = key_ring.verification_key(kid)
+    if key is None:
+        raise InvalidTokenError("Unknown signing key")
+    return key
+
+
+class JoseBackend(JWTBackend):
+    name = "jose"
+
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        headers = {"kid": key.kid} if key.kid else None
+        return jwt.encode(claims, key.signer, algorithm=key.algorithm, headers=headers)
+
+    def decode(self, token: str, key_ring: KeyRing) -> dict:
+        try:
+            key = _verification_key(key_ring, jwt.get_unverified_header(token))
+            return jwt.decode(token, key.verifier, algorithms=[key.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidTokenError("Invalid base64 segment") from e
+
+
+class HmacBackend(JWTBackend):
+    name = "hmac"
+
+    # Parsed headers are cached by their raw segment; only headers that resolve
+    # to a known key are cached, and the cache is bounded.
+    max_cached_headers = 128
+
+    def __init__(self, fallback: Optional[JWTBackend] = None):
+        self.fallback = fallback or JoseBackend()
+        self._macs: Dict[Tuple[bytes, str], "hmac.HMAC"] = {}
+        self._encoded_headers: Dict[Tuple[str, Optional[str]], str] = {}
+        self._decoded_headers: Dict[str, dict] = {}
+
+    def _mac(self, key: SigningKey) -> "hmac.HMAC":
+        cache_key = (key.secret, key.algorithm)
+        mac = self._macs.get(cache_key)
+        if mac is None:
+            mac = hmac.new(key.secret, digestmod=_HMAC_DIGESTS[key.algorithm])
+            self._macs[cache_key] = mac
+        return mac.copy()
+
+    def _header_segment(self, key: SigningKey) -> str:
+        cache_key = (key.algorithm, key.kid)
+        segment = self._encoded_headers.get(cache_key)
+        if segment is None:
+            header = {"alg": key.algorithm, "typ": "JWT"}
+            if key.kid:
+                header["kid"] = key.kid
+            segment = _b64encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+            self._encoded_headers[cache_key] = segment
+        return segment
+
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        if key.secret is None or key.algorithm not in _HMAC_DIGESTS:
+            return self.fallback.encode(claims, key)
+
+        claims = dict(claims)
+        for claim in _TIME_CLAIMS:
+            value = claims.get(claim)
+            if isinstance(value, datetime):
+                claims[claim] = timegm(value.utctimetuple())
+
+        signing_input = (
+            self._header_segment(key) + "."
+            + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        )
+        mac = self._mac(key)
+        mac.update(signing_input.encode("ascii"))
+        return signing_input + "." + _b64encode(mac.digest())
+
+    def _parse_header(self, segment: str) -> dict:
+        header = self._decoded_headers.get(segment)
+        if header is None:
+            try:
+                header = json.loads(_b64decode(segment))
+            except ValueError as e:
+                raise InvalidTokenError("Invalid header") from e
+            if not isinstance(header, dict):
+                raise InvalidTokenError("Invalid header")
+        return header
+
+    def decode(self, token: str, key_ring: KeyRing) -> dict:
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise InvalidTokenError("Not enough segments")
+        header_segment, payload_segment, signature_segment = parts
+
+        header = self._parse_header(header_segment)
+        key = _verification_key(key_ring, header)
+        if header.get("alg") != key.algorithm:
+            raise InvalidTokenError("The specified alg value is not allowed")
+        if key.secret is None or key.algorithm not in _HMAC_DIGESTS:
+            return self.fallback.decode(token, key_ring)
+
+        if header_segment not in self._decoded_headers and len(self._decoded_headers) < self.max_cached_headers:
+            self._decoded_headers[header_segment] = header
+
+        mac = self._mac(key)
+        mac.update(f"{header_segment}.{payload_segment}".encode())
+        if not hmac.compare_digest(mac.digest(), _b64decode(signature_segment)):
+            raise InvalidTokenError("Signature verification failed")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as e:
+            raise InvalidTokenError("Invalid payload") from e
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Invalid payload")
+
+        now = time.time()
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)) or exp < now:
+                raise InvalidTokenError("Signature has expired")
+        nbf = claims.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, (int, float)) or nbf > now:
+                raise InvalidTokenError("The token is not yet valid (nbf)")
+        return claims
+
+
+JWT_BACKENDS = {
+    JoseBackend.name: JoseBackend,
+    HmacBackend.name: HmacBackend,
+}
+
+
+def create_backend(name: str) -> JWTBackend:
+    """Instantiate a JWT backend by name."""
+    try:
+        return JWT_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JWT backend: {name}") from None
@@ -0,0 +1,154 @@
+"""
+JWT signing key ring.
+
+Access tokens are signed with the ring's active asymmetric key (ES256 by
+default) and carry its ``kid`` header, so other services can verify them
+locally against the published JWKS instead of sharing SECRET_KEY or calling
+back into this API.
+
+Keys move through three stages during a rotation:
+
+- ``next``: published in the JWKS but not used for signing yet, so verifiers
+  can pick it up before the first token signed with it appears.
+- ``active``: signs new tokens. Exactly one key may be active.
+- ``retired``: verify-only and still published until every token it signed has
+  expired, then removed from configuration.
+
+Without any configured keys the ring falls back to HS256 with SECRET_KEY.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import settings, SigningKeyConfig
+
+SYMMETRIC_ALGORITHM = "HS256"
+KEY_STATUSES = ("next", "active", "retired")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A key in the ring with its pre-constructed signer and verifier."""
+    kid: Optional[str]
+    algorithm: str
+    status: str
+    signer: Optional[Key]
+    verifier: Key
+    secret: Optional[bytes] = None  # Raw key material for symmetric keys only
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+
+class KeyRing:
+    """The set of keys used to sign and verify access tokens."""
+
+    def __init__(self, keys: List[SigningKey], fallback: Optional[SigningKey] = None):
+        active = [key for key in keys if key.status == "active"]
+        if len(active) > 1:
+            raise ValueError("Only one JWT signing key may be active")
+        if keys and not active:
+            raise ValueError("JWT signing keys are configured but none is active")
+
+        self._keys: Dict[str, SigningKey] = {key.kid: key for key in keys}
+        self.fallback = fallback
+        self.active: Optional[SigningKey] = active[0] if active else fallback
+        if self.active is None:
+            raise ValueError("No JWT signing key available")
+        if self.active.signer is None:
+            raise ValueError(f"Active JWT key {self.active.kid} has no private key")
+
+        fingerprint = json.dumps(
+            sorted((key.kid, key.algorithm, key.status) for key in keys)
+            + [self.fallback.algorithm if self.fallback else None]
+        )
+        if self.fallback is not None and self.fallback.secret is not None:
+            fingerprint += hashlib.sha256(self.fallback.secret).hexdigest()
+        self.version = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """Return the key that should verify a token with the given kid header."""
+        if kid is None:
+            return self.fallback
+        return self._keys.get(kid)
+
+    def jwks(self) -> dict:
+        """Return the public JSON Web Key Set for all published keys."""
+        keys = []
+        for key in self._keys.values():
+            public = key.verifier.to_dict()
+            public.update({"kid": key.kid, "use": "sig", "alg": key.algorithm})
+            keys.append(public)
+        return {"keys": keys}
+
+
+def _read_pem(inline: Optional[str], path: Optional[str]) -> Optional[str]:
+    if inline:
+        return inline
+    if path:
+        return Path(path).read_text()
+    return None
+
+
+def _load_key(config: SigningKeyConfig) -> SigningKey:
+    if config.status not in KEY_STATUSES:
+        raise ValueError(f"Invalid status for JWT key {config.kid}: {config.status}")
+
+    private_pem = _read_pem(
+        config.private_key.get_secret_value() if config.private_key else None,
+        config.private_key_file,
+    )
+    public_pem = _read_pem(config.public_key, config.public_key_file)
+
+    signer = jwk.construct(private_pem, config.algorithm) if private_pem else None
+    if signer is not None:
+        verifier = signer.public_key()
+    elif public_pem:
+        verifier = jwk.construct(public_pem, config.algorithm)
+    else:
+        raise ValueError(f"JWT key {config.kid} needs a private or public key")
+
+    return SigningKey(
+        kid=config.kid,
+        algorithm=config.algorithm,
+        status=config.status,
+        signer=signer,
+        verifier=verifier,
+    )
+
+
+def _symmetric_key(secret: str) -> SigningKey:
+    key = jwk.construct(secret, SYMMETRIC_ALGORITHM)
+    return SigningKey(
+        kid=None,
+        algorithm=SYMMETRIC_ALGORITHM,
+        status="active",
+        signer=key,
+        verifier=key,
+        secret=secret.encode(),
+    )
+
+
+def build_key_ring() -> KeyRing:
+    """Build the key ring from settings."""
+    keys = [_load_key(config) for config in settings.JWT_SIGNING_KEYS]
+    fallback = None
+    if not keys or settings.JWT_ACCEPT_SYMMETRIC_TOKENS:
+        fallback = _symmetric_key(settings.SECRET_KEY.get_secret_value())
+    return KeyRing(keys, fallback=fallback)
+
+
+key_ring = build_key_ring()
+
+
+def reload_key_ring() -> KeyRing:
+    """Rebuild the process-wide key ring, e.g. after a rotation."""
+    global key_ring
+    key_ring = build_key_ring()
+    return key_ring
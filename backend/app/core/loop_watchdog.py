@@ -0,0 +1,169 @@
+"""
+Event-loop blocking detector.
+
+A coroutine that runs sync work (CPU-bound hashing, a blocking driver call,
+a sync SQLAlchemy Session) stalls every other request on the worker until
+it returns. Such stalls are invisible in per-route latency because the
+victims, not the culprit, absorb most of the delay.
+
+When LOOP_WATCHDOG_ENABLED is set, a heartbeat callback on the event loop
+records the time every ``tick_interval``, and a daemon thread checks that
+timestamp. If the heartbeat is more than ``threshold`` late, the thread
+captures the loop thread's current stack and the route served by the task
+that is running, which are the code blocking the loop and the request that
+called it. When the loop recovers, the block is recorded in the
+``event_loop_block_seconds`` histogram and logged. The log is limited to one
+line per ``log_interval``, with a count of the blocks it suppressed.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def _route_label(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "<background>"
+    return getattr(scope.get("route"), "path", None) or "<unmatched>"
+
+
+class LoopWatchdog:
+    """Detects event-loop stalls from a monitor thread and attributes them to a route."""
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        tick_interval: Optional[float] = None,
+        log_interval: float = 10.0,
+        enabled: bool = False,
+    ):
+        self.threshold = threshold
+        self.tick_interval = tick_interval or threshold / 4
+        self.log_interval = log_interval
+        self.enabled = enabled
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._last_tick = 0.0
+        self._task_scopes: "WeakKeyDictionary[asyncio.Task, dict]" = WeakKeyDictionary()
+        self._stall: Optional[dict] = None
+        self._last_log = 0.0
+        self._suppressed = 0
+
+        self.blocks = 0
+        self.total_block_seconds = 0.0
+        self.max_block_seconds = 0.0
+        self.last_block_route: Optional[str] = None
+
+    def track(self, scope: dict) -> None:
+        """Remember which request the current task serves, for attribution."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_scopes[task] = scope
+
+    def _tick(self) -> None:
+        self._last_tick = time.monotonic()
+        self._handle = self._loop.call_later(self.tick_interval, self._tick)
+
+    def _capture(self, stalled_since: float) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = asyncio.current_task(self._loop)
+        return {
+            "since": stalled_since,
+            "stack": "".join(traceback.format_stack(frame)) if frame is not None else "",
+            "route": _route_label(self._task_scopes.get(task) if task is not None else None),
+            "task": task.get_name() if task is not None else None,
+        }
+
+    def _record(self, stall: dict, duration: float) -> None:
+        self.blocks += 1
+        self.total_block_seconds += duration
+        self.max_block_seconds = max(self.max_block_seconds, duration)
+        self.last_block_route = stall["route"]
+        EVENT_LOOP_BLOCK_SECONDS.labels(stall["route"]).observe(duration)
+
+        now = time.monotonic()
+        if now - self._last_log < self.log_interval:
+            self._suppressed += 1
+            return
+        suppressed = f" ({self._suppressed} more since the last report)" if self._suppressed else ""
+        logger.warning(
+            f"Event loop blocked for {duration * 1000:.0f}ms in {stall['route']} "
+            f"(task {stall['task']}){suppressed}; stack when detected:\n{stall['stack']}"
+        )
+        self._last_log = now
+        self._suppressed = 0
+
+    def _monitor(self) -> None:
+        while not self._stopping.wait(self.tick_interval):
+            last_tick = self._last_tick
+            due = last_tick + self.tick_interval
+            if self._stall is None:
+                if time.monotonic() - due > self.threshold:
+                    self._stall = self._capture(due)
+            elif last_tick > self._stall["since"]:
+                stall, self._stall = self._stall, None
+                self._record(stall, last_tick - stall["since"])
+
+    def start(self) -> None:
+        """Start the heartbeat on the running loop and the monitor thread."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._tick()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "blocks": self.blocks,
+            "total_block_ms": self.total_block_seconds * 1000,
+            "max_block_ms": self.max_block_seconds * 1000,
+            "last_block_route": self.last_block_route,
+        }
+
+
+class LoopWatchdogMiddleware:
+    """ASGI middleware that lets the watchdog attribute stalls to the request being served."""
+
+    def __init__(self, app, watchdog: LoopWatchdog):
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.watchdog.enabled:
+            self.watchdog.track(scope)
+        await self.app(scope, receive, send)
+
+
+loop_watchdog = LoopWatchdog(
+    threshold=settings.LOOP_WATCHDOG_THRESHOLD_MS / 1000,
+    log_interval=settings.LOOP_WATCHDOG_LOG_INTERVAL_SECONDS,
+    enabled=settings.LOOP_WATCHDOG_ENABLED,
+)
@@ -0,0 +1,125 @@
+"""
+Prometheus metrics for the HTTP, database and crypto hot paths.
+
+Under gunicorn every worker is a separate process, so metrics are only
+meaningful when aggregated across them. When PROMETHEUS_MULTIPROC_DIR is set
+(gunicorn_conf.py sets it), prometheus_client writes every worker's samples
+to memory-mapped files in that directory and /internal/metrics merges them on
+each scrape. Without it, such as under a single uvicorn process, the default
+in-process registry is served.
+
+Recording a sample is a dictionary lookup plus a lock-protected add, cheap
+enough for per-statement use. Route labels use the matched route template,
+never the raw path, so label cardinality stays bounded.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+CRYPTO_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time",
+    ["operation"], buckets=DB_BUCKETS,
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request", "SQL statements executed while serving one HTTP request",
+    ["route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time, split into queue wait and compute",
+    ["operation", "phase"], buckets=CRYPTO_BUCKETS,
+)
+JWT_SECONDS = Histogram(
+    "jwt_duration_seconds", "Access token signing and verification time",
+    ["operation", "outcome"], buckets=CRYPTO_BUCKETS,
+)
+EVENT_LOOP_BLOCK_SECONDS = Histogram(
+    "event_loop_block_seconds", "Event-loop stalls detected by the loop watchdog, by route",
+    ["route"], buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+SESSION_OPERATIONS = Counter(
+    "session_operations_total", "UserSessionService operations by outcome",
+    ["operation", "outcome"],
+)
+
+_SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+_request_statements: ContextVar[Optional[list]] = ContextVar("request_statements", default=None)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Return the exposition text for every worker's metrics and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _sql_operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    DB_STATEMENT_SECONDS.labels(_sql_operation(statement)).observe(time.perf_counter() - context._metrics_started)
+    counter = _request_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement an engine executes and count it against the current request."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and SQL statements per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        statements = [0]
+        token = _request_statements.set(statements)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_statements.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(elapsed)
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(statements[0])
@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination.
+
+Offset pagination makes the database walk and discard every row before the
+requested page, and a COUNT(*) per page scans the whole result. Keyset
+pagination instead remembers the sort key of the last row served and resumes
+with ``WHERE (key, id) > (:key, :id) ORDER BY key, id LIMIT n``, which is an
+index range scan whose cost does not depend on how deep the page is.
+
+Cursors are opaque to clients: the key values are JSON-encoded and signed with
+an HMAC derived from SECRET_KEY, so a client cannot forge a cursor to jump into
+rows it was not served or to inject arbitrary comparison values.
+"""
+import base64
+import binascii
+import enum
+import hashlib
+import hmac
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+
+T = TypeVar("T")
+
+_SIGNATURE_BYTES = 12
+_signing_key = hmac.new(
+    settings.SECRET_KEY.get_secret_value().encode(), b"pagination-cursor", hashlib.sha256
+).digest()
+
+
+def _encode_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["uuid", value.hex]
+    if isinstance(value, enum.Enum):
+        return ["v", value.value]
+    return ["v", value]
+
+
+def _decode_value(tagged: list) -> Any:
+    kind, value = tagged
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "uuid":
+        return uuid.UUID(value)
+    return value
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_signing_key, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode and sign the sort key of the last row on a page."""
+    payload = json.dumps([_encode_value(value) for value in key], separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """Verify a cursor and return its sort key. Raises ValidationError if it was tampered with."""
+    try:
+        payload_segment, signature_segment = cursor.split(".")
+        payload = _b64decode(payload_segment)
+        if not hmac.compare_digest(_sign(payload), _b64decode(signature_segment)):
+            raise ValidationError("Invalid pagination cursor")
+        return tuple(_decode_value(tagged) for tagged in json.loads(payload))
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValidationError("Invalid pagination cursor") from e
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of keyset-paginated results."""
+    items: List[T]
+    next_cursor: Optional[str]
+    limit: int
+    approximate_total: Optional[int] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper so a statement can be costed with its bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_total(db: AsyncSession, query: Select) -> Optional[int]:
+    """
+    Estimate the number of rows a query returns from the planner's statistics.
+
+    Costs one planning pass instead of a COUNT(*) over every matching row. The
+    figure is only as fresh as the last ANALYZE and is meant for "about N
+    results" displays.
+    """
+    result = await db.execute(_Explain(query.order_by(None)))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (LookupError, TypeError, ValueError):
+        return None
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    key: Sequence[Any],
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    with_total: bool = False,
+) -> Page:
+    """
+    Fetch one page of a query ordered by a unique key.
+
+    Args:
+        db: Database session
+        query: Filtered select without ORDER BY or LIMIT
+        key: Columns forming a unique sort key, ending with a unique column such as id
+        limit: Maximum number of items on the page
+        cursor: next_cursor from the previous page, or None for the first page
+        descending: Sort the whole key descending instead of ascending
+        with_total: Also return the planner's estimate of the total number of rows
+
+    Returns:
+        Page with the items and the cursor for the next page, if there is one
+    """
+    approximate_total = await estimate_total(db, query) if with_total else None
+
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if len(after) != len(key):
+            raise ValidationError("Invalid pagination cursor")
+        boundary = tuple_(*key) < tuple_(*after) if descending else tuple_(*key) > tuple_(*after)
+        query = query.where(boundary)
+
+    order = [column.desc() for column in key] if descending else list(key)
+    # Fetch one extra row to learn whether another page exists without counting
+    result = await db.execute(query.order_by(*order).limit(limit + 1))
+    rows = list(result.scalars().all()) if len(result.keys()) == 1 else list(result.all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key])
+
+    return Page(items=rows, next_cursor=next_cursor, limit=limit, approximate_total=approximate_total)
@@ -0,0 +1,40 @@
+import uuid
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class AuthPrincipal:
+    """
+    The authenticated caller, as seen by the auth dependency chain.
+
+    A plain slotted value object instead of an ORM User: no identity map
+    registration, instance state or relationship proxies per request. It is
+    also what the principal cache stores.
+    """
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_verified: bool
+    organization_ids: Tuple[uuid.UUID, ...] = ()
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict for caching."""
+        return {
+            "id": str(self.id),
+            "email": self.email,
+            "is_active": self.is_active,
+            "is_verified": self.is_verified,
+            "organization_ids": [str(org_id) for org_id in self.organization_ids],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AuthPrincipal":
+        """Rebuild a principal from its cached representation."""
+        return cls(
+            id=uuid.UUID(data["id"]),
+            email=data["email"],
+            is_active=data["is_active"],
+            is_verified=data["is_verified"],
+            organization_ids=tuple(uuid.UUID(org_id) for org_id in data["organization_ids"]),
+        )
@@ -0,0 +1,192 @@
+"""
+Two-tier cache of authenticated principals keyed by the JWT subject.
+
+The first tier is an in-process TTL LRU that answers repeat lookups without any
+I/O. The second tier is Redis, shared by every worker, so a principal loaded by
+one worker is available to the others without a database round trip. Entries
+are invalidated when a User row is committed with changes.
+
+Invalidation follows ORM unit-of-work changes only. Bulk statements such as
+``update(User)`` or ``delete(Membership)`` bypass the flush hooks, so code
+issuing them must call ``principal_cache.invalidate()`` for the affected
+users itself; otherwise stale principals are served for up to the Redis TTL.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.membership import Membership
+from app.models.organization import Organization
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """In-process TTL LRU in front of a shared Redis tier."""
+
+    def __init__(
+        self,
+        local_ttl: float = 5.0,
+        local_max_entries: int = 10000,
+        redis_ttl: int = 300,
+        key_prefix: str = "auth:principal:",
+    ):
+        self.local_ttl = local_ttl
+        self.local_max_entries = local_max_entries
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        self.redis: Optional[Redis] = None
+        self._local: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    def bind(self, redis_client: Optional[Redis]) -> None:
+        """Attach (or detach) the shared Redis tier."""
+        self.redis = redis_client
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        """Return the cached principal data for a user, or None on a miss."""
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                self.local_hits += 1
+                return data
+            del self._local[user_id]
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self.key_prefix + user_id)
+            except (RedisError, OSError) as e:
+                self.redis_errors += 1
+                logger.warning(f"Principal cache Redis lookup failed: {e}")
+                raw = None
+            if raw is not None:
+                data = json.loads(raw)
+                self._store_local(user_id, data)
+                self.redis_hits += 1
+                return data
+
+        self.misses += 1
+        return None
+
+    async def set(self, user_id: str, data: dict) -> None:
+        """Store principal data in both tiers."""
+        self._store_local(user_id, data)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.key_prefix + user_id, json.dumps(data), ex=self.redis_ttl)
+            except (RedisError, OSError) as e:
+                self.redis_errors += 1
+                logger.warning(f"Principal cache Redis write failed: {e}")
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user's principal from both tiers."""
+        self.invalidate_local(user_id)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self.key_prefix + user_id)
+            except (RedisError, OSError) as e:
+                self.redis_errors += 1
+                logger.warning(f"Principal cache Redis invalidation failed: {e}")
+
+    def invalidate_local(self, user_id: str) -> None:
+        """Drop a user's principal from the in-process tier only."""
+        self.invalidations += 1
+        self._local.pop(user_id, None)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def _store_local(self, user_id: str, data: dict) -> None:
+        self._local[user_id] = (time.monotonic() + self.local_ttl, data)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for both tiers."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+        }
+
+
+principal_cache = PrincipalCache(
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    local_max_entries=settings.PRINCIPAL_CACHE_LOCAL_MAX_ENTRIES,
+    redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL_SECONDS,
+)
+
+
+# --- Invalidation on User changes ---
+
+_PENDING_KEY = "principal_cache_invalidate"
+
+# Redis invalidations in progress; the event loop only keeps weak references to tasks
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+def _invalidation_done(task: asyncio.Task) -> None:
+    _invalidation_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Principal cache invalidation failed: {task.exception()}")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """Remember which principals were changed in this transaction."""
+    pending: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            pending.add(str(obj.id))
+    # Organization ids are part of the principal
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Membership) and obj.user_id is not None:
+            pending.add(str(obj.user_id))
+        elif isinstance(obj, Organization) and obj.owner_id is not None:
+            pending.add(str(obj.owner_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    """Invalidate cached principals once the user changes are durable."""
+    pending: Set[str] = session.info.pop(_PENDING_KEY, set())
+    if not pending:
+        return
+    for user_id in pending:
+        principal_cache.invalidate_local(user_id)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for user_id in pending:
+        task = loop.create_task(principal_cache.invalidate(user_id))
+        _invalidation_tasks.add(task)
+        task.add_done_callback(_invalidation_done)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
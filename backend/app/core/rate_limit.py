@@ -0,0 +1,172 @@
+"""
+Sliding-window rate limiting.
+
+Each check is one atomic Lua script in Redis, so every worker enforces the same
+limit. A key keeps the timestamps of the hits inside its window in a sorted set;
+a request is allowed only if every key it is checked against is under its
+limit, and it is then recorded against all of them. Rejected requests are not
+recorded, so a client that keeps hammering does not extend its own lockout.
+
+If Redis is unavailable, checks fall back to the same algorithm in process
+memory. The fallback is per worker, so the effective limit becomes the
+configured limit times the number of workers, which still caps a burst.
+"""
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one sorted set per limit. ARGV: member, then a (limit, window_ms) pair per key.
+# Returns {allowed, retry_after_ms}.
+SLIDING_WINDOW_LUA = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return {0, retry_after}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[i * 2 + 1])
+end
+return {1, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """At most ``limit`` hits per ``window_seconds`` for one key."""
+    key: str
+    limit: int
+    window_seconds: float
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    An endpoint's limit, applied per client IP, per submitted email or to the route as a whole.
+
+    The policy name is part of the key, so policies with different names never
+    share counters.
+    """
+    name: str
+    limit: int
+    window_seconds: float
+    key_by: str = "ip"  # "ip", "email" or "route"
+
+
+class _LocalSlidingWindows:
+    """In-process fallback with the same semantics as SLIDING_WINDOW_LUA."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def hit(self, limits: Sequence[RateLimit]) -> Tuple[bool, float]:
+        now = time.monotonic()
+        retry_after = 0.0
+        windows: List[Deque[float]] = []
+        for limit in limits:
+            hits = self._hits.get(limit.key)
+            if hits is None:
+                hits = self._hits[limit.key] = deque()
+            self._hits.move_to_end(limit.key)
+            while hits and hits[0] <= now - limit.window_seconds:
+                hits.popleft()
+            if len(hits) >= limit.limit:
+                retry_after = max(retry_after, hits[0] + limit.window_seconds - now)
+            windows.append(hits)
+
+        if retry_after <= 0:
+            for hits in windows:
+                hits.append(now)
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+        return retry_after <= 0, retry_after
+
+
+class RateLimiter:
+    """Redis sliding-window limiter with an in-process fallback."""
+
+    def __init__(self, enabled: bool = True, key_prefix: str = "ratelimit:", local_max_keys: int = 10000):
+        self.enabled = enabled
+        self.key_prefix = key_prefix
+        self.redis: Optional[Redis] = None
+        self._script = None
+        self._local = _LocalSlidingWindows(max_keys=local_max_keys)
+
+        self.checks = 0
+        self.rejected = 0
+        self.fallback_checks = 0
+        self.redis_errors = 0
+
+    def bind(self, redis_client: Optional[Redis]) -> None:
+        """Attach (or detach) the shared Redis counters."""
+        self.redis = redis_client
+        self._script = redis_client.register_script(SLIDING_WINDOW_LUA) if redis_client is not None else None
+
+    async def hit(self, limits: Sequence[RateLimit]) -> Tuple[bool, float]:
+        """
+        Record one hit against every limit, unless any of them is exhausted.
+
+        Returns:
+            (allowed, retry_after_seconds); retry_after is 0 when allowed
+        """
+        if not self.enabled or not limits:
+            return True, 0.0
+        self.checks += 1
+
+        allowed, retry_after = None, 0.0
+        if self._script is not None:
+            args = [uuid.uuid4().hex]
+            for limit in limits:
+                args += [limit.limit, int(limit.window_seconds * 1000)]
+            try:
+                result = await self._script(keys=[self.key_prefix + limit.key for limit in limits], args=args)
+            except (RedisError, OSError) as e:
+                self.redis_errors += 1
+                logger.warning(f"Rate limit check fell back to in-process limits: {e}")
+            else:
+                allowed, retry_after = bool(result[0]), int(result[1]) / 1000
+
+        if allowed is None:
+            self.fallback_checks += 1
+            allowed, retry_after = self._local.hit(limits)
+
+        if not allowed:
+            self.rejected += 1
+        return allowed, retry_after
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "fallback_checks": self.fallback_checks,
+            "redis_errors": self.redis_errors,
+            "local_keys": len(self._local),
+        }
+
+
+rate_limiter = RateLimiter(enabled=settings.RATE_LIMIT_ENABLED)
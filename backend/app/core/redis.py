@@ -0,0 +1,14 @@
+from fastapi import Request
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+
+def create_redis_client() -> Redis:
+    """Create the shared async Redis client; connections are opened lazily."""
+    return Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def get_redis_client(request: Request) -> Redis:
+    """FastAPI dependency that returns the Redis client created at startup."""
+    return request.app.state.redis_client
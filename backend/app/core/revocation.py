@@ -0,0 +1,143 @@
+"""
+Access-token revocation list.
+
+Access tokens are self-contained, so revoking a session does not by itself
+invalidate JWTs already issued for it. Revoked session IDs (the ``sid`` claim)
+and token IDs (``jti``) are recorded in a Redis sorted set scored by revocation
+time. Every worker mirrors that set in memory and pulls only entries newer than
+its last sync, so checking a token is a local set lookup with no I/O.
+
+An entry only needs to live as long as the longest access token it could
+affect, so entries older than ACCESS_TOKEN_EXPIRE_MINUTES are pruned.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """Redis-backed set of revoked session/token IDs with an in-memory mirror."""
+
+    def __init__(
+        self,
+        retention_seconds: float,
+        sync_interval: float = 2.0,
+        sync_overlap: float = 5.0,
+        key: str = "auth:revoked",
+    ):
+        self.retention_seconds = retention_seconds
+        self.sync_interval = sync_interval
+        # Re-read a small window before the watermark to tolerate clock skew between workers
+        self.sync_overlap = sync_overlap
+        self.key = key
+        self.redis: Optional[Redis] = None
+
+        self._revoked: Dict[str, float] = {}
+        self._unpublished: Dict[str, float] = {}
+        self._watermark = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def bind(self, redis_client: Optional[Redis]) -> None:
+        """Attach (or detach) the shared Redis set."""
+        self.redis = redis_client
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Check a decoded token's sid and jti claims against the local mirror."""
+        revoked = self._revoked
+        sid = payload.get("sid")
+        if sid is not None and sid in revoked:
+            return True
+        jti = payload.get("jti")
+        return jti is not None and jti in revoked
+
+    async def revoke(self, ids: Iterable[str]) -> None:
+        """Revoke session or token IDs locally and publish them to other workers."""
+        now = time.time()
+        entries = {revoked_id: now for revoked_id in ids}
+        if not entries:
+            return
+        self._revoked.update(entries)
+        self._unpublished.update(entries)
+        await self._publish()
+
+    async def _publish(self) -> None:
+        if self.redis is None or not self._unpublished:
+            return
+        pending = dict(self._unpublished)
+        try:
+            await self.redis.zadd(self.key, pending)
+        except (RedisError, OSError) as e:
+            self.sync_errors += 1
+            logger.warning(f"Failed to publish {len(pending)} revocations, will retry: {e}")
+            return
+        for revoked_id in pending:
+            self._unpublished.pop(revoked_id, None)
+
+    async def sync(self) -> None:
+        """Pull revocations newer than the last sync and prune expired entries."""
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        await self._publish()
+
+        if self.redis is not None:
+            try:
+                entries = await self.redis.zrangebyscore(
+                    self.key, max(self._watermark - self.sync_overlap, cutoff), "+inf", withscores=True
+                )
+                await self.redis.zremrangebyscore(self.key, "-inf", cutoff)
+            except (RedisError, OSError) as e:
+                self.sync_errors += 1
+                logger.warning(f"Revocation list sync failed: {e}")
+            else:
+                for revoked_id, revoked_at in entries:
+                    self._revoked[revoked_id] = revoked_at
+                    self._watermark = max(self._watermark, revoked_at)
+                self.syncs += 1
+
+        expired: Set[str] = {key for key, revoked_at in self._revoked.items() if revoked_at < cutoff}
+        for revoked_id in expired:
+            del self._revoked[revoked_id]
+
+    async def _run(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        """Start the background sync loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._revoked),
+            "unpublished": len(self._unpublished),
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
+
+
+revocation_list = RevocationList(
+    retention_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    sync_interval=settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+)
@@ -1,10 +1,15 @@
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core import keys
 from app.core.config import settings
+from app.core.jwt_backends import InvalidTokenError, create_backend
+from app.core.metrics import JWT_SECONDS
+from app.core.token_cache import token_cache
 
 # --- Password Hashing ---
 
@@ -24,8 +29,11 @@ def get_password_hash(password: str) -> str:
 
 # --- JSON Web Tokens (JWT) ---
 
+# Algorithm used when no asymmetric signing keys are configured
 ALGORITHM = "HS256"
 
+jwt_backend = create_backend(settings.JWT_BACKEND)
+
 
 def create_access_token(
     subject: str, expires_delta: Optional[timedelta] = None, additional_claims: Optional[dict] = None
@@ -33,6 +41,11 @@ def create_access_token(
     """
     Creates a new access token.
 
+    Every token gets a unique ``jti`` so it can be revoked individually;
+    tokens issued for a session should also pass its ID as the ``sid`` claim.
+    The token is signed with the key ring's active key. Asymmetric keys add
+    a ``kid`` header so verifiers can select the matching key from the JWKS.
+
     Args:
         subject (str): The subject of the token (e.g., user ID).
         expires_delta (Optional[timedelta]): The lifespan of the token. Defaults to settings.
@@ -48,13 +61,13 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
     if additional_claims:
         to_encode.update(additional_claims)
 
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY.get_secret_value(), algorithm=ALGORITHM
-    )
+    started = time.perf_counter()
+    encoded_jwt = jwt_backend.encode(to_encode, keys.key_ring.active)
+    JWT_SECONDS.labels("encode", "signed").observe(time.perf_counter() - started)
     return encoded_jwt
 
 
@@ -68,42 +81,32 @@ def decode_token(token: str) -> Optional[dict]:
     """
     Decodes a JWT token.
 
+    The verification key and algorithm are chosen from the ``kid`` header;
+    the token's own ``alg`` header must match the key's algorithm. Verified
+    payloads are cached until their ``exp`` so repeat callers skip
+    signature verification.
+
     Args:
         token (str): The JWT to decode.
 
     Returns:
         Optional[dict]: The decoded token payload if valid, otherwise None.
     """
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM]
-        )
-        return payload
-    except JWTError:
-        # This will catch expired tokens, invalid signatures, etc.
-        return None
+    started = time.perf_counter()
+    key_ring = keys.key_ring
+    if token_cache.enabled:
+        cached = token_cache.get(token, key_ring.version)
+        if cached is not None:
+            JWT_SECONDS.labels("decode", "cache_hit").observe(time.perf_counter() - started)
+            return cached
 
-# This provides better security through token rotation and session revocation capabilities.
-# See: 2.5.1-Backend-User-Session-Service.md for refresh token implementation.
-
-def decode_token(token: str) -> Optional[dict]:
-    """
-    Decodes a JWT token.
-    
-    Args:
-        token (str): The JWT to decode.
-        
-    Returns:
-        Optional[dict]: The decoded token payload if valid, otherwise None.
-    """
     try:
-        # Handle both SecretStr and regular str types for SECRET_KEY
-        secret_key = settings.SECRET_KEY
-        if hasattr(secret_key, 'get_secret_value'):
-            secret_key = secret_key.get_secret_value()
-        
-        payload = jwt.decode(token, str(secret_key), algorithms=[ALGORITHM])
+        payload = jwt_backend.decode(token, key_ring)
+        if token_cache.enabled:
+            token_cache.put(token, payload, key_ring.version)
+        JWT_SECONDS.labels("decode", "verified").observe(time.perf_counter() - started)
         return payload
-    except JWTError:
+    except InvalidTokenError:
         # This will catch expired tokens, invalid signatures, etc.
+        JWT_SECONDS.labels("decode", "invalid").observe(time.perf_counter() - started)
         return None
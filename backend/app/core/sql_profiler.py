@@ -0,0 +1,143 @@
+"""
+Per-request SQL profiler.
+
+When SQL_PROFILER_ENABLED is set, every statement executed while serving a
+request is timed and grouped by fingerprint: the SQL text with bind
+parameters, literals and IN-list lengths normalized away, so
+``WHERE id = $1`` issued once per row of a parent query shows up as a
+single fingerprint with a high count. That repetition is the signature of an
+N+1 query (a lazy relationship loaded inside a loop), and fingerprints
+repeated SQL_PROFILER_N_PLUS_ONE_THRESHOLD times or more are logged as
+warnings.
+
+The totals are returned in a ``Server-Timing`` header, where browser dev
+tools display them, and the full breakdown is logged at DEBUG. Tests use the
+same machinery through ``profile_queries()``.
+"""
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# A placeholder with an optional cast, as asyncpg renders typed binds: ?::UUID, ?::TIMESTAMP WITH TIME ZONE
+_BIND = r"\?(?:::[A-Z_]+(?: [A-Z_]+)*(?:\(\?(?:, ?\?)?\))?(?:\[\])?)?"
+_IN_LIST = re.compile(rf"\(\s*{_BIND}(?:\s*,\s*{_BIND})+\s*\)", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in parameters compare equal."""
+    normalized = _PLACEHOLDER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _IN_LIST.sub("(...)", normalized)
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class QueryProfile:
+    """Statements executed within one profiled scope, grouped by fingerprint."""
+    statements: Dict[str, StatementStats] = field(default_factory=dict)
+    count: int = 0
+    seconds: float = 0.0
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self.statements.setdefault(fingerprint(statement), StatementStats())
+        stats.count += 1
+        stats.seconds += seconds
+        self.count += 1
+        self.seconds += seconds
+
+    @property
+    def duplicates(self) -> Dict[str, int]:
+        """Fingerprints executed more than once, with their counts."""
+        return {sql: stats.count for sql, stats in self.statements.items() if stats.count > 1}
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return sorted(
+            ((sql, count) for sql, count in self.duplicates.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f}ms"]
+        for sql, stats in sorted(self.statements.items(), key=lambda item: -item[1].seconds):
+            lines.append(f"  {stats.count:>4}x {stats.seconds * 1000:8.1f}ms  {sql[:200]}")
+        return "\n".join(lines)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries, {len(self.duplicates)} repeated"'
+
+
+_active_profile: ContextVar[Optional[QueryProfile]] = ContextVar("active_query_profile", default=None)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Profile every statement executed in the current context until the block exits."""
+    profile = QueryProfile()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active_profile.get() is not None:
+        context._profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _active_profile.get()
+    started = getattr(context, "_profiler_started", None)
+    if profile is not None and started is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Feed an engine's (sync or async) statements to the active profile, if any."""
+    target = getattr(engine, "sync_engine", engine)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware that profiles each request's SQL and reports it via Server-Timing."""
+
+    def __init__(self, app, enabled: bool = False, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.enabled = enabled
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("server-timing", profile.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                request = f"{scope['method']} {scope['path']}"
+                for sql, count in profile.repeated(self.n_plus_one_threshold):
+                    logger.warning(f"Possible N+1 in {request}: {count}x {sql[:200]}")
+                if profile.count and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"SQL for {request}: {profile.report()}")
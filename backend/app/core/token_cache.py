@@ -0,0 +1,115 @@
+"""
+Cache of verified access-token payloads.
+
+Clients send the same bearer token on many consecutive requests. Caching the
+verified payload under a digest of the raw token lets decode_token skip base64
+decoding, signature verification and claim validation for repeat callers.
+Entries never outlive the token's ``exp`` and the whole cache is flushed when
+the signing key ring changes.
+"""
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+
+def _payload_size(digest: bytes, payload: dict) -> int:
+    """Approximate the memory held by one cache entry."""
+    size = sys.getsizeof(digest) + sys.getsizeof(payload)
+    for key, value in payload.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class TokenCache:
+    """Bounded LRU of verified token payloads keyed by a token digest."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, dict, int]]" = OrderedDict()
+        self._key_version: Optional[str] = None
+        self.approx_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str, key_version: str) -> Optional[dict]:
+        """Return a copy of the cached payload, or None on a miss."""
+        if key_version != self._key_version:
+            self.clear()
+            self._key_version = key_version
+            self.misses += 1
+            return None
+
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload, size = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.approx_bytes -= size
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return dict(payload)
+
+    def put(self, token: str, payload: dict, key_version: str) -> None:
+        """Cache a verified payload until its exp claim."""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or key_version != self._key_version:
+            return
+
+        digest = self._digest(token)
+        previous = self._entries.pop(digest, None)
+        if previous is not None:
+            self.approx_bytes -= previous[2]
+
+        size = _payload_size(digest, payload)
+        self._entries[digest] = (float(expires_at), dict(payload), size)
+        self.approx_bytes += size
+
+        while len(self._entries) > self.max_entries:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.approx_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        if self._entries:
+            self.flushes += 1
+        self._entries.clear()
+        self.approx_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "approx_bytes": self.approx_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "flushes": self.flushes,
+        }
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
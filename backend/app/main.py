@@ -1,22 +1,74 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.v1.exception_handlers import setup_exception_handlers
-from app.api.v1.endpoints import auth
+from app.api import internal, well_known
+from app.api.v1.endpoints import auth, exports
+from app.core.admission import AdmissionMiddleware, admission_controller
+from app.core.audit import audit_log
+from app.core.database import AsyncSessionLocal, engine
+from app.core.db_routing import PrimaryPinMiddleware
+from app.core.db_pool import pool_metrics
+from app.core.hashing import password_hasher
+from app.core.loop_watchdog import LoopWatchdogMiddleware, loop_watchdog
+from app.core.metrics import MetricsMiddleware
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import rate_limiter
+from app.core.redis import create_redis_client
+from app.core.revocation import revocation_list
+from app.core.sql_profiler import SQLProfilerMiddleware
+from app.services.partition_service import partition_keeper
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage startup and shutdown of process-wide resources."""
+    app.state.redis_client = create_redis_client()
+    principal_cache.bind(app.state.redis_client)
+    rate_limiter.bind(app.state.redis_client)
+    revocation_list.bind(app.state.redis_client)
+    revocation_list.start()
+    pool_metrics.start()
+    admission_controller.start()
+    loop_watchdog.start()
+    audit_log.bind(engine)
+    audit_log.start()
+    partition_keeper.bind(AsyncSessionLocal)
+    partition_keeper.start()
+    yield
+    await partition_keeper.stop()
+    partition_keeper.bind(None)
+    await audit_log.stop()
+    audit_log.bind(None)
+    loop_watchdog.stop()
+    await admission_controller.stop()
+    await pool_metrics.stop()
+    await revocation_list.stop()
+    revocation_list.bind(None)
+    rate_limiter.bind(None)
+    principal_cache.bind(None)
+    await app.state.redis_client.close()
+    password_hasher.shutdown(wait=False)
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc"
 )
 
+# Shed excess login/register work early; added first so shed responses still get CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 # Set up CORS middleware - Always allow localhost:3000 for development
 app.add_middleware(
     CORSMiddleware,
@@ -26,11 +78,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Pin clients to the primary right after they write, once a read replica is configured
+app.add_middleware(
+    PrimaryPinMiddleware,
+    pin_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    enabled=settings.DATABASE_READ_URL is not None,
+)
+
+# Opt-in per-request SQL fingerprinting with a Server-Timing header and N+1 warnings
+app.add_middleware(
+    SQLProfilerMiddleware,
+    enabled=settings.SQL_PROFILER_ENABLED,
+    n_plus_one_threshold=settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD,
+)
+
+# Lets the loop watchdog attribute event-loop stalls to the route being served
+app.add_middleware(LoopWatchdogMiddleware, watchdog=loop_watchdog)
+
+# Outermost, so latency and status also cover shed requests and CORS preflights
+app.add_middleware(MetricsMiddleware)
+
 # Register custom exception handlers
 setup_exception_handlers(app)
 
 # Include API routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Authentication"])
+app.include_router(exports.router, prefix=f"{settings.API_V1_STR}/organizations", tags=["Exports"])
+app.include_router(internal.router, prefix="/internal")
+app.include_router(well_known.router, prefix="/.well-known")
 
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -1,25 +1,45 @@
-from sqlalchemy import Column, String, JSON, ForeignKey
+import uuid
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base, BaseMixin
+from app.models.partitioning import create_partitions_with_table
 
 
 class AuditLog(Base, BaseMixin):
     """Audit log for tracking user actions and system events."""
     __tablename__ = 'audit_logs'
 
+    # The table is range-partitioned by month on created_at (retention drops
+    # whole partitions), so the partition key is part of the primary key.
+    id = Column(BaseMixin.id.type, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
+
     user_id = Column(BaseMixin.id.type, ForeignKey('users.id'), nullable=True)
     organization_id = Column(BaseMixin.id.type, ForeignKey('organizations.id'), nullable=True)
-    
+
     action = Column(String(100), nullable=False)  # e.g., 'user.login', 'user.update', 'organization.create'
     resource_type = Column(String(50), nullable=False)  # e.g., 'user', 'organization', 'project'
     resource_id = Column(String(100), nullable=True)  # ID of the affected resource
-    
-    # Additional context as JSON
-    context_data = Column(JSON, default={})
+
+    # Additional context as JSONB, queried with containment (context_data @> '{...}')
+    context_data = Column(JSONB, default={})
     ip_address = Column(String(45))  # IPv6 support
     user_agent = Column(String(500))
 
     # Relationships
     user = relationship('User', backref='audit_logs')
     organization = relationship('Organization', backref='audit_logs')
+
+    __table_args__ = (
+        Index('idx_audit_logs_org_created_at', 'organization_id', 'created_at'),
+        Index('idx_audit_logs_user_action_created_at', 'user_id', 'action', 'created_at'),
+        Index('idx_audit_logs_context_data', 'context_data', postgresql_using='gin',
+              postgresql_ops={'context_data': 'jsonb_path_ops'}),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+
+create_partitions_with_table(AuditLog.__table__)
@@ -0,0 +1,81 @@
+"""
+DDL for tables range-partitioned by month on created_at.
+
+Every monthly partition is a child table named ``<table>_pYYYYMM``. Each
+table also gets a ``<table>_default`` DEFAULT partition, so an insert whose
+month has no partition yet still lands somewhere instead of failing. Rows in
+the DEFAULT partition mean partition maintenance has fallen behind (see
+app/services/partition_service.py).
+"""
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import Table, event, text
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _with(storage_parameters: Optional[str]) -> str:
+    return f" WITH ({storage_parameters})" if storage_parameters else ""
+
+
+def month_partition_ddl(table: str, month: date, storage_parameters: Optional[str] = None) -> str:
+    """CREATE TABLE statement for one month's partition, with UTC month bounds."""
+    lower = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    upper_month = add_months(month, 1)
+    upper = datetime(upper_month.year, upper_month.month, 1, tzinfo=timezone.utc)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        + _with(storage_parameters)
+    )
+
+
+def default_partition_ddl(table: str, storage_parameters: Optional[str] = None) -> str:
+    """CREATE TABLE statement for a table's DEFAULT partition."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+        + _with(storage_parameters)
+    )
+
+
+def initial_partition_ddl(table: str, storage_parameters: Optional[str] = None,
+                          today: Optional[date] = None) -> List[str]:
+    """The DEFAULT partition plus the current month's, enough for a new table to accept rows."""
+    current = month_start(today or datetime.now(timezone.utc).date())
+    return [
+        month_partition_ddl(table, current, storage_parameters),
+        default_partition_ddl(table, storage_parameters),
+    ]
+
+
+def create_partitions_with_table(table: Table, storage_parameters: Optional[str] = None) -> None:
+    """
+    Create the initial partitions whenever metadata.create_all creates this table.
+
+    A partitioned parent without partitions rejects every insert, so tables
+    built by init_db.py or test fixtures would otherwise be unusable.
+    Alembic migrations create their partitions themselves.
+    """
+    def after_create(target, connection, **kw):
+        if connection.dialect.name != "postgresql":
+            return
+        for statement in initial_partition_ddl(target.name, storage_parameters):
+            connection.execute(text(statement))
+
+    event.listen(table, "after_create", after_create)
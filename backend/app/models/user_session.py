@@ -1,11 +1,18 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index, Integer, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index, Integer, Enum, UniqueConstraint, and_, func, text
 from sqlalchemy.orm import relationship
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
 import secrets
+import uuid
 import hashlib
+import hmac
 import enum
 
 from app.models.base import Base, BaseMixin
+from app.models.partitioning import add_months, create_partitions_with_table
+
+# Free space left on each partition page so refresh-token rotation stays a HOT update
+PARTITION_STORAGE_PARAMETERS = "fillfactor = 80"
 
 
 class SessionStatus(str, enum.Enum):
@@ -17,24 +24,30 @@ class SessionStatus(str, enum.Enum):
 class UserSession(Base, BaseMixin):
     __tablename__ = 'user_sessions'
     
+    # The table is range-partitioned by month on created_at, so the partition
+    # key is part of the primary key and of every unique constraint.
+    id = Column(BaseMixin.id.type, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
+    
     # Core identification
     user_id = Column(BaseMixin.id.type, ForeignKey('users.id'), nullable=False, index=True)
     
     # Session identification
-    session_id = Column(String(255), unique=True, nullable=False, index=True)
-    refresh_token_hash = Column(String(255), nullable=False, index=True)
+    session_id = Column(String(255), nullable=False)  # Unique with created_at, see __table_args__
+    refresh_token_hash = Column(String(255), nullable=False)  # Legacy opaque tokens
+    refresh_verifier_hash = Column(String(64), nullable=True)  # Verifier half of selector.verifier tokens
     
     # Device and client information
-    device_id = Column(String(255), nullable=True, index=True)
+    device_id = Column(String(255), nullable=True)
     device_name = Column(String(255), nullable=True)  # "iPhone 12", "Chrome on Windows"
     device_type = Column(String(50), nullable=True)   # "mobile", "desktop", "tablet"
     user_agent = Column(Text, nullable=True)
     ip_address = Column(String(45), nullable=True)    # IPv6 compatible
     
     # Session lifecycle
-    expires_at = Column(DateTime, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
     last_activity_at = Column(DateTime, nullable=False, default=datetime.utcnow)
-    status = Column(Enum(SessionStatus), default=SessionStatus.ACTIVE, nullable=False, index=True)
+    status = Column(Enum(SessionStatus), default=SessionStatus.ACTIVE, nullable=False)
     
     # Revocation tracking
     revoked_at = Column(DateTime, nullable=True)
@@ -47,31 +60,99 @@ class UserSession(Base, BaseMixin):
     # Relationships
     user = relationship('User', back_populates='sessions')
     
-    # Indexes for performance
+    # Indexes for performance. Refresh-token rotation writes refresh_verifier_hash,
+    # expires_at, last_activity_at and refresh_count, so none of those columns is
+    # indexed (not even in a partial-index predicate) and rotation can be a HOT
+    # update that touches no index at all.
     __table_args__ = (
-        Index('idx_user_sessions_user_status', 'user_id', 'status'),
-        Index('idx_user_sessions_expires_at', 'expires_at'),
-        Index('idx_user_sessions_session_id_status', 'session_id', 'status'),
+        # Selector lookups on refresh and logout
+        UniqueConstraint('session_id', 'created_at', name='uq_user_sessions_session_id_created_at'),
+        # Session limit on login, active session listing and "log out everywhere"
+        Index('idx_user_sessions_active_user', 'user_id', postgresql_where=text("status = 'ACTIVE'")),
+        # Legacy opaque refresh tokens, until LEGACY_REFRESH_TOKENS_ACCEPTED is turned off
+        Index('idx_user_sessions_active_refresh_token_hash', 'refresh_token_hash',
+              postgresql_where=text("status = 'ACTIVE'")),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
     
     @classmethod
-    def generate_session_id(cls) -> str:
-        """Generate a secure session ID."""
-        return secrets.token_urlsafe(32)
+    def generate_session_id(cls, created_at: Optional[datetime] = None) -> str:
+        """
+        Generate a secure session ID, prefixed with the UTC month it was created in.
+
+        session_id is only unique together with created_at, so a lookup by
+        session_id alone probes every partition's index. The month prefix
+        lets session_id_matches() bound created_at to one partition.
+        """
+        month = created_at or datetime.now(timezone.utc)
+        return f"{month:%Y%m}~{secrets.token_urlsafe(32)}"
+    
+    @classmethod
+    def session_id_month(cls, session_id: str) -> Optional[date]:
+        """The creation month encoded in a session ID, or None for IDs issued without one."""
+        prefix, sep, _ = session_id.partition("~")
+        if not sep or len(prefix) != 6 or not prefix.isdigit():
+            return None
+        try:
+            return date(int(prefix[:4]), int(prefix[4:]), 1)
+        except ValueError:
+            return None
+    
+    @classmethod
+    def session_id_matches(cls, session_id: str):
+        """WHERE clause for one session ID, bounded to its partition when the ID carries its month."""
+        clause = cls.session_id == session_id
+        month = cls.session_id_month(session_id)
+        if month is None:
+            return clause
+        upper = add_months(month, 1)
+        return and_(
+            clause,
+            cls.created_at >= datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+            cls.created_at < datetime(upper.year, upper.month, 1, tzinfo=timezone.utc),
+        )
     
     @classmethod
     def hash_refresh_token(cls, refresh_token: str) -> str:
         """Hash the refresh token for secure storage."""
         return hashlib.sha256(refresh_token.encode()).hexdigest()
     
+    @classmethod
+    def generate_verifier(cls) -> str:
+        """Generate the secret half of a selector.verifier refresh token."""
+        return secrets.token_urlsafe(48)
+    
+    @classmethod
+    def build_refresh_token(cls, session_id: str, verifier: str) -> str:
+        """Join a selector (the session ID) and a verifier into a refresh token."""
+        return f"{session_id}.{verifier}"
+    
+    @classmethod
+    def split_refresh_token(cls, refresh_token: str) -> Optional[Tuple[str, str]]:
+        """
+        Split a refresh token into (selector, verifier).
+        
+        Returns None for legacy opaque tokens, which never contain a dot.
+        """
+        selector, sep, verifier = refresh_token.partition(".")
+        if not sep or not selector or not verifier:
+            return None
+        return selector, verifier
+    
     @classmethod
     def create_session(cls, user_id: str, device_info: dict = None) -> tuple['UserSession', str]:
-        """Create a new user session with refresh token."""
-        refresh_token = secrets.token_urlsafe(64)
+        """Create a new user session with a selector.verifier refresh token."""
+        # Set here rather than by the server default, so it agrees with the month in session_id
+        created_at = datetime.now(timezone.utc)
+        session_id = cls.generate_session_id(created_at)
+        verifier = cls.generate_verifier()
+        refresh_token = cls.build_refresh_token(session_id, verifier)
         session = cls(
             user_id=user_id,
-            session_id=cls.generate_session_id(),
+            created_at=created_at,
+            session_id=session_id,
             refresh_token_hash=cls.hash_refresh_token(refresh_token),
+            refresh_verifier_hash=cls.hash_refresh_token(verifier),
             expires_at=datetime.utcnow() + timedelta(days=30),  # 30 days
             device_id=device_info.get('device_id') if device_info else None,
             device_name=device_info.get('device_name') if device_info else None,
@@ -89,13 +170,21 @@ class UserSession(Base, BaseMixin):
             self.refresh_count < self.max_refresh_count
         )
     
+    def verify_refresh_verifier(self, verifier: str) -> bool:
+        """Check a verifier against the stored hash in constant time."""
+        if not self.refresh_verifier_hash:
+            return False
+        return hmac.compare_digest(self.hash_refresh_token(verifier), self.refresh_verifier_hash)
+    
     def refresh(self, extend_days: int = 30) -> str:
         """Refresh the session and return a new refresh token."""
         if not self.is_valid():
             raise ValueError("Cannot refresh invalid session")
         
-        new_refresh_token = secrets.token_urlsafe(64)
-        self.refresh_token_hash = self.hash_refresh_token(new_refresh_token)
+        verifier = self.generate_verifier()
+        new_refresh_token = self.build_refresh_token(self.session_id, verifier)
+        # Only the verifier rotates; once it is set, legacy opaque lookups no longer match this row
+        self.refresh_verifier_hash = self.hash_refresh_token(verifier)
         self.expires_at = datetime.utcnow() + timedelta(days=extend_days)
         self.last_activity_at = datetime.utcnow()
         self.refresh_count += 1
@@ -120,3 +209,6 @@ class UserSession(Base, BaseMixin):
             self.ip_address = ip_address
         if user_agent:
             self.user_agent = user_agent
+
+
+create_partitions_with_table(UserSession.__table__, storage_parameters=PARTITION_STORAGE_PARAMETERS)
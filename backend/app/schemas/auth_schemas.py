@@ -1,4 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 import uuid
 
 # Schema for the login request body
@@ -42,6 +44,18 @@ class Token(BaseModel):
     refresh_token: str
     token_type: str = "bearer"
 
+class SessionInfo(BaseModel):
+    """Schema for an active session in the session listing."""
+    id: uuid.UUID
+    device_name: Optional[str] = None
+    device_type: Optional[str] = None
+    ip_address: Optional[str] = None
+    created_at: datetime
+    last_activity_at: datetime
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 class LoginResponse(BaseModel):
     """The complete response for a successful login."""
     token: Token
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Generic, TypeVar, Optional, Any
 
 T = TypeVar('T')
@@ -19,7 +19,7 @@ class APISuccessResponse(BaseModel, Generic[T]):
     message: Optional[str] = None
 
 class PaginationParams(BaseModel):
-    """Schema for pagination parameters."""
+    """Schema for offset pagination parameters. Prefer CursorParams for large tables."""
     page: int = 1
     per_page: int = 20
     
@@ -36,3 +36,16 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page: int
     per_page: int
     pages: int
+
+class CursorParams(BaseModel):
+    """Schema for keyset pagination parameters."""
+    cursor: Optional[str] = None
+    limit: int = Field(default=20, ge=1, le=100)
+
+class CursorPage(BaseModel, Generic[T]):
+    """Schema for keyset-paginated API responses."""
+    items: list[T]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    limit: int
+    approximate_total: Optional[int] = None  # Planner estimate, only when requested
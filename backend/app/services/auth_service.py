@@ -1,21 +1,52 @@
+from sqlalchemy import true, union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.security import get_password_hash, verify_password
+from app.core.db_routing import read_only
+from app.core.hashing import password_hasher
+from app.core.principal import AuthPrincipal
 from app.models.user import User
+from app.models.membership import Membership
 from app.models.organization import Organization
 from app.schemas.user_schemas import UserCreate
 
 class AuthService:
+    # Not @read_only: login checks the password and is_active on this row, and a
+    # lagging replica would keep an old password or a deactivated account working.
     async def get_user_by_email(self, db: AsyncSession, *, email: str) -> User | None:
         """Asynchronously get a user by email."""
         result = await db.execute(select(User).filter(User.email == email))
         return result.scalars().first()
 
+    @read_only
+    async def get_principal(self, db: AsyncSession, *, user_id: str) -> AuthPrincipal | None:
+        """Asynchronously load the lightweight principal for a user with a column-projected query."""
+        org_ids = union(
+            select(Membership.organization_id.label("organization_id")).where(Membership.user_id == user_id),
+            select(Organization.id.label("organization_id")).where(Organization.owner_id == user_id),
+        ).subquery()
+        result = await db.execute(
+            select(User.id, User.email, User.is_active, User.is_verified, org_ids.c.organization_id)
+            .select_from(User)
+            .outerjoin(org_ids, true())
+            .where(User.id == user_id)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        principal_id, email, is_active, is_verified, _ = rows[0]
+        return AuthPrincipal(
+            id=principal_id,
+            email=email,
+            is_active=is_active,
+            is_verified=is_verified,
+            organization_ids=tuple(row.organization_id for row in rows if row.organization_id is not None),
+        )
+
     async def register(self, db: AsyncSession, *, user_create: UserCreate) -> User:
         """Asynchronously register a new user and create their organization."""
         # Create the user first
-        hashed_password = get_password_hash(user_create.password)
+        hashed_password = await password_hasher.hash(user_create.password)
         db_user = User(
             full_name=user_create.full_name,
             email=user_create.email,
@@ -44,7 +75,7 @@ class AuthService:
     async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> User | None:
         """Asynchronously authenticate a user."""
         user = await self.get_user_by_email(db, email=email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
@@ -0,0 +1,313 @@
+"""
+Monthly range-partition maintenance.
+
+Append-heavy tables such as user_sessions are partitioned by month on
+``created_at``, with one child table per month named ``<table>_pYYYYMM``.
+Partitions are created a few months ahead and, once a whole month is past
+retention, detached or dropped. Retention is then a catalog operation on one
+child table rather than a mass UPDATE/DELETE followed by vacuum.
+
+Each table also has a ``<table>_default`` DEFAULT partition as a safety net:
+if upcoming months were never created, inserts land there instead of
+failing. Every worker runs ensure_partitions at startup and periodically
+through ``partition_keeper``, so that should not happen. Rows in the DEFAULT
+partition are reported as a warning because a month's partition cannot be
+created while the DEFAULT partition holds rows for that month.
+"""
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.partitioning import (
+    add_months,
+    default_partition_ddl,
+    default_partition_name,
+    month_partition_ddl,
+    month_start,
+    partition_name,
+)
+from app.models.user_session import PARTITION_STORAGE_PARAMETERS
+
+logger = logging.getLogger(__name__)
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# First key of the advisory lock serializing partition DDL per table across workers
+PARTITION_LOCK_NAMESPACE = 7302
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """Retention policy for a table partitioned by month."""
+    name: str
+    retention_months: int
+    premake_months: int = 3
+    # SQL predicate; a partition holding any matching row is kept past retention
+    retain_if: Optional[str] = None
+    # Storage parameters for new partitions; partitioned parents cannot carry them
+    storage_parameters: Optional[str] = None
+
+
+@dataclass
+class PartitionMaintenanceResult:
+    """Partitions touched by one maintenance run."""
+    table: str
+    created: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    kept: List[str] = field(default_factory=list)
+
+
+def _check_identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid table name: {name}")
+    return name
+
+
+class PartitionService:
+    """Create and retire monthly partitions. Each DDL runs in its own short transaction."""
+
+    def __init__(self, db: AsyncSession, lock_timeout: str = "5s"):
+        self.db = db
+        # Partition DDL needs a brief exclusive lock on the parent; fail fast rather
+        # than queue every query on the table behind a long-running transaction.
+        self.lock_timeout = lock_timeout
+
+    async def _child_tables(self, table: str) -> List[str]:
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        )
+        return list(result.scalars())
+
+    async def list_partitions(self, table: str) -> List[Tuple[str, date]]:
+        """Return (partition name, month) for every monthly partition of a table."""
+        pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+        partitions = []
+        for name in await self._child_tables(table):
+            match = pattern.match(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    async def _create_child(self, table: str, name: str, ddl: str) -> Optional[str]:
+        # Workers run this concurrently at startup; the lock makes the existence check reliable
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:table))"),
+            {"namespace": PARTITION_LOCK_NAMESPACE, "table": table},
+        )
+        if name in await self._child_tables(table):
+            await self.db.rollback()
+            return None
+        await self.db.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+        await self.db.execute(text(ddl))
+        await self.db.commit()
+        logger.info(f"Created partition {name}")
+        return name
+
+    async def create_partition(
+        self, table: str, month: date, storage_parameters: Optional[str] = None
+    ) -> Optional[str]:
+        """Create the partition for one month; returns its name, or None if it already existed."""
+        table = _check_identifier(table)
+        return await self._create_child(
+            table, partition_name(table, month), month_partition_ddl(table, month, storage_parameters)
+        )
+
+    async def create_default_partition(self, table: str, storage_parameters: Optional[str] = None) -> Optional[str]:
+        """Create the DEFAULT partition; returns its name, or None if it already existed."""
+        table = _check_identifier(table)
+        return await self._create_child(
+            table, default_partition_name(table), default_partition_ddl(table, storage_parameters)
+        )
+
+    async def default_partition_has_rows(self, table: str) -> bool:
+        """Whether inserts have landed in the DEFAULT partition, meaning a month was missing."""
+        name = default_partition_name(_check_identifier(table))
+        if name not in await self._child_tables(table):
+            return False
+        return bool(await self.db.scalar(text(f"SELECT 1 FROM {name} LIMIT 1")))
+
+    async def ensure_partitions(self, spec: PartitionedTable, today: Optional[date] = None) -> List[str]:
+        """Make sure partitions exist from the current month through premake_months ahead, plus DEFAULT."""
+        current = month_start(today or datetime.now(timezone.utc).date())
+        created = []
+        for offset in range(spec.premake_months + 1):
+            name = await self.create_partition(
+                spec.name, add_months(current, offset), storage_parameters=spec.storage_parameters
+            )
+            if name:
+                created.append(name)
+        name = await self.create_default_partition(spec.name, storage_parameters=spec.storage_parameters)
+        if name:
+            created.append(name)
+        if await self.default_partition_has_rows(spec.name):
+            logger.warning(
+                f"{default_partition_name(spec.name)} holds rows: a month's partition was missing. "
+                f"Move those rows into monthly partitions; until then the months they cover cannot be created."
+            )
+        return created
+
+    async def retire_partitions(
+        self,
+        spec: PartitionedTable,
+        today: Optional[date] = None,
+        detach_only: bool = False,
+        dry_run: bool = False,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Detach or drop partitions whose whole month is older than the retention window.
+
+        Returns:
+            Tuple of (removed partition names, partitions kept because of retain_if)
+        """
+        table = _check_identifier(spec.name)
+        cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -spec.retention_months)
+        removed, kept = [], []
+
+        for name, month in await self.list_partitions(table):
+            if add_months(month, 1) > cutoff:
+                continue
+            try:
+                await self.db.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+                if spec.retain_if:
+                    blocking = await self.db.scalar(
+                        text(f"SELECT 1 FROM {name} WHERE {spec.retain_if} LIMIT 1")
+                    )
+                    if blocking:
+                        kept.append(name)
+                        logger.warning(f"Keeping partition {name} past retention: it still has live rows")
+                        await self.db.rollback()
+                        continue
+                if dry_run:
+                    await self.db.rollback()
+                elif detach_only:
+                    await self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                    await self.db.commit()
+                else:
+                    await self.db.execute(text(f"DROP TABLE {name}"))
+                    await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                raise
+            removed.append(name)
+            logger.info(f"{'Would remove' if dry_run else 'Detached' if detach_only else 'Dropped'} partition {name}")
+
+        return removed, kept
+
+    async def maintain(
+        self,
+        spec: PartitionedTable,
+        today: Optional[date] = None,
+        detach_only: bool = False,
+        dry_run: bool = False,
+    ) -> PartitionMaintenanceResult:
+        """Create upcoming partitions and retire expired ones for a table."""
+        result = PartitionMaintenanceResult(table=spec.name)
+        if not dry_run:
+            result.created = await self.ensure_partitions(spec, today=today)
+        result.removed, result.kept = await self.retire_partitions(
+            spec, today=today, detach_only=detach_only, dry_run=dry_run
+        )
+        return result
+
+
+PARTITIONED_TABLES = [
+    PartitionedTable(
+        name="user_sessions",
+        retention_months=settings.SESSION_PARTITION_RETENTION_MONTHS,
+        premake_months=settings.PARTITION_PREMAKE_MONTHS,
+        # Sessions refreshed continuously can outlive their creation month's retention
+        retain_if="status = 'ACTIVE' AND expires_at > (now() AT TIME ZONE 'utc')",
+        storage_parameters=PARTITION_STORAGE_PARAMETERS,
+    ),
+    PartitionedTable(
+        name="audit_logs",
+        retention_months=settings.AUDIT_RETENTION_MONTHS,
+        premake_months=settings.PARTITION_PREMAKE_MONTHS,
+    ),
+]
+
+
+class PartitionKeeper:
+    """
+    Creates upcoming partitions from inside each worker.
+
+    Runs ensure_partitions for every table at startup and then every
+    ``interval`` seconds, so a deployment that never schedules
+    `python -m app.tasks.maintenance partitions` still has partitions for
+    the coming months. Retiring old partitions drops data, so that stays
+    with the maintenance command.
+    """
+
+    def __init__(self, tables: List[PartitionedTable], interval: float = 21600.0):
+        self.tables = tables
+        self.interval = interval
+        self.session_factory: Optional[Callable[[], AsyncSession]] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.created = 0
+        self.errors = 0
+        self.last_run_at: Optional[datetime] = None
+
+    def bind(self, session_factory: Optional[Callable[[], AsyncSession]]) -> None:
+        self.session_factory = session_factory
+
+    async def run_once(self) -> List[str]:
+        """Ensure partitions for every table; failures are logged, not raised."""
+        created = []
+        for spec in self.tables:
+            try:
+                async with self.session_factory() as db:
+                    created.extend(await PartitionService(db).ensure_partitions(spec))
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to ensure partitions for {spec.name}: {e}")
+        self.runs += 1
+        self.created += len(created)
+        self.last_run_at = datetime.now(timezone.utc)
+        return created
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Ensure partitions in the background, so startup does not wait on the database."""
+        if self.session_factory is not None and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "created": self.created,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+partition_keeper = PartitionKeeper(PARTITIONED_TABLES, interval=settings.PARTITION_ENSURE_INTERVAL_SECONDS)
@@ -1,66 +1,80 @@
 import logging
 import secrets
-import hashlib
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, insert, select, text, update
 
 from app.core.config import settings
+from app.core.db_routing import read_only
 from app.core.exceptions import InvalidCredentialsError, ValidationError
+from app.core.metrics import SESSION_OPERATIONS
+from app.core.pagination import Page, paginate
+from app.core.revocation import revocation_list
 from app.models.user_session import UserSession, SessionStatus
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# First key of the per-user advisory lock taken while creating a session
+SESSION_LOCK_NAMESPACE = 7301
+
+# Session ids are UUIDs; the expired-session sweep walks this key space in ranges
+UUID_KEY_SPACE = 2 ** 128
+# Even with no row estimate, a sweep is never a single table-wide transaction
+MIN_SWEEP_RANGES = 16
+# On-disk size of a session row (about 240 bytes at fillfactor 80), used to
+# estimate the rows of partitions that have not been analyzed yet
+SESSION_ROW_BYTES = 256
+
+
+@dataclass
+class SessionSweepResult:
+    """Outcome of an expired-session sweep; pass last_key back in as resume_from to continue."""
+    count: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    last_key: Optional[uuid.UUID] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.count / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
 
 class UserSessionService:
     """Service for managing user sessions and refresh tokens."""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.max_sessions_per_user = getattr(settings, 'MAX_SESSIONS_PER_USER', 5)
         self.refresh_token_expire_days = getattr(settings, 'REFRESH_TOKEN_EXPIRE_DAYS', 30)
-    
-    def create_session(self, user_id: str, device_info: dict, 
-                      ip_address: Optional[str] = None) -> Tuple[UserSession, str]:
+        self.cleanup_batch_size = getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 1000)
+        self.legacy_tokens_accepted = getattr(settings, 'LEGACY_REFRESH_TOKENS_ACCEPTED', True)
+
+    async def create_session(self, user_id: str, device_info: dict,
+                             ip_address: Optional[str] = None) -> Tuple[UserSession, str]:
         """
         Create a new user session with refresh token.
-        
+
+        When the user already has MAX_SESSIONS_PER_USER active sessions, the
+        least recently used ones are revoked to make room. Logins for the same
+        user are serialized with a transaction-scoped advisory lock, and the
+        eviction and insert run as a single statement, so the limit holds
+        under concurrent logins.
+
         Args:
             user_id: The user's UUID
             device_info: Dictionary containing device metadata
             ip_address: Client IP address
-            
+
         Returns:
             Tuple of (UserSession, refresh_token_string)
-            
-        Raises:
-            ValidationError: If session limit exceeded
         """
         try:
-            # Check session limits
-            active_sessions_count = self.db.query(UserSession).filter(
-                and_(
-                    UserSession.user_id == user_id,
-                    UserSession.status == SessionStatus.ACTIVE,
-                    UserSession.expires_at > datetime.utcnow()
-                )
-            ).count()
-            
-            if active_sessions_count >= self.max_sessions_per_user:
-                # Terminate oldest session to make room
-                oldest_session = self.db.query(UserSession).filter(
-                    and_(
-                        UserSession.user_id == user_id,
-                        UserSession.status == SessionStatus.ACTIVE
-                    )
-                ).order_by(UserSession.last_activity_at.asc()).first()
-                
-                if oldest_session:
-                    self._terminate_session(oldest_session, "Session limit exceeded")
-            
-            # Use the UserSession model's create_session method
+            now = datetime.utcnow()
             session, refresh_token = UserSession.create_session(
                 user_id=user_id,
                 device_info={
@@ -71,207 +85,426 @@ class UserSessionService:
                     "ip_address": ip_address
                 }
             )
-            
-            self.db.add(session)
-            self.db.commit()
-            self.db.refresh(session)
-            
+            values = {}
+            for column in UserSession.__table__.columns:
+                value = getattr(session, column.key)
+                # Python-side defaults (id, status, counters) are not applied to a
+                # Core INSERT that carries a data-modifying CTE, so fill them in here
+                if value is None and column.default is not None and column.default.is_scalar:
+                    value = column.default.arg
+                elif value is None and column.default is not None and column.default.is_callable:
+                    value = column.default.arg(None)
+                if value is not None:
+                    values[column.key] = value
+            values["last_activity_at"] = now
+
+            # Serialize logins per user for the rest of the transaction. This has
+            # to be its own statement: under READ COMMITTED the statement below
+            # takes its snapshot when it starts, so a lock acquired inside it
+            # would not make a concurrent login's insert visible.
+            await self.db.execute(
+                select(func.pg_advisory_xact_lock(SESSION_LOCK_NAMESPACE, func.hashtext(str(user_id))))
+            )
+
+            # Keep the newest max-1 active sessions and revoke the rest, then
+            # insert the new one, all in one statement.
+            surplus = (
+                select(UserSession.id)
+                .where(
+                    and_(
+                        UserSession.user_id == user_id,
+                        UserSession.status == SessionStatus.ACTIVE,
+                        UserSession.expires_at > now
+                    )
+                )
+                .order_by(UserSession.last_activity_at.desc())
+                .offset(max(self.max_sessions_per_user - 1, 0))
+            )
+            evicted = (
+                update(UserSession)
+                .where(UserSession.id.in_(surplus.scalar_subquery()))
+                .values(
+                    status=SessionStatus.REVOKED,
+                    revoked_at=now,
+                    revoked_reason="Session limit exceeded"
+                )
+                .returning(UserSession.session_id)
+                .cte("evicted")
+            )
+            result = await self.db.execute(
+                insert(UserSession)
+                .values(**values)
+                .add_cte(evicted)
+                .returning(
+                    UserSession,
+                    select(func.array_agg(evicted.c.session_id)).scalar_subquery()
+                )
+            )
+            session, evicted_ids = result.one()
+            await self.db.commit()
+
+            SESSION_OPERATIONS.labels("create", "ok").inc()
+            if evicted_ids:
+                SESSION_OPERATIONS.labels("evict", "ok").inc(len(evicted_ids))
+                await revocation_list.revoke(evicted_ids)
+                logger.info(f"Terminated {len(evicted_ids)} sessions for user {user_id}: Session limit exceeded")
+
             logger.info(f"Created session {session.session_id} for user {user_id}")
-            
+
             return session, refresh_token
-            
+
         except Exception as e:
-            self.db.rollback()
+            SESSION_OPERATIONS.labels("create", "error").inc()
+            await self.db.rollback()
             logger.error(f"Failed to create session for user {user_id}: {e}")
             raise
-    
-    def refresh_session(self, refresh_token: str, 
-                       ip_address: Optional[str] = None) -> Tuple[UserSession, str]:
+
+    async def refresh_session(self, refresh_token: str,
+                              ip_address: Optional[str] = None) -> Tuple[UserSession, str]:
         """
         Refresh a session and rotate the refresh token.
-        
+
+        Refresh tokens have the form "<session_id>.<verifier>". The session is
+        located through the unique session_id index and only the verifier hash
+        is rotated. Validation, rotation and the activity bump happen in a
+        single UPDATE ... RETURNING statement, so two concurrent refreshes with
+        the same token cannot both succeed: the first one rotates the verifier
+        and the second no longer matches any row. Legacy opaque tokens are
+        still accepted while LEGACY_REFRESH_TOKENS_ACCEPTED is set and are
+        upgraded to the new format on their first refresh.
+
         Args:
             refresh_token: The current refresh token
             ip_address: Client IP address
-            
+
         Returns:
             Tuple of (UserSession, new_refresh_token)
-            
+
         Raises:
             InvalidCredentialsError: If refresh token is invalid or expired
         """
         try:
-            # Find session by refresh token hash
-            token_hash = self._hash_token(refresh_token)
-            session = self.db.query(UserSession).filter(
-                and_(
-                    UserSession.refresh_token_hash == token_hash,
-                    UserSession.status == SessionStatus.ACTIVE,
-                    UserSession.expires_at > datetime.utcnow()
+            now = datetime.utcnow()
+            new_verifier = UserSession.generate_verifier()
+
+            lookup = self._token_lookup(refresh_token)
+            if lookup is None:
+                logger.warning(f"Invalid refresh token attempt from IP {ip_address}")
+                raise InvalidCredentialsError("Invalid or expired refresh token")
+
+            values = {
+                "refresh_verifier_hash": UserSession.hash_refresh_token(new_verifier),
+                "expires_at": now + timedelta(days=self.refresh_token_expire_days),
+                "last_activity_at": now,
+                "refresh_count": UserSession.refresh_count + 1,
+            }
+            if ip_address:
+                values["ip_address"] = ip_address
+
+            result = await self.db.execute(
+                update(UserSession)
+                .where(
+                    and_(
+                        lookup,
+                        UserSession.status == SessionStatus.ACTIVE,
+                        UserSession.expires_at > now,
+                        UserSession.refresh_count < UserSession.max_refresh_count
+                    )
                 )
-            ).first()
-            
+                .values(**values)
+                .returning(UserSession)
+                .execution_options(synchronize_session=False)
+            )
+            session = result.scalars().first()
+
             if not session:
                 logger.warning(f"Invalid refresh token attempt from IP {ip_address}")
                 raise InvalidCredentialsError("Invalid or expired refresh token")
-            
-            # Check if session is valid using the model method
-            if not session.is_valid():
-                logger.warning(f"Session {session.session_id} is no longer valid")
-                raise InvalidCredentialsError("Session is no longer valid")
-            
-            # Check for suspicious activity (IP change)
-            if ip_address and session.ip_address and ip_address != session.ip_address:
-                logger.warning(f"IP address changed for session {session.session_id}: {session.ip_address} -> {ip_address}")
-                # Could implement additional security measures here
-            
-            # Use the UserSession model's refresh method
-            new_refresh_token = session.refresh()
-            
-            # Update IP address if provided
-            if ip_address:
-                session.update_activity(ip_address=ip_address)
-            
-            self.db.commit()
-            
+
+            await self.db.commit()
+            SESSION_OPERATIONS.labels("refresh", "ok").inc()
+
             logger.info(f"Refreshed session {session.session_id}")
-            
-            return session, new_refresh_token
-            
+
+            return session, UserSession.build_refresh_token(session.session_id, new_verifier)
+
         except Exception as e:
-            self.db.rollback()
+            SESSION_OPERATIONS.labels(
+                "refresh", "rejected" if isinstance(e, InvalidCredentialsError) else "error"
+            ).inc()
+            await self.db.rollback()
             logger.error(f"Failed to refresh session: {e}")
             raise
-    
-    def terminate_session(self, refresh_token: str) -> bool:
+
+    async def terminate_session(self, refresh_token: str) -> bool:
         """
         Terminate a session (logout).
-        
+
         Args:
             refresh_token: The refresh token to terminate
-            
+
         Returns:
             True if session was terminated, False if not found
         """
         try:
-            token_hash = self._hash_token(refresh_token)
-            session = self.db.query(UserSession).filter(
-                UserSession.refresh_token_hash == token_hash
-            ).first()
-            
+            parts = UserSession.split_refresh_token(refresh_token)
+            if parts is not None:
+                selector, verifier = parts
+                result = await self.db.execute(
+                    select(UserSession).where(UserSession.session_id_matches(selector))
+                )
+                session = result.scalars().first()
+                if session and not session.verify_refresh_verifier(verifier):
+                    session = None
+            elif self.legacy_tokens_accepted:
+                result = await self.db.execute(
+                    select(UserSession).where(
+                        and_(
+                            UserSession.refresh_token_hash == UserSession.hash_refresh_token(refresh_token),
+                            UserSession.refresh_verifier_hash.is_(None),
+                            UserSession.status == SessionStatus.ACTIVE
+                        )
+                    )
+                )
+                session = result.scalars().first()
+            else:
+                session = None
+
             if session:
                 session.revoke("User logout")
-                self.db.commit()
+                await self.db.commit()
+                await revocation_list.revoke([session.session_id])
                 logger.info(f"Terminated session {session.session_id}: User logout")
+                SESSION_OPERATIONS.labels("terminate", "ok").inc()
                 return True
-            
+
+            SESSION_OPERATIONS.labels("terminate", "not_found").inc()
             return False
-            
+
         except Exception as e:
-            self.db.rollback()
+            SESSION_OPERATIONS.labels("terminate", "error").inc()
+            await self.db.rollback()
             logger.error(f"Failed to terminate session: {e}")
             return False
-    
-    def terminate_all_sessions(self, user_id: str, except_session_id: Optional[str] = None) -> int:
+
+    async def terminate_all_sessions(self, user_id: str, except_session_id: Optional[str] = None) -> int:
         """
         Terminate all active sessions for a user.
-        
+
+        Runs as a single set-based UPDATE instead of loading and revoking
+        each session individually.
+
         Args:
             user_id: The user's UUID
             except_session_id: Optional session ID to keep active
-            
+
         Returns:
             Number of sessions terminated
         """
         try:
-            query = self.db.query(UserSession).filter(
-                and_(
-                    UserSession.user_id == user_id,
-                    UserSession.status == SessionStatus.ACTIVE
+            conditions = [
+                UserSession.user_id == user_id,
+                UserSession.status == SessionStatus.ACTIVE
+            ]
+            if except_session_id:
+                conditions.append(UserSession.session_id != except_session_id)
+
+            result = await self.db.execute(
+                update(UserSession)
+                .where(and_(*conditions))
+                .values(
+                    status=SessionStatus.REVOKED,
+                    revoked_at=datetime.utcnow(),
+                    revoked_reason="All sessions terminated"
                 )
+                .returning(UserSession.session_id)
+                .execution_options(synchronize_session=False)
             )
-            
-            if except_session_id:
-                query = query.filter(UserSession.session_id != except_session_id)
-            
-            sessions = query.all()
-            count = 0
-            
-            for session in sessions:
-                session.revoke("All sessions terminated")
-                count += 1
-            
-            if count > 0:
-                self.db.commit()
-            
+            session_ids = result.scalars().all()
+            count = len(session_ids)
+            await self.db.commit()
+            await revocation_list.revoke(session_ids)
+
             logger.info(f"Terminated {count} sessions for user {user_id}")
+            SESSION_OPERATIONS.labels("terminate_all", "ok").inc()
             return count
-            
+
         except Exception as e:
-            self.db.rollback()
+            SESSION_OPERATIONS.labels("terminate_all", "error").inc()
+            await self.db.rollback()
             logger.error(f"Failed to terminate sessions for user {user_id}: {e}")
             return 0
-    
-    def get_user_sessions(self, user_id: str, active_only: bool = True) -> List[UserSession]:
+
+    @read_only
+    async def get_user_sessions(self, user_id: str, active_only: bool = True) -> List[UserSession]:
         """
         Get all sessions for a user.
-        
+
         Args:
             user_id: The user's UUID
             active_only: If True, only return active sessions
-            
+
         Returns:
             List of UserSession objects
         """
-        query = self.db.query(UserSession).filter(UserSession.user_id == user_id)
-        
+        query = select(UserSession).where(UserSession.user_id == user_id)
+
         if active_only:
-            query = query.filter(
+            query = query.where(
                 and_(
                     UserSession.status == SessionStatus.ACTIVE,
                     UserSession.expires_at > datetime.utcnow()
                 )
             )
-        
-        return query.order_by(UserSession.last_activity_at.desc()).all()
-    
-    def cleanup_expired_sessions(self) -> int:
+
+        result = await self.db.execute(query.order_by(UserSession.last_activity_at.desc()))
+        return list(result.scalars().all())
+
+    @read_only
+    async def get_user_sessions_page(self, user_id: str, *, limit: int, cursor: Optional[str] = None,
+                                     with_total: bool = False) -> Page:
         """
-        Clean up expired sessions (maintenance task).
-        
+        Get one page of a user's active sessions, newest first.
+
+        Pages are keyed on (created_at, id), which never changes for a session,
+        so a refresh between two page requests cannot move a session across
+        pages.
+
+        Args:
+            user_id: The user's UUID
+            limit: Maximum number of sessions on the page
+            cursor: next_cursor from the previous page
+            with_total: Include the planner's estimate of the number of active sessions
+
+        Returns:
+            Page of UserSession objects
+        """
+        query = select(UserSession).where(
+            and_(
+                UserSession.user_id == user_id,
+                UserSession.status == SessionStatus.ACTIVE,
+                UserSession.expires_at > datetime.utcnow()
+            )
+        )
+        return await paginate(
+            self.db, query, (UserSession.created_at, UserSession.id),
+            limit=limit, cursor=cursor, descending=True, with_total=with_total,
+        )
+
+    async def _estimated_session_count(self) -> int:
+        """Estimated rows across all user_sessions partitions, from size where not yet analyzed."""
+        count = await self.db.scalar(
+            text(
+                "SELECT COALESCE(SUM(CASE WHEN c.reltuples > 0 THEN c.reltuples "
+                "ELSE pg_relation_size(c.oid) / :row_bytes END), 0) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'user_sessions'::regclass"
+            ),
+            {"row_bytes": SESSION_ROW_BYTES},
+        )
+        return int(count or 0)
+
+    async def cleanup_expired_sessions(
+        self,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+        resume_from: Optional[uuid.UUID] = None,
+    ) -> SessionSweepResult:
+        """
+        Mark expired sessions as EXPIRED (maintenance task).
+
+        expires_at is deliberately unindexed (it changes on every refresh), so
+        the sweep is a single pass over the id key space instead: it is cut
+        into ranges of roughly batch_size sessions, sized from the planner's
+        row estimate, and each batch checks the sessions of one range through
+        the partitions' primary key indexes in its own short transaction.
+        Every session is read once per sweep, however many are expired, and
+        an interrupted sweep continues from the returned last_key.
+
+        Args:
+            batch_size: Sessions examined per batch, defaults to SESSION_CLEANUP_BATCH_SIZE
+            max_batches: Optional limit on the number of batches in this run
+            resume_from: Optional session id to continue from
+
         Returns:
-            Number of sessions cleaned up
+            SessionSweepResult with row count, throughput and the key to resume from
+            (None once the whole key space has been swept)
         """
+        batch_size = batch_size or self.cleanup_batch_size
+        sweep = SessionSweepResult(last_key=resume_from)
+        cutoff = datetime.utcnow()
+        started = time.perf_counter()
+
         try:
-            expired_sessions = self.db.query(UserSession).filter(
-                and_(
+            ranges = max(MIN_SWEEP_RANGES, -(-await self._estimated_session_count() // batch_size))
+            width = -(-UUID_KEY_SPACE // ranges)
+            lower = resume_from.int if resume_from is not None else 0
+
+            while lower < UUID_KEY_SPACE and (max_batches is None or sweep.batches < max_batches):
+                upper = lower + width
+                conditions = [
                     UserSession.status == SessionStatus.ACTIVE,
-                    UserSession.expires_at <= datetime.utcnow()
+                    UserSession.expires_at <= cutoff,
+                    UserSession.id >= uuid.UUID(int=lower),
+                ]
+                if upper < UUID_KEY_SPACE:
+                    conditions.append(UserSession.id < uuid.UUID(int=upper))
+                batch = (
+                    select(UserSession.id, UserSession.created_at)
+                    .where(and_(*conditions))
+                    .with_for_update(skip_locked=True)
+                    .cte("expired_batch")
                 )
-            ).all()
-            
-            count = 0
-            for session in expired_sessions:
-                session.expire()
-                count += 1
-            
-            if count > 0:
-                self.db.commit()
-            
-            logger.info(f"Cleaned up {count} expired sessions")
-            return count
-            
+
+                result = await self.db.execute(
+                    update(UserSession)
+                    # created_at is the partition key, so each row is updated in its own partition only
+                    .where(and_(UserSession.id == batch.c.id, UserSession.created_at == batch.c.created_at))
+                    .values(status=SessionStatus.EXPIRED, expires_at=cutoff)
+                    .returning(batch.c.id)
+                    .execution_options(synchronize_session=False)
+                )
+                sweep.count += len(result.scalars().all())
+                await self.db.commit()
+
+                sweep.batches += 1
+                lower = upper
+                sweep.last_key = uuid.UUID(int=upper) if upper < UUID_KEY_SPACE else None
+
         except Exception as e:
-            self.db.rollback()
-            logger.error(f"Failed to cleanup expired sessions: {e}")
-            return 0
-    
-    def _terminate_session(self, session: UserSession, reason: str):
-        """Internal method to terminate a session."""
-        session.revoke(reason)
-        self.db.commit()
-        logger.info(f"Terminated session {session.session_id}: {reason}")
-    
-    def _hash_token(self, token: str) -> str:
-        """Hash a token for secure storage."""
-        return hashlib.sha256(token.encode()).hexdigest()
+            await self.db.rollback()
+            logger.error(f"Failed to cleanup expired sessions after {sweep.count} rows: {e}")
+
+        sweep.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Cleaned up {sweep.count} expired sessions in {sweep.batches} batches "
+            f"({sweep.rows_per_second:.0f} rows/sec)"
+        )
+        return sweep
+
+    def _token_lookup(self, refresh_token: str):
+        """
+        Build the WHERE clause that matches the session owning a refresh token.
+
+        Selector/verifier tokens match on session_id plus the SHA-256 of the
+        verifier. Only digests of a high-entropy secret are compared in SQL,
+        so comparison timing reveals nothing about the verifier itself.
+
+        session_id is only unique together with the partition key, so a bare
+        session_id lookup probes the index of every monthly partition. The
+        creation month in the selector bounds created_at, letting the planner
+        skip the other partitions; selectors issued before the month prefix
+        still match, at the cost of probing every partition.
+        """
+        parts = UserSession.split_refresh_token(refresh_token)
+        if parts is not None:
+            selector, verifier = parts
+            return and_(
+                UserSession.session_id_matches(selector),
+                UserSession.refresh_verifier_hash == UserSession.hash_refresh_token(verifier)
+            )
+        if self.legacy_tokens_accepted:
+            return and_(
+                UserSession.refresh_token_hash == UserSession.hash_refresh_token(refresh_token),
+                UserSession.refresh_verifier_hash.is_(None)
+            )
+        return None
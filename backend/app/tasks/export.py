@@ -0,0 +1,55 @@
+"""
+Stream an organization's audit log or session history to a file or stdout.
+
+    python -m app.tasks.export audit_logs --organization-id UUID [--format csv] [--gzip]
+        [--since ISO] [--until ISO] [--fetch-size N] [--output FILE]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import datetime
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.export_service import EXPORT_DATASETS, EXPORT_FORMATS, ExportService
+
+logger = logging.getLogger(__name__)
+
+
+async def export(args: argparse.Namespace) -> None:
+    """Write every chunk of the export as soon as it is produced."""
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async with AsyncSessionLocal() as db:
+            chunks = ExportService(db, fetch_size=args.fetch_size).stream(
+                args.dataset, args.organization_id, fmt=args.format, compress=args.gzip,
+                since=args.since, until=args.until,
+            )
+            async for chunk in chunks:
+                output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        else:
+            output.flush()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export organization data")
+    parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS))
+    parser.add_argument("--organization-id", type=uuid.UUID, required=True)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output on the fly")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="Inclusive lower bound on created_at")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="Exclusive upper bound on created_at")
+    parser.add_argument("--fetch-size", type=int, default=None, help="Rows fetched per round trip")
+    parser.add_argument("--output", default=None, help="File to write instead of stdout")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(export(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Database maintenance commands, meant to run from cron or a scheduled job.
+
+    python -m app.tasks.maintenance partitions [--dry-run] [--detach-only]
+    python -m app.tasks.maintenance expire-sessions [--batch-size N] [--max-batches N] [--resume-from ID]
+
+A run capped with --max-batches logs the session id to pass as --resume-from
+to the next run; without it, every run starts again at the beginning.
+"""
+import argparse
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.services.partition_service import PARTITIONED_TABLES, PartitionService
+from app.services.user_session_service import UserSessionService
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain_partitions(dry_run: bool = False, detach_only: bool = False) -> None:
+    """Create upcoming monthly partitions and retire the ones past retention."""
+    async with AsyncSessionLocal() as db:
+        service = PartitionService(db)
+        for spec in PARTITIONED_TABLES:
+            result = await service.maintain(spec, detach_only=detach_only, dry_run=dry_run)
+            logger.info(
+                f"{spec.name}: created {result.created or 'none'}, "
+                f"{'would remove' if dry_run else 'removed'} {result.removed or 'none'}, "
+                f"kept {result.kept or 'none'}"
+            )
+
+
+async def expire_sessions(batch_size: int = None, max_batches: int = None,
+                          resume_from: Optional[uuid.UUID] = None) -> None:
+    """Mark sessions past their expiry as EXPIRED."""
+    async with AsyncSessionLocal() as db:
+        sweep = await UserSessionService(db).cleanup_expired_sessions(
+            batch_size=batch_size, max_batches=max_batches, resume_from=resume_from
+        )
+    if sweep.last_key is not None:
+        logger.info(f"Sweep incomplete; continue with --resume-from {sweep.last_key}")
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "partitions":
+            await maintain_partitions(
+                dry_run=args.dry_run,
+                detach_only=args.detach_only or settings.PARTITION_DETACH_ONLY,
+            )
+        elif args.command == "expire-sessions":
+            await expire_sessions(
+                batch_size=args.batch_size, max_batches=args.max_batches, resume_from=args.resume_from
+            )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Database maintenance tasks")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    partitions = subcommands.add_parser("partitions", help="Create future partitions and retire expired ones")
+    partitions.add_argument("--dry-run", action="store_true", help="Only report partitions past retention")
+    partitions.add_argument("--detach-only", action="store_true", help="Detach expired partitions instead of dropping them")
+
+    sessions = subcommands.add_parser("expire-sessions", help="Mark expired sessions as EXPIRED")
+    sessions.add_argument("--batch-size", type=int, default=None)
+    sessions.add_argument("--max-batches", type=int, default=None)
+    sessions.add_argument("--resume-from", type=uuid.UUID, default=None,
+                          help="Session id logged by a previous run stopped by --max-batches")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare JWT backends on encode and decode throughput.
+
+Usage (from the backend directory, with the usual environment configured):
+
+    python -m benchmarks.jwt_backends [--iterations 20000] [--json]
+
+Decoding goes straight to the backend, bypassing the verified-token cache, so
+the numbers reflect the cost of a cold verification.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from app.core import keys
+from app.core.jwt_backends import JWT_BACKENDS
+from benchmarks.timing import measure
+
+
+def run(iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    key_ring = keys.key_ring
+    claims = {
+        "sub": "00000000-0000-0000-0000-000000000000",
+        "sid": "benchmark-session",
+        "jti": "0" * 32,
+        "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+
+    results = {}
+    for name, backend_class in JWT_BACKENDS.items():
+        backend = backend_class()
+        token = backend.encode(claims, key_ring.active)
+        results[name] = {
+            "encode": measure(lambda: backend.encode(claims, key_ring.active), iterations),
+            "decode": measure(lambda: backend.decode(token, key_ring), iterations),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Signing key: {keys.key_ring.active.algorithm} ({args.iterations} iterations)")
+    print(f"{'backend':<8} {'op':<7} {'ops/sec':>12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, operations in results.items():
+        for operation, stats in operations.items():
+            print(
+                f"{name:<8} {operation:<7} {stats['ops_per_sec']:>12,.0f} "
+                f"{stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
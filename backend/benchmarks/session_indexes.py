@@ -0,0 +1,212 @@
+"""
+Compare the user_sessions index sets before and after the hot-path redesign.
+
+Usage (from the backend directory, against a disposable PostgreSQL database):
+
+    python -m benchmarks.session_indexes [--sessions 20000] [--users 2000] [--json]
+
+Each variant gets its own unpartitioned scratch table in a throwaway schema,
+so only the index set and fillfactor differ. The benchmark reports insert and
+rotation throughput, selector-lookup and active-listing latency, the share of
+rotations that were HOT updates, and the total index size.
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import settings
+
+SCHEMA = "bench_session_indexes"
+
+COLUMNS = """
+    id uuid PRIMARY KEY,
+    user_id uuid NOT NULL,
+    session_id varchar(255) NOT NULL,
+    refresh_token_hash varchar(255) NOT NULL,
+    refresh_verifier_hash varchar(64),
+    device_id varchar(255),
+    expires_at timestamp NOT NULL,
+    last_activity_at timestamp NOT NULL,
+    status varchar(16) NOT NULL,
+    refresh_count integer NOT NULL DEFAULT 0,
+    created_at timestamptz NOT NULL DEFAULT now()
+"""
+
+VARIANTS = {
+    # The nine indexes from migration 31fa4045ceda
+    "before": {
+        "fillfactor": 100,
+        "indexes": [
+            "CREATE INDEX ON {table} (expires_at)",
+            "CREATE INDEX ON {table} (session_id, status)",
+            "CREATE INDEX ON {table} (user_id, status)",
+            "CREATE INDEX ON {table} (device_id)",
+            "CREATE INDEX ON {table} (expires_at)",
+            "CREATE INDEX ON {table} (refresh_token_hash)",
+            "CREATE UNIQUE INDEX ON {table} (session_id)",
+            "CREATE INDEX ON {table} (status)",
+            "CREATE INDEX ON {table} (user_id)",
+        ],
+    },
+    # Migration e8a35c7f0b12
+    "after": {
+        "fillfactor": 80,
+        "indexes": [
+            "CREATE UNIQUE INDEX ON {table} (session_id)",
+            "CREATE INDEX ON {table} (user_id) WHERE status = 'ACTIVE'",
+            "CREATE INDEX ON {table} (refresh_token_hash) WHERE status = 'ACTIVE'",
+            "CREATE INDEX ON {table} (user_id)",
+        ],
+    },
+}
+
+
+def _summary(samples: List[int], elapsed: float) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "ops_per_sec": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": samples[len(samples) // 2] / 1e6,
+        "p99_ms": samples[min(int(len(samples) * 0.99), len(samples) - 1)] / 1e6,
+    }
+
+
+async def _timed(operations: List[Callable[[], Awaitable[object]]]) -> Dict[str, float]:
+    samples = []
+    started = time.perf_counter()
+    for operation in operations:
+        op_started = time.perf_counter_ns()
+        await operation()
+        samples.append(time.perf_counter_ns() - op_started)
+    return _summary(samples, time.perf_counter() - started)
+
+
+async def _run_variant(conn: AsyncConnection, name: str, sessions: int, users: int,
+                       rotations: int, lookups: int) -> Dict[str, object]:
+    variant = VARIANTS[name]
+    table = f"{SCHEMA}.sessions_{name}"
+    await conn.execute(text(f"CREATE TABLE {table} ({COLUMNS}) WITH (fillfactor = {variant['fillfactor']})"))
+    for index in variant["indexes"]:
+        await conn.execute(text(index.format(table=table)))
+
+    rng = random.Random(42)
+    user_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(users)]
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": rng.choice(user_ids),
+            "session_id": secrets.token_urlsafe(32),
+            "refresh_token_hash": secrets.token_hex(32),
+            "refresh_verifier_hash": secrets.token_hex(32),
+        }
+        for _ in range(sessions)
+    ]
+
+    insert = text(
+        f"INSERT INTO {table} (id, user_id, session_id, refresh_token_hash, refresh_verifier_hash, "
+        f"expires_at, last_activity_at, status) VALUES (:id, :user_id, :session_id, "
+        f":refresh_token_hash, :refresh_verifier_hash, now() + interval '30 days', now(), 'ACTIVE')"
+    )
+    insert_stats = await _timed([lambda row=row: conn.execute(insert, row) for row in rows])
+
+    # Same shape as UserSessionService.refresh_session
+    rotate = text(
+        f"UPDATE {table} SET refresh_verifier_hash = :new_hash, expires_at = now() + interval '30 days', "
+        f"last_activity_at = now(), refresh_count = refresh_count + 1 "
+        f"WHERE session_id = :session_id AND refresh_verifier_hash = :old_hash "
+        f"AND status = 'ACTIVE' AND expires_at > now()"
+    )
+
+    async def _rotate(row: dict) -> None:
+        new_hash = secrets.token_hex(32)
+        await conn.execute(rotate, {
+            "session_id": row["session_id"], "old_hash": row["refresh_verifier_hash"], "new_hash": new_hash,
+        })
+        row["refresh_verifier_hash"] = new_hash
+
+    rotate_stats = await _timed([lambda row=rng.choice(rows): _rotate(row) for _ in range(rotations)])
+
+    selector = text(f"SELECT * FROM {table} WHERE session_id = :session_id")
+    selector_stats = await _timed([
+        lambda row=rng.choice(rows): conn.execute(selector, {"session_id": row["session_id"]})
+        for _ in range(lookups)
+    ])
+
+    # Same shape as UserSessionService.get_user_sessions(active_only=True)
+    listing = text(
+        f"SELECT * FROM {table} WHERE user_id = :user_id AND status = 'ACTIVE' "
+        f"AND expires_at > now() ORDER BY last_activity_at DESC"
+    )
+    listing_stats = await _timed([
+        lambda user_id=rng.choice(user_ids): conn.execute(listing, {"user_id": user_id})
+        for _ in range(lookups)
+    ])
+
+    await conn.execute(text("SELECT pg_stat_force_next_flush()"))
+    updates, hot_updates = (await conn.execute(text(
+        "SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_user_tables "
+        "WHERE schemaname = :schema AND relname = :table"
+    ), {"schema": SCHEMA, "table": f"sessions_{name}"})).one()
+    index_bytes = await conn.scalar(text(f"SELECT pg_indexes_size('{table}')"))
+
+    return {
+        "indexes": len(variant["indexes"]) + 1,
+        "insert": insert_stats,
+        "rotate": rotate_stats,
+        "selector_lookup": selector_stats,
+        "active_listing": listing_stats,
+        "hot_update_ratio": hot_updates / updates if updates else 0.0,
+        "index_mb": index_bytes / 2 ** 20,
+    }
+
+
+async def run(database_url: str, sessions: int, users: int, rotations: int, lookups: int) -> Dict[str, dict]:
+    engine = create_async_engine(database_url, isolation_level="AUTOCOMMIT")
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            try:
+                for name in VARIANTS:
+                    results[name] = await _run_variant(conn, name, sessions, users, rotations, lookups)
+            finally:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rotations", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.database_url, args.sessions, args.users, args.rotations, args.lookups))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, result in results.items():
+        print(f"{name}: {result['indexes']} indexes, {result['index_mb']:.1f} MiB, "
+              f"{result['hot_update_ratio']:.0%} HOT rotations")
+        for operation in ("insert", "rotate", "selector_lookup", "active_listing"):
+            stats = result[operation]
+            print(f"  {operation:<16} {stats['ops_per_sec']:>10,.0f} ops/sec  "
+                  f"p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Micro-benchmarks for the auth and session hot paths, with a regression gate.
+
+Usage (from the backend directory, with the usual environment configured):
+
+    python -m benchmarks [--iterations 5000] [--database-url URL]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--tolerance 0.3] [--save-baseline] [--no-compare]
+
+The password hashing, JWT and UserSession model cases run offline. The
+UserSessionService cases use PostgreSQL-specific SQL (advisory locks,
+data-modifying CTEs, partitioned tables), so they only run when
+--database-url points at a disposable, migrated database; otherwise they are
+reported as skipped. They create one throwaway user and delete it afterwards.
+
+Results are JSON: ops/sec, p50/p99 latency and tracemalloc allocation figures
+per case. Unless --no-compare is given, results are compared with the
+baseline file. The command exits with status 1 if any case's throughput
+dropped, or its peak allocation grew, by more than --tolerance. Baselines are
+hardware-specific, so regenerate them with --save-baseline on the machine
+that runs the gate.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.security import create_access_token, decode_token, get_password_hash, verify_password
+from app.core.token_cache import token_cache
+from app.models.user_session import SessionStatus, UserSession
+from benchmarks.timing import measure, measure_async
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+# Compared against the baseline, with the direction in which a change is a regression
+GATED_METRICS = {"ops_per_sec": "lower", "alloc_peak_kib": "higher"}
+# Allocation peaks this small are dominated by noise
+MIN_GATED_ALLOC_KIB = 1.0
+
+
+def _cpu_cases(iterations: int) -> Dict[str, Tuple[Callable[[], object], int]]:
+    """Offline cases as name -> (operation, iterations)."""
+    password = "correct horse battery staple"
+    password_hash = get_password_hash(password)
+    # bcrypt is deliberately slow, so it gets far fewer iterations
+    bcrypt_iterations = max(iterations // 1000, 5)
+
+    token = create_access_token(subject=str(uuid.uuid4()), additional_claims={"sid": "benchmark"})
+
+    def decode_cold():
+        token_cache.clear()
+        return decode_token(token)
+
+    session_user_id = str(uuid.uuid4())
+    device_info = {"device_name": "Benchmark", "device_type": "desktop", "user_agent": "benchmark"}
+    session, _ = UserSession.create_session(session_user_id, device_info)
+    session.status = SessionStatus.ACTIVE
+    session.refresh_count = 0
+    session.max_refresh_count = 2 ** 62
+
+    return {
+        "security.get_password_hash": (lambda: get_password_hash(password), bcrypt_iterations),
+        "security.verify_password": (lambda: verify_password(password, password_hash), bcrypt_iterations),
+        "security.create_access_token": (lambda: create_access_token(subject=session_user_id), iterations),
+        "security.decode_token[uncached]": (decode_cold, iterations),
+        "security.decode_token[cached]": (lambda: decode_token(token), iterations),
+        "UserSession.create_session": (lambda: UserSession.create_session(session_user_id, device_info), iterations),
+        "UserSession.refresh": (session.refresh, iterations),
+    }
+
+
+async def _database_cases(database_url: str, iterations: int) -> Dict[str, Dict[str, float]]:
+    from sqlalchemy import delete, update
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.models.user import User
+    from app.services.user_session_service import UserSessionService
+
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    results = {}
+    try:
+        async with session_factory() as db:
+            user = User(email=f"benchmark-{uuid.uuid4().hex}@example.invalid", hashed_password="!",
+                        full_name="Benchmark")
+            db.add(user)
+            await db.commit()
+            # Read once: after a failed case the session rolls back and expires the instance
+            user_id = user.id
+            service = UserSessionService(db)
+            try:
+                results["UserSessionService.create_session"] = await measure_async(
+                    lambda: service.create_session(user_id, {"user_agent": "benchmark"}), iterations, allocations=True
+                )
+
+                # Created only now: each create_session above evicts the oldest session
+                # beyond MAX_SESSIONS_PER_USER, which would have revoked this one
+                refresh_session, refresh_token = await service.create_session(user_id, {"user_agent": "benchmark"})
+                # measure_async refreshes it ~2.1x iterations times (warmup, timed and tracemalloc
+                # passes), which would exceed the default max_refresh_count on long runs
+                await db.execute(
+                    update(UserSession)
+                    .where(UserSession.session_id == refresh_session.session_id)
+                    .values(max_refresh_count=2 ** 31 - 1)
+                )
+                await db.commit()
+
+                async def refresh():
+                    nonlocal refresh_token
+                    _, refresh_token = await service.refresh_session(refresh_token)
+
+                cases = {
+                    "UserSessionService.refresh_session": refresh,
+                    "UserSessionService.get_user_sessions": lambda: service.get_user_sessions(user_id),
+                    "UserSessionService.get_user_sessions_page":
+                        lambda: service.get_user_sessions_page(user_id, limit=20),
+                }
+                for name, operation in cases.items():
+                    results[name] = await measure_async(operation, iterations, allocations=True)
+            finally:
+                await db.execute(delete(UserSession).where(UserSession.user_id == user_id))
+                await db.execute(delete(User).where(User.id == user_id))
+                await db.commit()
+    finally:
+        await engine.dispose()
+    return results
+
+
+def run(iterations: int, database_url: Optional[str] = None) -> dict:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (operation, case_iterations) in _cpu_cases(iterations).items():
+        results[name] = measure(operation, case_iterations, allocations=True)
+
+    skipped = {}
+    # Database round trips are slow, so these cases get fewer iterations
+    database_iterations = min(max(iterations // 25, 20), 500)
+    if database_url:
+        results.update(asyncio.run(_database_cases(database_url, database_iterations)))
+    else:
+        for name in ("create_session", "refresh_session", "get_user_sessions", "get_user_sessions_page"):
+            skipped[f"UserSessionService.{name}"] = "no --database-url"
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": iterations,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return a description of every gated metric that regressed beyond the tolerance."""
+    regressions = []
+    for name, stats in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        for metric, worse in GATED_METRICS.items():
+            if metric not in stats or metric not in reference:
+                continue
+            if metric == "alloc_peak_kib" and max(stats[metric], reference[metric]) < MIN_GATED_ALLOC_KIB:
+                continue
+            value, expected = stats[metric], reference[metric]
+            if worse == "lower" and value < expected * (1 - tolerance):
+                regressions.append(f"{name}: {metric} {value:,.1f} < baseline {expected:,.1f}")
+            elif worse == "higher" and value > expected * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {value:,.1f} > baseline {expected:,.1f}")
+    return regressions
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'case':<45} {'ops/sec':>12} {'p50 (us)':>10} {'p99 (us)':>10} {'peak KiB':>9}")
+    for name, stats in report["results"].items():
+        print(
+            f"{name:<45} {stats['ops_per_sec']:>12,.0f} {stats['p50_us']:>10.1f} "
+            f"{stats['p99_us']:>10.1f} {stats.get('alloc_peak_kib', 0):>9.1f}"
+        )
+    for name, reason in report["skipped"].items():
+        print(f"{name:<45} skipped ({reason})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--database-url", default=None, help="Disposable migrated PostgreSQL (postgresql+asyncpg://...)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--no-compare", action="store_true", help="Skip the baseline comparison")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of a table")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.database_url)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return
+    if args.no_compare or not args.baseline.exists():
+        return
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print(f"Performance regressions against {args.baseline}:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Shared timing helpers for the benchmarks.
+
+Latency is sampled per operation with perf_counter_ns. Allocations are
+measured in a separate tracemalloc pass, because tracing slows every
+allocation down and would distort the timings.
+"""
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List
+
+
+def summarize(samples: List[int], elapsed: float) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "ops_per_sec": len(samples) / elapsed if elapsed else 0.0,
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[min(int(len(samples) * 0.99), len(samples) - 1)] / 1000,
+    }
+
+
+def _allocation_stats(before: int, after: int, peak: int, iterations: int) -> Dict[str, float]:
+    return {
+        "alloc_peak_kib": max(peak - before, 0) / 1024,
+        "alloc_retained_bytes_per_op": (after - before) / iterations,
+    }
+
+
+def measure(operation: Callable[[], object], iterations: int, allocations: bool = False) -> Dict[str, float]:
+    """Time a sync operation; optionally add its tracemalloc peak and retained bytes."""
+    for _ in range(max(iterations // 10, 1)):
+        operation()  # Warm up
+    samples: List[int] = []
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        op_started = time.perf_counter_ns()
+        operation()
+        samples.append(time.perf_counter_ns() - op_started)
+    stats = summarize(samples, (time.perf_counter_ns() - started) / 1e9)
+
+    if allocations:
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(iterations):
+                operation()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats.update(_allocation_stats(before, after, peak, iterations))
+    return stats
+
+
+async def measure_async(
+    operation: Callable[[], Awaitable[object]], iterations: int, allocations: bool = False
+) -> Dict[str, float]:
+    """Async counterpart of measure() for operations that await I/O."""
+    for _ in range(max(iterations // 10, 1)):
+        await operation()
+    samples: List[int] = []
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        op_started = time.perf_counter_ns()
+        await operation()
+        samples.append(time.perf_counter_ns() - op_started)
+    stats = summarize(samples, (time.perf_counter_ns() - started) / 1e9)
+
+    if allocations:
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(iterations):
+                await operation()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats.update(_allocation_stats(before, after, peak, iterations))
+    return stats
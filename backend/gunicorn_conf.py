@@ -1,4 +1,5 @@
 import os
+import shutil
 
 # Gunicorn configuration file
 
@@ -23,3 +24,20 @@ keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
 
 # For reloading in development if needed, though uvicorn --reload is preferred
 reload = bool(os.getenv('GUNICORN_RELOAD', False))
+
+# Metrics
+# prometheus_client aggregates worker metrics through files in this directory.
+# It must be set before workers import the app, and is emptied on every start
+# so samples from a previous run are not merged in.
+prometheus_multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+
+
+def on_starting(server):
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
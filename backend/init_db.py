@@ -4,22 +4,27 @@ Database initialization script for MartechEngine.
 This script creates all database tables based on the SQLAlchemy models.
 """
 
+import asyncio
 import logging
 from app.core.database import engine
 from app.models import Base
 
-def init_db():
+async def init_db():
     """Create all database tables based on the SQLAlchemy models."""
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
     try:
         logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
+        # create_all is sync and needs a sync connection; run it on the async engine's connection
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("✅ Database tables created successfully!")
     except Exception as e:
         logger.error(f"❌ Error creating database tables: {e}")
         raise
+    finally:
+        await engine.dispose()
 
 if __name__ == "__main__":
-    init_db()
+    asyncio.run(init_db())
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.sql_profiler import profile_queries
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fail the test if the wrapped block issues more SQL statements than allowed.
+
+        with assert_max_queries(3):
+            await client.post("/api/v1/auth/login", json=...)
+    """
+    @contextmanager
+    def check(limit: int):
+        with profile_queries() as profile:
+            yield profile
+        assert profile.count <= limit, f"Expected at most {limit} queries, got {profile.report()}"
+
+    return check
@@ -0,0 +1,88 @@
+"""
+Stand-ins for SQLAlchemy's AsyncSession and Result, shared by the unit tests.
+
+Import them from here; conftest.py only holds fixtures.
+"""
+from sqlalchemy.dialects import postgresql
+
+
+class FakeResult:
+    """Result stand-in over canned rows."""
+
+    def __init__(self, rows=(), keys=(), fetch_size=None):
+        self._rows = list(rows)
+        self._keys = list(keys)
+        self._fetch_size = fetch_size or len(self._rows) or 1
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def keys(self):
+        return self._keys
+
+    def all(self):
+        return list(self._rows)
+
+    def one(self):
+        return self._rows[0]
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar(self):
+        return self.scalars().all()[0] if self._rows else None
+
+    def scalars(self):
+        return FakeResult([row[0] if isinstance(row, tuple) else row for row in self._rows])
+
+    async def partitions(self):
+        for start in range(0, len(self._rows), self._fetch_size):
+            yield self._rows[start:start + self._fetch_size]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """
+    AsyncSession stand-in that records the SQL it is given and answers with canned rows.
+
+    ``results`` is either a list holding the rows for each successive
+    execute()/stream() call, or a callable taking (statement, params) and
+    returning the rows. Statements are recorded compiled for PostgreSQL.
+    """
+
+    def __init__(self, results=None, keys=()):
+        self.results = results
+        self.keys = keys
+        self.statements = []
+        self.streams = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def _rows(self, statement, params):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        if callable(self.results):
+            return self.results(statement, params)
+        if self.results:
+            return self.results.pop(0)
+        return []
+
+    async def execute(self, statement, params=None):
+        return FakeResult(self._rows(statement, params), self.keys)
+
+    async def scalar(self, statement, params=None):
+        return FakeResult(self._rows(statement, params)).scalar()
+
+    async def stream(self, statement):
+        fetch_size = statement.get_execution_options().get("yield_per")
+        result = FakeResult(self._rows(statement, None), self.keys, fetch_size=fetch_size)
+        self.streams.append(result)
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdaptiveLimit, AdmissionController, AdmissionMiddleware, RouteClass
+
+LOGIN = RouteClass(
+    name="auth_cpu", routes=frozenset({("POST", "/login")}),
+    initial_limit=2, min_limit=1, max_limit=4, target_latency=0.5,
+)
+
+
+def test_limit_grows_additively_and_shrinks_multiplicatively():
+    """Test AIMD: ~+1 per limit fast completions, x backoff on a slow one."""
+    limit = AdaptiveLimit(LOGIN)
+    for _ in range(2):
+        limit.try_acquire()
+        limit.release(0.1, overloaded=False, concurrency=2)
+    assert limit.limit == pytest.approx(2.9)  # 2 + 1/2 + 1/2.5
+
+    limit.try_acquire()
+    limit.release(2.0, overloaded=False, concurrency=2)
+    assert limit.limit == pytest.approx(2.9 * 0.9, rel=0.05)
+
+    limit.try_acquire()
+    limit.release(2.0, overloaded=True, concurrency=2)
+    assert limit.decreases == 1  # Second cut within the same interval is skipped
+
+
+def test_limit_only_grows_when_it_is_being_reached():
+    """Test that fast completions at low concurrency, or unsampled responses, leave the limit alone."""
+    limit = AdaptiveLimit(LOGIN)
+    for _ in range(20):
+        limit.try_acquire()
+        limit.release(0.01, overloaded=False, concurrency=0)
+    assert limit.limit == 2
+
+    for _ in range(20):
+        limit.try_acquire()
+        limit.release(5.0, overloaded=False, concurrency=2, sample=False)
+    assert (limit.limit, limit.decreases, limit.in_flight) == (2, 0, 0)
+
+
+async def _request(app, method, path):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, None, send)
+    return messages[0]
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_beyond_limit_but_not_unclassified_routes():
+    """Test that excess logins get 503 + Retry-After while /health is still served."""
+    controller = AdmissionController([LOGIN], lag_shed_threshold=1.0, retry_after=3)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/login":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    middleware = AdmissionMiddleware(app, controller)
+    in_flight = [asyncio.create_task(_request(middleware, "POST", "/login")) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    shed = await _request(middleware, "POST", "/login")
+    health = await _request(middleware, "GET", "/health")
+    release.set()
+    admitted = await asyncio.gather(*in_flight)
+
+    assert shed["status"] == 503
+    assert (b"retry-after", b"3") in shed["headers"]
+    assert health["status"] == 200
+    assert [message["status"] for message in admitted] == [200, 200]
+    assert controller.stats()["classes"]["auth_cpu"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_responses_do_not_raise_the_limit():
+    """Test that fast 429s from the rate limiter are not taken as evidence of spare capacity."""
+    controller = AdmissionController([LOGIN], lag_shed_threshold=1.0)
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 429, "headers": []})
+
+    for _ in range(10):
+        await _request(AdmissionMiddleware(app, controller), "POST", "/login")
+
+    assert controller.stats()["classes"]["auth_cpu"]["increases"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_failed_logins_lower_the_limit():
+    """Test that 401s are still sampled, since a failed login pays for a full bcrypt verify."""
+    fast_target = RouteClass(
+        name="auth_cpu", routes=frozenset({("POST", "/login")}),
+        initial_limit=4, min_limit=1, max_limit=4, target_latency=0.01,
+    )
+    controller = AdmissionController([fast_target], lag_shed_threshold=1.0)
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.02)
+        await send({"type": "http.response.start", "status": 401, "headers": []})
+
+    await _request(AdmissionMiddleware(app, controller), "POST", "/login")
+
+    stats = controller.stats()["classes"]["auth_cpu"]
+    assert (stats["decreases"], stats["limit"]) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_sheds_limited_routes():
+    """Test that a lagging event loop rejects new limited requests outright."""
+    controller = AdmissionController([LOGIN], lag_shed_threshold=0.2)
+    controller.loop_lag.lag = 0.5
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    assert (await _request(AdmissionMiddleware(app, controller), "POST", "/login"))["status"] == 503
+    assert controller.lag_shed == 1
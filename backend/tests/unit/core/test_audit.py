@@ -0,0 +1,184 @@
+import os
+import subprocess
+import sys
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.audit import AuditBuffer
+
+
+class RecordingAuditBuffer(AuditBuffer):
+    """AuditBuffer whose writes land in a list, optionally failing."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.engine = object()
+        self.batches = []
+        self.failing = False
+
+    async def _write(self, events):
+        if self.failing:
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(events))
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_in_batches():
+    """Test that buffered events are written in batch_size chunks, oldest first."""
+    buffer = RecordingAuditBuffer(batch_size=2)
+    for i in range(5):
+        buffer.record("user.login", "session", resource_id=i)
+
+    await buffer.flush()
+
+    assert [len(batch) for batch in buffer.batches] == [2, 2, 1]
+    assert [event["resource_id"] for event in buffer.batches[0]] == ["0", "1"]
+    assert buffer.stats()["written"] == 5
+
+
+@pytest.mark.asyncio
+async def test_drop_policy_bounds_the_buffer():
+    """Test that a failing database never grows the buffer past max_events."""
+    buffer = RecordingAuditBuffer(max_events=3, batch_size=2, overflow_policy="drop")
+    buffer.failing = True
+    for i in range(5):
+        buffer.record("user.login", "session", resource_id=i)
+
+    await buffer.flush()
+
+    stats = buffer.stats()
+    assert stats["buffered"] == 3
+    assert stats["dropped"] == 2
+    assert stats["flush_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_spill_policy_replays_after_recovery(tmp_path):
+    """Test that overflowed events go to disk and are written once the database recovers."""
+    spill_path = str(tmp_path / "audit.ndjson")
+    buffer = RecordingAuditBuffer(max_events=2, batch_size=2, overflow_policy="spill", spill_path=spill_path)
+    user_id = uuid.uuid4()
+    buffer.failing = True
+    for i in range(4):
+        buffer.record("user.login", "session", resource_id=i, user_id=user_id)
+    await buffer.flush()
+    assert buffer.stats()["spilled"] == 2
+
+    buffer.failing = False
+    await buffer.flush()
+
+    written = [event for batch in buffer.batches for event in batch]
+    assert sorted(event["resource_id"] for event in written) == ["0", "1", "2", "3"]
+    assert all(event["user_id"] == user_id for event in written)
+    assert buffer.stats()["replayed"] == 2
+    assert not (tmp_path / "audit.ndjson").exists()
+    assert not (tmp_path / f"audit.ndjson.{os.getpid()}.replay").exists()
+
+
+def test_spill_policy_requires_a_path():
+    """Test that spilling without a configured path is rejected up front."""
+    with pytest.raises(ValueError):
+        AuditBuffer(overflow_policy="spill")
+
+
+@pytest.mark.asyncio
+async def test_record_never_spills_on_the_event_loop(tmp_path):
+    """Test that a full buffer under the spill policy only wakes the flusher, which does the file I/O."""
+    spill_path = tmp_path / "audit.ndjson"
+    buffer = RecordingAuditBuffer(max_events=2, batch_size=10, overflow_policy="spill", spill_path=str(spill_path))
+    buffer.failing = True
+    for i in range(5):
+        buffer.record("user.login", "session", resource_id=i)
+
+    assert not spill_path.exists()
+    assert buffer._batch_ready.is_set()
+    assert buffer.stats()["dropped"] == 1  # Past twice max_events even the spill policy drops
+
+    await buffer.flush()
+
+    assert buffer.stats()["spilled"] == 4  # At least a whole batch is spilled at a time
+    # The buffer is then empty, so the flusher tried to replay them; they stay on disk
+    assert (tmp_path / f"audit.ndjson.{os.getpid()}.replay").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_spill_rewrite_is_logged_not_raised(tmp_path, monkeypatch, caplog):
+    """Test that an OSError while keeping the unreplayed remainder does not kill the flusher."""
+    spill_path = tmp_path / "audit.ndjson"
+    buffer = RecordingAuditBuffer(max_events=2, batch_size=1, overflow_policy="spill", spill_path=str(spill_path))
+    buffer.failing = True
+    for i in range(4):
+        buffer.record("user.login", "session", resource_id=i)
+    await buffer.flush()
+    assert buffer.stats()["spilled"] == 2
+
+    # The buffered events and the first replayed one are written, then the database fails again
+    write = buffer._write
+    attempts = []
+
+    async def fail_on_fourth_write(events):
+        attempts.append(events)
+        buffer.failing = len(attempts) >= 4
+        await write(events)
+
+    def read_only_disk(replaying, events):
+        raise OSError("read-only file system")
+
+    buffer.failing = False
+    monkeypatch.setattr(buffer, "_write", fail_on_fourth_write)
+    monkeypatch.setattr(buffer, "_rewrite_spill", read_only_disk)
+    await buffer.flush()
+
+    assert "Failed to rewrite" in caplog.text
+    assert (tmp_path / f"audit.ndjson.{os.getpid()}.replay").exists()
+
+
+@pytest.mark.asyncio
+async def test_spill_files_are_per_process_and_orphans_are_claimed(tmp_path):
+    """Test that a worker spills to its own file and replays files left by workers that have exited."""
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    orphan = tmp_path / f"audit.ndjson.{int(exited.stdout)}"
+    spill_path = str(tmp_path / "audit.ndjson")
+    buffer = RecordingAuditBuffer(max_events=2, batch_size=2, overflow_policy="spill", spill_path=spill_path)
+    buffer.failing = True
+    for i in range(4):
+        buffer.record("user.login", "session", resource_id=i)
+    await buffer.flush()
+    assert (tmp_path / f"audit.ndjson.{os.getpid()}").exists()
+    # Pretend another, now exited, worker spilled these
+    os.replace(tmp_path / f"audit.ndjson.{os.getpid()}", orphan)
+
+    buffer.failing = False
+    await buffer.flush()
+
+    assert buffer.stats()["replayed"] == 2
+    assert not orphan.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_writes_skip_events_already_stored():
+    """Test that the INSERT ignores conflicting rows, so replaying an already written batch is harmless."""
+    statements = []
+
+    class Connection:
+        async def execute(self, statement):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+    class Engine:
+        @asynccontextmanager
+        async def begin(self):
+            yield Connection()
+
+    buffer = AuditBuffer()
+    buffer.bind(Engine())
+    buffer.record("user.login", "session")
+
+    await buffer.flush()
+
+    (insert,) = statements
+    assert insert.startswith("INSERT INTO audit_logs")
+    assert insert.endswith("ON CONFLICT DO NOTHING")
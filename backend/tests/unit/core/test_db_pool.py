@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.db_pool import InstrumentedQueuePool, PoolMetrics, pool_metrics
+
+
+class _Connection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_wait_histogram_is_cumulative():
+    """Test that bucket counts accumulate towards +Inf like a Prometheus histogram."""
+    metrics = PoolMetrics()
+    for wait_ms in (0.5, 3, 3, 20000):
+        metrics.observe_checkout(wait_ms)
+
+    wait = metrics.stats()["wait_ms"]
+    assert wait["buckets"]["1"] == 1
+    assert wait["buckets"]["5"] == 3
+    assert wait["buckets"]["10000"] == 3
+    assert wait["buckets"]["+Inf"] == wait["count"] == 4
+    assert wait["max"] == 20000
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_checkouts_and_timeouts():
+    """Test that an exhausted pool's checkout timeout is counted, not just raised."""
+    pool = InstrumentedQueuePool(_Connection, pool_size=1, max_overflow=0, timeout=0.01)
+    checkouts, timeouts = pool_metrics.checkouts, pool_metrics.checkout_timeouts
+
+    held = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    await greenlet_spawn(held.close)
+
+    assert pool_metrics.checkouts == checkouts + 1
+    assert pool_metrics.checkout_timeouts == timeouts + 1
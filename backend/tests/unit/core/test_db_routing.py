@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.database import RoutingSession
+from app.core.db_routing import PrimaryPinMiddleware, _request_routing, read_only, record_write
+from app.models.user import User
+from app.services.auth_service import AuthService
+from tests.fakes import FakeSession
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    replica_engine = create_async_engine("postgresql+asyncpg://replica/db")
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    return replica_engine.sync_engine
+
+
+def test_reads_stay_on_primary_without_opt_in(replica):
+    """Test that a plain session only uses the replica inside read_only methods."""
+    assert RoutingSession().get_bind(clause=select(User)) is database.engine.sync_engine
+    assert RoutingSession(info={"replica": True}).get_bind(clause=select(User)) is replica
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_route_plain_selects_to_replica(replica):
+    """Test that only plain SELECTs from a read_only method reach the replica."""
+    session = RoutingSession()
+
+    @read_only
+    async def lookup(clause):
+        return session.get_bind(clause=clause)
+
+    assert await lookup(select(User)) is replica
+    assert await lookup(select(User).with_for_update()) is database.engine.sync_engine
+    assert await lookup(update(User).values(is_active=False)) is database.engine.sync_engine
+    assert await lookup(text("SELECT 1")) is database.engine.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_login_user_lookup_reads_from_primary(replica):
+    """Test that authenticate never checks credentials against a possibly lagging replica."""
+    routing = RoutingSession()
+    binds = []
+    db = FakeSession(lambda statement, params: binds.append(routing.get_bind(clause=statement)) or [])
+
+    assert await AuthService().authenticate(db, email="user@example.com", password="secret") is None
+    assert binds == [database.engine.sync_engine]
+
+
+def test_write_pins_session_and_request_to_primary(replica):
+    """Test that after a write, reads in the same session and request go to the primary."""
+    session = RoutingSession(info={"replica": True})
+    session.info["wrote"] = True
+    assert session.get_bind(clause=select(User)) is database.engine.sync_engine
+
+    token = _request_routing.set({"pinned": False, "wrote": False})
+    try:
+        record_write()
+        assert RoutingSession(info={"replica": True}).get_bind(clause=select(User)) is database.engine.sync_engine
+    finally:
+        _request_routing.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_pin_cookie_only_after_a_write():
+    """Test that the pin cookie is set on writing requests and read back on the next one."""
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(dict(_request_routing.get()))
+        if scope["path"] == "/write":
+            record_write()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def call(path, headers=()):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await PrimaryPinMiddleware(app, pin_seconds=5)({"type": "http", "path": path, "headers": list(headers)}, None, send)
+        return dict(messages[0]["headers"])
+
+    assert b"set-cookie" not in await call("/read")
+    cookie = (await call("/write"))[b"set-cookie"].split(b";")[0]
+    await call("/read", [(b"cookie", cookie)])
+
+    assert seen[2]["pinned"] is True
+    assert seen[0]["pinned"] is False
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ServiceUnavailableError
+from app.core.hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_roundtrip():
+    """Test that hashing and verification work through the pool."""
+    hasher = PasswordHasher(max_workers=2, max_queue=2)
+    try:
+        hashed_password = await hasher.hash("mysecretpassword")
+        assert hashed_password != "mysecretpassword"
+        assert await hasher.verify("mysecretpassword", hashed_password) is True
+        assert await hasher.verify("wrongsecret", hashed_password) is False
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats["calls"] == 3
+    assert stats["pending"] == 0
+    assert stats["avg_compute_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_retry_after():
+    """Test that work beyond the pool capacity fails fast instead of queueing."""
+    hasher = PasswordHasher(max_workers=1, max_queue=0, retry_after=3)
+    try:
+        first = asyncio.create_task(hasher.hash("mysecretpassword"))
+        await asyncio.sleep(0)  # Let the first call claim the only slot
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            await hasher.hash("anotherpassword")
+        assert exc_info.value.retry_after == 3
+
+        await first
+    finally:
+        hasher.shutdown()
+
+    assert hasher.rejected == 1
+    assert hasher.pending == 0
+
+
+def test_invalid_pool_kind():
+    """Test that an unknown pool kind is rejected."""
+    with pytest.raises(ValueError):
+        PasswordHasher(pool_kind="fiber")
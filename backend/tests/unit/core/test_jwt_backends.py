@@ -0,0 +1,98 @@
+import base64
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.core import keys
+from app.core.config import SigningKeyConfig
+from app.core.jwt_backends import HmacBackend, InvalidTokenError, JoseBackend, create_backend
+
+
+@pytest.fixture
+def ring() -> keys.KeyRing:
+    return keys.KeyRing([], fallback=keys._symmetric_key("test-secret"))
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).rstrip(b"=").decode()
+
+
+def _claims(**overrides) -> dict:
+    claims = {"sub": "user-1", "jti": "abc", "exp": int(time.time()) + 60}
+    claims.update(overrides)
+    return claims
+
+
+@pytest.mark.parametrize("encoder,decoder", [
+    (HmacBackend, JoseBackend),
+    (JoseBackend, HmacBackend),
+    (HmacBackend, HmacBackend),
+])
+def test_backends_interoperate(ring, encoder, decoder):
+    """Test that tokens from one backend verify with the other."""
+    token = encoder().encode(_claims(), ring.active)
+
+    assert decoder().decode(token, ring)["sub"] == "user-1"
+
+
+def test_hmac_rejects_tampered_and_expired_tokens(ring):
+    """Test that the hmac backend rejects bad signatures and expired tokens."""
+    backend = HmacBackend()
+    header, payload, signature = backend.encode(_claims(), ring.active).split(".")
+    forged = backend.encode(_claims(sub="user-2"), ring.active).split(".")[1]
+
+    with pytest.raises(InvalidTokenError):
+        backend.decode(f"{header}.{forged}.{signature}", ring)
+    with pytest.raises(InvalidTokenError):
+        backend.decode(backend.encode(_claims(exp=int(time.time()) - 1), ring.active), ring)
+    with pytest.raises(InvalidTokenError):
+        backend.decode("not-a-token", ring)
+
+
+def test_hmac_rejects_unexpected_algorithm(ring):
+    """Test that a token whose alg does not match the key is rejected."""
+    other = keys.KeyRing([], fallback=keys._symmetric_key("test-secret"))
+    hs512 = keys.SigningKey(
+        kid=None, algorithm="HS512", status="active",
+        signer=other.active.signer, verifier=other.active.verifier, secret=b"test-secret",
+    )
+    token = HmacBackend().encode(_claims(), hs512)
+
+    with pytest.raises(InvalidTokenError):
+        HmacBackend().decode(token, ring)
+
+
+@pytest.mark.parametrize("backend", [HmacBackend, JoseBackend])
+@pytest.mark.parametrize("kid", [["a"], {"a": 1}])
+def test_unhashable_kid_is_rejected(ring, backend, kid):
+    """Test that a list or object kid header is an invalid token rather than a TypeError."""
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}))
+    _, payload, signature = HmacBackend().encode(_claims(), ring.active).split(".")
+
+    with pytest.raises(InvalidTokenError):
+        backend().decode(f"{header}.{payload}.{signature}", ring)
+
+
+def test_hmac_delegates_asymmetric_keys():
+    """Test that asymmetric keys go through the jose fallback."""
+    pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    ring = keys.KeyRing([keys._load_key(SigningKeyConfig(kid="k1", private_key=pem))])
+    backend = HmacBackend()
+
+    token = backend.encode(_claims(), ring.active)
+
+    assert backend.decode(token, ring)["sub"] == "user-1"
+    assert JoseBackend().decode(token, ring)["sub"] == "user-1"
+
+
+def test_unknown_backend():
+    """Test that an unknown JWT_BACKEND name is rejected."""
+    with pytest.raises(ValueError):
+        create_backend("nope")
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from app.core import keys
+from app.core.config import SigningKeyConfig
+from app.core.security import create_access_token, decode_token
+
+
+def _ec_private_pem() -> str:
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def _ring(*configs: SigningKeyConfig, accept_symmetric: bool = False) -> keys.KeyRing:
+    fallback = keys._symmetric_key("test-secret") if accept_symmetric else None
+    return keys.KeyRing([keys._load_key(config) for config in configs], fallback=fallback)
+
+
+@pytest.fixture
+def use_ring(monkeypatch):
+    def _use(ring: keys.KeyRing) -> keys.KeyRing:
+        monkeypatch.setattr(keys, "key_ring", ring)
+        return ring
+    return _use
+
+
+def test_asymmetric_token_carries_kid(use_ring):
+    """Test that tokens are signed with the active key and verify via its kid."""
+    use_ring(_ring(SigningKeyConfig(kid="k1", private_key=_ec_private_pem())))
+
+    token = create_access_token("user-1")
+
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+    assert decode_token(token)["sub"] == "user-1"
+
+
+def test_staged_rotation(use_ring):
+    """Test that tokens from a retired key still verify after the next key is promoted."""
+    old_pem, new_pem = _ec_private_pem(), _ec_private_pem()
+    use_ring(_ring(
+        SigningKeyConfig(kid="old", private_key=old_pem, status="active"),
+        SigningKeyConfig(kid="new", private_key=new_pem, status="next"),
+    ))
+    old_token = create_access_token("user-1")
+    assert jwt.get_unverified_header(old_token)["kid"] == "old"
+
+    use_ring(_ring(
+        SigningKeyConfig(kid="old", private_key=old_pem, status="retired"),
+        SigningKeyConfig(kid="new", private_key=new_pem, status="active"),
+    ))
+    new_token = create_access_token("user-1")
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert decode_token(old_token)["sub"] == "user-1"
+    assert decode_token(new_token)["sub"] == "user-1"
+
+
+def test_unknown_kid_and_symmetric_tokens_rejected(use_ring):
+    """Test that tokens without a known key are rejected once HS256 is disabled."""
+    use_ring(_ring(SigningKeyConfig(kid="k1", private_key=_ec_private_pem())))
+
+    hs_token = jwt.encode({"sub": "user-1"}, "test-secret", algorithm="HS256")
+    forged = jwt.encode({"sub": "user-1"}, "test-secret", algorithm="HS256", headers={"kid": "k9"})
+
+    assert decode_token(hs_token) is None
+    assert decode_token(forged) is None
+
+
+def test_jwks_publishes_only_public_material(use_ring):
+    """Test that the JWKS lists every asymmetric key without private parts."""
+    ring = use_ring(_ring(
+        SigningKeyConfig(kid="k1", private_key=_ec_private_pem()),
+        SigningKeyConfig(kid="k2", private_key=_ec_private_pem(), status="next"),
+        accept_symmetric=True,
+    ))
+
+    jwks = ring.jwks()
+
+    assert sorted(key["kid"] for key in jwks["keys"]) == ["k1", "k2"]
+    for key in jwks["keys"]:
+        assert key["kty"] == "EC"
+        assert "d" not in key
+    assert "test-secret" not in json.dumps(jwks)
+
+
+def test_exactly_one_active_key():
+    """Test that ambiguous key configurations are rejected."""
+    with pytest.raises(ValueError):
+        _ring(
+            SigningKeyConfig(kid="a", private_key=_ec_private_pem()),
+            SigningKeyConfig(kid="b", private_key=_ec_private_pem()),
+        )
+    with pytest.raises(ValueError):
+        _ring(SigningKeyConfig(kid="a", private_key=_ec_private_pem(), status="next"))
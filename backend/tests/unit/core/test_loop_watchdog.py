@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.loop_watchdog import LoopWatchdog
+
+
+def _blocking_handler():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_attributed_to_route_and_stack(caplog):
+    """Test that a sync call on the loop is reported with its route and call stack."""
+    watchdog = LoopWatchdog(threshold=0.05, enabled=True)
+    watchdog.start()
+
+    async def request():
+        watchdog.track({"route": SimpleNamespace(path="/api/v1/auth/login")})
+        _blocking_handler()
+
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.core.loop_watchdog"):
+            await asyncio.create_task(request())
+            await asyncio.sleep(0.1)
+    finally:
+        watchdog.stop()
+
+    assert watchdog.blocks == 1
+    assert watchdog.last_block_route == "/api/v1/auth/login"
+    assert 0.1 < watchdog.max_block_seconds < 0.3
+    assert "Event loop blocked" in caplog.text
+    assert "_blocking_handler" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_responsive_loop_reports_nothing():
+    """Test that ordinary awaiting never counts as a block."""
+    watchdog = LoopWatchdog(threshold=0.05, enabled=True)
+    watchdog.start()
+    try:
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+    finally:
+        watchdog.stop()
+
+    assert watchdog.blocks == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_watchdog_starts_no_thread():
+    """Test that the watchdog costs nothing unless enabled."""
+    watchdog = LoopWatchdog(threshold=0.05)
+    watchdog.start()
+    assert watchdog._thread is None
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware, _sql_operation
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_sql_operation_is_bounded():
+    """Test that statement labels come from a fixed keyword set."""
+    assert _sql_operation("  select 1") == "SELECT"
+    assert _sql_operation("WITH evicted AS (...) INSERT ...") == "WITH"
+    assert _sql_operation("SELECT pg_advisory_xact_lock(1)") == "SELECT"
+    assert _sql_operation("EXPLAIN (FORMAT JSON) SELECT 1") == "OTHER"
+
+
+def test_requests_are_labelled_by_route_template_and_count_statements():
+    """Test that the route template, not the raw path, labels latency and statement counts."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        # Stands in for two cursor executions during the request
+        metrics._request_statements.get()[0] += 2
+        return {}
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+    statements_before = _sample("db_statements_per_request_sum", route="/items/{item_id}")
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert _sample("db_statements_per_request_sum", route="/items/{item_id}") == statements_before + 4
+    assert client.get("/nope").status_code == 404
+    assert _sample("http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404") >= 1
+
+
+def test_render_latest_serves_default_registry_without_multiproc_dir(monkeypatch):
+    """Test that a single-process deployment still exposes metrics."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    body, content_type = metrics.render_latest()
+
+    assert b"http_request_duration_seconds" in body
+    assert content_type.startswith("text/plain")
@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.core.exceptions import ValidationError
+from app.core.pagination import decode_cursor, encode_cursor, paginate
+from app.models.user_session import SessionStatus, UserSession
+from tests.fakes import FakeSession
+
+
+def _session_returning(rows):
+    """A session that answers each query with as many rows as its LIMIT asks for."""
+    return FakeSession(lambda statement, params: rows[:statement._limit], keys=["UserSession"])
+
+
+def _sessions(count):
+    return [
+        SimpleNamespace(created_at=datetime(2026, 10, 1, i, tzinfo=timezone.utc), id=uuid.UUID(int=i))
+        for i in range(count)
+    ]
+
+
+def test_cursor_roundtrip():
+    """Test that datetimes, UUIDs and enums survive a cursor roundtrip."""
+    key = (datetime(2026, 10, 18, 12, tzinfo=timezone.utc), uuid.uuid4(), SessionStatus.ACTIVE, 7)
+
+    assert decode_cursor(encode_cursor(key)) == (key[0], key[1], "ACTIVE", 7)
+
+
+def test_tampered_cursor_is_rejected():
+    """Test that a cursor whose payload was edited no longer verifies."""
+    cursor = encode_cursor((1, 2))
+    forged = encode_cursor((1, 3)).split(".")[0] + "." + cursor.split(".")[1]
+
+    for bad in (forged, "garbage", "a.b.c", ""):
+        with pytest.raises(ValidationError):
+            decode_cursor(bad)
+
+
+@pytest.mark.asyncio
+async def test_paginate_returns_cursor_only_when_more_rows_exist():
+    """Test that the extra fetched row decides has_more and seeds the next cursor."""
+    rows = _sessions(3)
+    key = (UserSession.created_at, UserSession.id)
+
+    page = await paginate(_session_returning(rows), select(UserSession), key, limit=2)
+    assert page.items == rows[:2]
+    assert decode_cursor(page.next_cursor) == (rows[1].created_at, rows[1].id)
+
+    last_page = await paginate(_session_returning(rows[:2]), select(UserSession), key, limit=2)
+    assert last_page.items == rows[:2]
+    assert last_page.has_more is False
+
+
+@pytest.mark.asyncio
+async def test_paginate_applies_keyset_predicate():
+    """Test that a cursor becomes a row-value comparison instead of an OFFSET."""
+    db = _session_returning([])
+    cursor = encode_cursor((datetime(2026, 10, 1, tzinfo=timezone.utc), uuid.uuid4()))
+
+    await paginate(db, select(UserSession), (UserSession.created_at, UserSession.id),
+                   limit=10, cursor=cursor, descending=True)
+
+    sql = db.statements[0]
+    assert "(user_sessions.created_at, user_sessions.id) < (" in sql
+    assert "ORDER BY user_sessions.created_at DESC, user_sessions.id DESC" in sql
+    assert "OFFSET" not in sql
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.principal import AuthPrincipal
+from app.core import principal_cache as principal_cache_module
+from app.core.principal_cache import PrincipalCache
+
+
+@pytest.mark.asyncio
+async def test_local_hit_and_miss_counters():
+    """Test that lookups are counted as hits or misses."""
+    cache = PrincipalCache()
+    assert await cache.get("user-1") is None
+
+    await cache.set("user-1", {"id": "user-1", "is_active": True})
+    assert await cache.get("user-1") == {"id": "user-1", "is_active": True}
+
+    stats = cache.stats()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_local_entries_expire():
+    """Test that entries older than the local TTL are not served."""
+    cache = PrincipalCache(local_ttl=-1)
+    await cache.set("user-1", {"id": "user-1"})
+    assert await cache.get("user-1") is None
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = PrincipalCache(local_max_entries=2)
+    await cache.set("user-1", {"id": "user-1"})
+    await cache.set("user-2", {"id": "user-2"})
+    await cache.get("user-1")
+    await cache.set("user-3", {"id": "user-3"})
+
+    assert await cache.get("user-2") is None
+    assert await cache.get("user-1") is not None
+    assert await cache.get("user-3") is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidate():
+    """Test that invalidation removes the entry."""
+    cache = PrincipalCache()
+    await cache.set("user-1", {"id": "user-1"})
+    await cache.invalidate("user-1")
+    assert await cache.get("user-1") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_commit_invalidation_tasks_are_kept_until_done(monkeypatch):
+    """Test that Redis invalidations started on commit are referenced until they finish."""
+    cache = PrincipalCache()
+    await cache.set("user-1", {"id": "user-1"})
+    monkeypatch.setattr(principal_cache_module, "principal_cache", cache)
+    release = asyncio.Event()
+    invalidate = cache.invalidate
+
+    async def slow_invalidate(user_id):
+        await release.wait()
+        await invalidate(user_id)
+
+    monkeypatch.setattr(cache, "invalidate", slow_invalidate)
+
+    principal_cache_module._invalidate_changed_users(
+        SimpleNamespace(info={principal_cache_module._PENDING_KEY: {"user-1"}})
+    )
+
+    assert await cache.get("user-1") is None  # The local tier is dropped immediately
+    assert len(principal_cache_module._invalidation_tasks) == 1
+    release.set()
+    await asyncio.gather(*principal_cache_module._invalidation_tasks)
+    await asyncio.sleep(0)
+    assert principal_cache_module._invalidation_tasks == set()
+
+
+def test_auth_principal_roundtrip():
+    """Test that a principal survives serialization for the cache."""
+    principal = AuthPrincipal(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        is_active=True,
+        is_verified=False,
+        organization_ids=(uuid.uuid4(), uuid.uuid4()),
+    )
+    assert AuthPrincipal.from_dict(json.loads(json.dumps(principal.to_dict()))) == principal
+    assert not hasattr(principal, "__dict__")
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.api.v1.dependencies.rate_limit_deps import rate_limit
+from app.api.v1.exception_handlers import setup_exception_handlers
+from app.core.rate_limit import RateLimit, RateLimitPolicy, RateLimiter, _LocalSlidingWindows
+
+
+class _UnavailableRedis:
+    def register_script(self, script):
+        async def run(keys, args):
+            raise RedisConnectionError("Connection refused")
+        return run
+
+
+def test_local_window_rejects_without_recording_and_reports_retry_after():
+    """Test that a rejected hit is not counted and retry_after points at the oldest hit."""
+    windows = _LocalSlidingWindows()
+    per_ip = RateLimit("login:ip:1.2.3.4", limit=2, window_seconds=60)
+
+    assert windows.hit([per_ip]) == (True, 0.0)
+    assert windows.hit([per_ip]) == (True, 0.0)
+    allowed, retry_after = windows.hit([per_ip])
+
+    assert not allowed
+    assert 59 < retry_after <= 60
+    assert len(windows._hits[per_ip.key]) == 2
+
+
+def test_local_window_is_all_or_nothing_across_keys():
+    """Test that a hit rejected by one key is not recorded against the others."""
+    windows = _LocalSlidingWindows()
+    per_ip = RateLimit("ip", limit=10, window_seconds=60)
+    per_email = RateLimit("email", limit=1, window_seconds=60)
+
+    windows.hit([per_ip, per_email])
+    allowed, _ = windows.hit([per_ip, per_email])
+
+    assert not allowed
+    assert len(windows._hits["ip"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_falls_back_to_process_memory_when_redis_fails():
+    """Test that Redis errors degrade to local limits instead of failing open or closed."""
+    limiter = RateLimiter()
+    limiter.bind(_UnavailableRedis())
+    limits = [RateLimit("k", limit=1, window_seconds=60)]
+
+    assert (await limiter.hit(limits))[0] is True
+    assert (await limiter.hit(limits))[0] is False
+    assert limiter.stats()["redis_errors"] == 2
+    assert limiter.stats()["fallback_checks"] == 2
+
+
+def test_throttled_request_gets_429_before_the_endpoint_runs(monkeypatch):
+    """Test that an email-keyed policy rejects with Retry-After and skips the handler."""
+    from app.api.v1.dependencies import rate_limit_deps
+    monkeypatch.setattr(rate_limit_deps, "rate_limiter", RateLimiter())
+
+    calls = []
+    app = FastAPI()
+    setup_exception_handlers(app)
+
+    @app.post("/login", dependencies=[Depends(rate_limit(RateLimitPolicy("login:email", 1, 900, key_by="email")))])
+    async def login(body: dict):
+        calls.append(body)
+        return {}
+
+    client = TestClient(app)
+    assert client.post("/login", json={"email": "A@example.com"}).status_code == 200
+    response = client.post("/login", json={"email": "a@example.com "})
+
+    assert response.status_code == 429
+    assert 899 <= int(response.headers["Retry-After"]) <= 900
+    assert len(calls) == 1
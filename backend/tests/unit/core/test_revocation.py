@@ -0,0 +1,75 @@
+import pytest
+
+from app.core.revocation import RevocationList
+
+
+class InMemorySortedSet:
+    """Minimal stand-in for the Redis sorted-set commands the list uses."""
+
+    def __init__(self):
+        self.members = {}
+
+    async def zadd(self, key, mapping):
+        self.members.update(mapping)
+
+    async def zrangebyscore(self, key, min, max, withscores=False):
+        return sorted(
+            ((member, score) for member, score in self.members.items() if score >= float(min)),
+            key=lambda item: item[1],
+        )
+
+    async def zremrangebyscore(self, key, min, max):
+        for member in [m for m, score in self.members.items() if score <= float(max)]:
+            del self.members[member]
+
+
+@pytest.mark.asyncio
+async def test_revoked_session_and_token_ids():
+    """Test that sid and jti claims are both checked."""
+    revocations = RevocationList(retention_seconds=60)
+    await revocations.revoke(["session-1", "token-1"])
+
+    assert revocations.is_revoked({"sid": "session-1", "jti": "other"}) is True
+    assert revocations.is_revoked({"sid": "other", "jti": "token-1"}) is True
+    assert revocations.is_revoked({"sid": "session-2", "jti": "token-2"}) is False
+    assert revocations.is_revoked({}) is False
+
+
+@pytest.mark.asyncio
+async def test_revocations_propagate_between_workers():
+    """Test that a revocation on one worker reaches another on its next sync."""
+    redis = InMemorySortedSet()
+    worker_a = RevocationList(retention_seconds=60)
+    worker_b = RevocationList(retention_seconds=60)
+    worker_a.bind(redis)
+    worker_b.bind(redis)
+
+    await worker_a.revoke(["session-1"])
+    assert worker_b.is_revoked({"sid": "session-1"}) is False
+
+    await worker_b.sync()
+    assert worker_b.is_revoked({"sid": "session-1"}) is True
+
+
+@pytest.mark.asyncio
+async def test_unpublished_revocations_are_retried():
+    """Test that revocations made while Redis was unbound are published later."""
+    redis = InMemorySortedSet()
+    revocations = RevocationList(retention_seconds=60)
+    await revocations.revoke(["session-1"])
+    assert revocations.stats()["unpublished"] == 1
+
+    revocations.bind(redis)
+    await revocations.sync()
+
+    assert "session-1" in redis.members
+    assert revocations.stats()["unpublished"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_pruned_after_token_lifetime():
+    """Test that entries older than the access token lifetime are dropped."""
+    revocations = RevocationList(retention_seconds=-1)
+    await revocations.revoke(["session-1"])
+    await revocations.sync()
+    assert revocations.is_revoked({"sid": "session-1"}) is False
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.sql_profiler import SQLProfilerMiddleware, fingerprint, instrument_engine, profile_queries
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    return engine
+
+
+def test_fingerprint_ignores_parameters_and_in_list_length():
+    """Test that executions differing only in values share one fingerprint."""
+    assert fingerprint("SELECT * FROM users WHERE id = $1") == fingerprint("SELECT *  FROM users\nWHERE id = $7")
+    assert fingerprint("SELECT 1 WHERE name = 'a''b'") == "SELECT ? WHERE name = ?"
+    assert fingerprint("WHERE id IN ($1, $2, $3)") == fingerprint("WHERE id IN ($1, $2)") == "WHERE id IN (...)"
+
+
+def test_fingerprint_ignores_in_list_length_with_asyncpg_casts():
+    """Test that asyncpg's typed binds, such as $1::UUID, still collapse to one IN-list fingerprint."""
+    assert fingerprint("WHERE id IN ($1::UUID, $2::UUID, $3::UUID)") == "WHERE id IN (...)"
+    assert fingerprint("WHERE at IN ($1::TIMESTAMP WITH TIME ZONE, $2::TIMESTAMP WITH TIME ZONE)") == (
+        "WHERE at IN (...)"
+    )
+    assert fingerprint("WHERE name IN ($1::VARCHAR(255), $2::VARCHAR(255))") == "WHERE name IN (...)"
+    assert fingerprint("WHERE id = $1::UUID") == "WHERE id = ?::UUID"
+
+
+def test_repeated_statements_are_grouped_as_duplicates(engine):
+    """Test that a query issued in a loop is counted under one fingerprint."""
+    with profile_queries() as profile, engine.connect() as conn:
+        conn.execute(text("SELECT * FROM items"))
+        for item_id in range(6):
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+    assert profile.count == 7
+    assert profile.duplicates == {"SELECT name FROM items WHERE id = ?": 6}
+    assert profile.repeated(5) == [("SELECT name FROM items WHERE id = ?", 6)]
+
+
+def test_statements_outside_a_profile_are_ignored(engine):
+    """Test that nothing is recorded without an active profile."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    with profile_queries() as profile:
+        pass
+    assert profile.count == 0
+
+
+def test_assert_max_queries_fixture(engine, assert_max_queries):
+    """Test that the fixture passes within the budget and fails beyond it."""
+    with assert_max_queries(1), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    with pytest.raises(AssertionError, match="at most 1 queries"):
+        with assert_max_queries(1), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+
+def test_middleware_adds_server_timing_and_warns_on_n_plus_one(engine, caplog):
+    """Test the Server-Timing header and the N+1 warning for a looping endpoint."""
+    app = FastAPI()
+    app.add_middleware(SQLProfilerMiddleware, enabled=True, n_plus_one_threshold=3)
+
+    @app.get("/items")
+    def list_items():
+        with engine.connect() as conn:
+            for item_id in range(3):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+        return []
+
+    with caplog.at_level(logging.WARNING, logger="app.core.sql_profiler"):
+        response = TestClient(app).get("/items")
+
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="3 queries, 1 repeated"' in response.headers["server-timing"]
+    assert "Possible N+1 in GET /items: 3x" in caplog.text
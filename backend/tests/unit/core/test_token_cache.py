@@ -0,0 +1,59 @@
+import time
+
+from app.core.token_cache import TokenCache
+
+
+def test_hit_after_put():
+    """Test that a cached payload is returned for the same token."""
+    cache = TokenCache(max_entries=10)
+    payload = {"sub": "user-1", "exp": time.time() + 60}
+
+    assert cache.get("token", "v1") is None
+    cache.put("token", payload, "v1")
+
+    assert cache.get("token", "v1") == payload
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["approx_bytes"] > 0
+
+
+def test_expired_entries_not_served():
+    """Test that entries are evicted at the token's exp."""
+    cache = TokenCache(max_entries=10)
+    cache.get("token", "v1")
+    cache.put("token", {"sub": "user-1", "exp": time.time() - 1}, "v1")
+
+    assert cache.get("token", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_key_rotation_flushes_cache():
+    """Test that a key ring change invalidates every cached payload."""
+    cache = TokenCache(max_entries=10)
+    cache.get("token", "v1")
+    cache.put("token", {"sub": "user-1", "exp": time.time() + 60}, "v1")
+
+    assert cache.get("token", "v2") is None
+    assert cache.get("token", "v2") is None
+    assert cache.stats()["flushes"] == 1
+
+
+def test_bounded_size():
+    """Test that the least recently used entries are evicted."""
+    cache = TokenCache(max_entries=2)
+    cache.get("a", "v1")
+    for token in ("a", "b", "c"):
+        cache.put(token, {"sub": token, "exp": time.time() + 60}, "v1")
+
+    assert cache.get("a", "v1") is None
+    assert cache.get("c", "v1") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_returned_payload_is_a_copy():
+    """Test that callers cannot mutate the cached payload."""
+    cache = TokenCache(max_entries=2)
+    cache.get("token", "v1")
+    cache.put("token", {"sub": "user-1", "exp": time.time() + 60}, "v1")
+
+    cache.get("token", "v1")["sub"] = "someone-else"
+    assert cache.get("token", "v1")["sub"] == "user-1"
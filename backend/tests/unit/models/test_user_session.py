@@ -0,0 +1,45 @@
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.user_session import UserSession
+
+# --- Test Selector/Verifier Refresh Tokens ---
+
+def test_create_session_issues_selector_verifier_token():
+    """Test that new refresh tokens are addressed by the session ID."""
+    session, refresh_token = UserSession.create_session(user_id="user-1", device_info={})
+
+    selector, verifier = UserSession.split_refresh_token(refresh_token)
+    assert selector == session.session_id
+    assert session.verify_refresh_verifier(verifier) is True
+    assert session.verify_refresh_verifier(verifier + "x") is False
+
+def test_split_legacy_token():
+    """Test that legacy opaque tokens are recognised as such."""
+    assert UserSession.split_refresh_token("opaque_legacy-token") is None
+    assert UserSession.split_refresh_token(".verifier") is None
+    assert UserSession.split_refresh_token("selector.") is None
+
+def test_legacy_session_has_no_verifier():
+    """Test that a session without a verifier hash rejects any verifier."""
+    session = UserSession(refresh_token_hash=UserSession.hash_refresh_token("legacy"))
+    assert session.verify_refresh_verifier("legacy") is False
+
+# --- Test Partition-Bounded Session ID Lookups ---
+
+def test_session_id_carries_its_creation_month():
+    """Test that the session ID names the UTC month of the created_at it was issued with."""
+    session, _ = UserSession.create_session(user_id="user-1", device_info={})
+    month = UserSession.session_id_month(session.session_id)
+    assert month == date(session.created_at.year, session.created_at.month, 1)
+
+def test_session_id_match_is_bounded_to_one_partition():
+    """Test that month-prefixed IDs bound created_at while older IDs match on session_id alone."""
+    bounded = str(UserSession.session_id_matches("202612~abc").compile(dialect=postgresql.dialect()))
+    assert "user_sessions.created_at >= " in bounded
+    assert "user_sessions.created_at < " in bounded
+
+    for legacy in ("abc", "2026ab~abc", "202613~abc"):
+        assert UserSession.session_id_month(legacy) is None
+        assert "created_at" not in str(UserSession.session_id_matches(legacy).compile(dialect=postgresql.dialect()))
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services.export_service import ExportService
+from tests.fakes import FakeSession
+
+ORGANIZATION_ID = uuid.UUID(int=1)
+
+
+def _streaming_session(keys, rows):
+    """A session whose stream() hands back the rows in yield_per batches."""
+    return FakeSession([rows], keys=keys)
+
+
+def _audit_rows(count):
+    return [
+        (uuid.UUID(int=i), datetime(2026, 10, 1, i, tzinfo=timezone.utc), "user.login", {"ok": True})
+        for i in range(count)
+    ]
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_yields_one_chunk_per_fetch():
+    """Test that each fetched batch becomes one chunk of JSON lines."""
+    db = _streaming_session(["id", "created_at", "action", "context_data"], _audit_rows(5))
+
+    chunks = await _collect(ExportService(db, fetch_size=2).stream("audit_logs", ORGANIZATION_ID))
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert json.loads(lines[0]) == {
+        "id": str(uuid.UUID(int=0)), "created_at": "2026-10-01T00:00:00+00:00",
+        "action": "user.login", "context_data": {"ok": True},
+    }
+    assert len(lines) == 5
+    assert db.streams[0].closed
+
+
+@pytest.mark.asyncio
+async def test_gzipped_csv_export_decompresses_to_header_and_rows():
+    """Test that the on-the-fly gzip stream is a complete gzip file."""
+    db = _streaming_session(["id", "created_at", "action", "context_data"], _audit_rows(3))
+
+    chunks = await _collect(
+        ExportService(db, fetch_size=2).stream("audit_logs", ORGANIZATION_ID, fmt="csv", compress=True)
+    )
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(b"".join(chunks)).decode())))
+    assert rows[0] == ["id", "created_at", "action", "context_data"]
+    assert rows[1][3] == '{"ok": true}'
+    assert len(rows) == 4
+
+
+@pytest.mark.asyncio
+async def test_export_query_is_bounded_ordered_and_leaves_out_token_hashes():
+    """Test that created_at bounds and ordering reach the SQL and secrets do not."""
+    db = _streaming_session(["id"], [])
+    since = datetime(2026, 9, 1, tzinfo=timezone.utc)
+
+    await _collect(ExportService(db).stream("user_sessions", ORGANIZATION_ID, since=since))
+
+    sql = db.statements[0]
+    assert "user_sessions.created_at >= " in sql
+    assert "ORDER BY user_sessions.created_at, user_sessions.id" in sql
+    assert "token_hash" not in sql
+
+
+def test_unknown_dataset_or_format_is_rejected_before_streaming():
+    """Test that bad requests fail when stream() is called, not on first iteration."""
+    service = ExportService(FakeSession())
+
+    with pytest.raises(ValidationError):
+        service.stream("users", ORGANIZATION_ID)
+    with pytest.raises(ValidationError):
+        service.stream("audit_logs", ORGANIZATION_ID, fmt="xml")
@@ -0,0 +1,154 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.partitioning import initial_partition_ddl
+from app.services.partition_service import (
+    PARTITIONED_TABLES,
+    PartitionKeeper,
+    PartitionService,
+    PartitionedTable,
+    add_months,
+    partition_name,
+)
+from tests.fakes import FakeSession
+
+
+class FakeCatalog(FakeSession):
+    """FakeSession that keeps partitions in a set, applies DDL to it and answers catalog queries."""
+
+    def __init__(self, partitions, live=()):
+        super().__init__(self._answer)
+        self.partitions = set(partitions)
+        self.live = set(live)
+
+    @property
+    def ddl(self):
+        return [sql for sql in self.statements if sql.startswith(("CREATE", "ALTER", "DROP"))]
+
+    def _answer(self, statement, params):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return sorted(self.partitions)
+        if sql.startswith("SELECT 1 FROM"):
+            return [1] if sql.split()[3] in self.live else []
+        if sql.startswith("CREATE TABLE"):
+            self.partitions.add(sql.split()[5])
+        elif sql.startswith("DROP TABLE"):
+            self.partitions.discard(sql.split()[2])
+        return []
+
+
+SPEC = PartitionedTable(name="user_sessions", retention_months=2, premake_months=2, retain_if="true")
+
+
+def test_month_arithmetic():
+    """Test month offsets across year boundaries."""
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name("user_sessions", date(2026, 3, 1)) == "user_sessions_p202603"
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_missing_months_only():
+    """Test that premade partitions are created once, with UTC month bounds."""
+    db = FakeCatalog({"user_sessions_p202610", "user_sessions_default"})
+
+    created = await PartitionService(db).ensure_partitions(SPEC, today=date(2026, 10, 18))
+
+    assert created == ["user_sessions_p202611", "user_sessions_p202612"]
+    assert "FROM ('2026-11-01T00:00:00+00:00') TO ('2026-12-01T00:00:00+00:00')" in db.ddl[0]
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_adds_missing_default_partition():
+    """Test that a table without a DEFAULT partition gets one, so inserts never lack a target."""
+    db = FakeCatalog({"user_sessions_p202610", "user_sessions_p202611", "user_sessions_p202612"})
+
+    created = await PartitionService(db).ensure_partitions(SPEC, today=date(2026, 10, 18))
+
+    assert created == ["user_sessions_default"]
+    assert db.ddl == ["CREATE TABLE IF NOT EXISTS user_sessions_default PARTITION OF user_sessions DEFAULT"]
+
+
+def test_initial_partitions_for_create_all():
+    """Test that tables built by create_all get the current month and a DEFAULT partition."""
+    current, default = initial_partition_ddl("user_sessions", "fillfactor = 80", today=date(2026, 12, 31))
+
+    assert current.startswith("CREATE TABLE IF NOT EXISTS user_sessions_p202612 PARTITION OF user_sessions")
+    assert "TO ('2027-01-01T00:00:00+00:00') WITH (fillfactor = 80)" in current
+    assert default.endswith("PARTITION OF user_sessions DEFAULT WITH (fillfactor = 80)")
+
+
+@pytest.mark.asyncio
+async def test_partition_keeper_logs_failures_and_continues():
+    """Test that one table failing does not stop the keeper from ensuring the others."""
+    catalog = FakeCatalog(set())
+    sessions = iter([None, catalog])
+
+    class _Factory:
+        async def __aenter__(self):
+            db = next(sessions)
+            if db is None:
+                raise ConnectionError("database unavailable")
+            return db
+
+        async def __aexit__(self, *exc):
+            return False
+
+    keeper = PartitionKeeper([SPEC, PartitionedTable(name="audit_logs", retention_months=2, premake_months=0)])
+    keeper.bind(_Factory)
+
+    created = await keeper.run_once()
+
+    assert created == [partition_name("audit_logs", datetime.now(timezone.utc).date().replace(day=1)), "audit_logs_default"]
+    assert keeper.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retire_partitions_drops_expired_and_keeps_live():
+    """Test that only whole months past retention are dropped, unless they hold live rows."""
+    db = FakeCatalog(
+        {"user_sessions_p202606", "user_sessions_p202607", "user_sessions_p202608", "user_sessions_p202609"},
+        live={"user_sessions_p202606"},
+    )
+
+    removed, kept = await PartitionService(db).retire_partitions(SPEC, today=date(2026, 10, 18))
+
+    assert removed == ["user_sessions_p202607"]
+    assert kept == ["user_sessions_p202606"]
+    assert db.partitions == {"user_sessions_p202606", "user_sessions_p202608", "user_sessions_p202609"}
+
+
+@pytest.mark.asyncio
+async def test_retire_partitions_dry_run_changes_nothing():
+    """Test that a dry run reports partitions without dropping them."""
+    db = FakeCatalog({"user_sessions_p202601"})
+
+    removed, _ = await PartitionService(db).retire_partitions(SPEC, today=date(2026, 10, 18), dry_run=True)
+
+    assert removed == ["user_sessions_p202601"]
+    assert db.partitions == {"user_sessions_p202601"}
+
+
+def test_audit_logs_is_registered_for_maintenance():
+    """Test that audit_logs gets premade partitions and is retired by month without a retain_if."""
+    spec = next(spec for spec in PARTITIONED_TABLES if spec.name == "audit_logs")
+
+    assert spec.retention_months == settings.AUDIT_RETENTION_MONTHS
+    assert spec.premake_months == settings.PARTITION_PREMAKE_MONTHS
+    assert spec.retain_if is None
+
+
+@pytest.mark.asyncio
+async def test_audit_logs_partitions_are_created_and_retired():
+    """Test that the audit_logs spec drives the same create/retire cycle as user_sessions."""
+    spec = next(spec for spec in PARTITIONED_TABLES if spec.name == "audit_logs")
+    db = FakeCatalog({partition_name("audit_logs", add_months(date(2026, 10, 1), -spec.retention_months - 1))})
+
+    result = await PartitionService(db).maintain(spec, today=date(2026, 10, 18))
+
+    assert result.created[0] == "audit_logs_p202610"
+    assert result.created[-1] == "audit_logs_default"
+    assert result.removed == [partition_name("audit_logs", add_months(date(2026, 10, 1), -spec.retention_months - 1))]
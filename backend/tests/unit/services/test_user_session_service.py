@@ -0,0 +1,152 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.revocation import RevocationList
+from app.models.user_session import SessionStatus, UserSession
+from app.services import user_session_service
+from app.services.user_session_service import MIN_SWEEP_RANGES, SessionSweepResult, UserSessionService
+from tests.fakes import FakeSession
+
+
+def _create_session_db(evicted_ids):
+    """The advisory lock returns nothing; the evict-and-insert returns the new row and evicted IDs."""
+    return FakeSession([[], [(UserSession(session_id="new-session"), evicted_ids)]])
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    revocations = RevocationList(retention_seconds=60)
+    monkeypatch.setattr(user_session_service, "revocation_list", revocations)
+    return revocations
+
+
+@pytest.mark.asyncio
+async def test_create_session_locks_then_evicts_and_inserts_in_one_statement(revocations):
+    """Test that session creation is a lock plus a single evict-and-insert statement."""
+    db = _create_session_db(evicted_ids=["old-session"])
+
+    session, refresh_token = await UserSessionService(db).create_session(
+        user_id="00000000-0000-0000-0000-000000000001", device_info={}
+    )
+
+    lock, create = db.statements
+    assert "pg_advisory_xact_lock" in lock
+    assert create.startswith("WITH evicted AS")
+    assert "INSERT INTO user_sessions" in create
+    assert "OFFSET" in create
+    assert db.commits == 1
+    assert session.session_id == "new-session"
+    assert UserSession.split_refresh_token(refresh_token) is not None
+    assert revocations.is_revoked({"sid": "old-session"})
+
+
+@pytest.mark.asyncio
+async def test_create_session_without_eviction(revocations):
+    """Test that nothing is revoked while the user is under the session limit."""
+    db = _create_session_db(evicted_ids=None)
+
+    await UserSessionService(db).create_session(
+        user_id="00000000-0000-0000-0000-000000000001", device_info={}
+    )
+
+    assert revocations.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_terminate_all_sessions_is_one_update_that_revokes_returned_ids(revocations):
+    """Test that "log out everywhere" is a single UPDATE ... RETURNING plus revocation of the IDs."""
+    db = FakeSession([["session-1", "session-2"]])
+
+    count = await UserSessionService(db).terminate_all_sessions(
+        user_id="00000000-0000-0000-0000-000000000001", except_session_id="current"
+    )
+
+    (update,) = db.statements
+    assert update.startswith("UPDATE user_sessions SET")
+    assert "user_sessions.session_id != " in update
+    assert update.endswith("RETURNING user_sessions.session_id")
+    assert count == 2
+    assert db.commits == 1
+    assert revocations.is_revoked({"sid": "session-1"})
+    assert not revocations.is_revoked({"sid": "current"})
+
+
+def _session_ids(*ints):
+    return [uuid.UUID(int=i) for i in ints]
+
+
+FIRST_RANGE_END = uuid.UUID(int=2 ** 128 // MIN_SWEEP_RANGES)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_sweeps_id_ranges_that_cover_the_key_space():
+    """Test that each batch updates one id range, empty ranges included, up to the end of the key space."""
+    db = FakeSession([[(0,)], _session_ids(1, 2), [], _session_ids(3)])
+
+    sweep = await UserSessionService(db).cleanup_expired_sessions(batch_size=2)
+
+    estimate, first, *_, last = db.statements
+    assert "pg_inherits" in estimate
+    for batch in (first, last):
+        assert batch.startswith("WITH expired_batch AS")
+        assert "FOR UPDATE SKIP LOCKED" in batch
+        assert "RETURNING expired_batch.id" in batch
+        assert "ORDER BY" not in batch and "LIMIT" not in batch
+    assert "user_sessions.id >= " in first and "user_sessions.id < " in first
+    assert "user_sessions.id >= " in last and "user_sessions.id < " not in last
+    assert (sweep.count, sweep.batches, sweep.last_key) == (3, MIN_SWEEP_RANGES, None)
+    assert db.commits == MIN_SWEEP_RANGES
+
+
+@pytest.mark.asyncio
+async def test_cleanup_sizes_ranges_from_the_row_estimate():
+    """Test that ~64 sessions at batch_size=2 are swept in 32 ranges."""
+    db = FakeSession([[(64,)]])
+
+    sweep = await UserSessionService(db).cleanup_expired_sessions(batch_size=2)
+
+    assert sweep.batches == 32
+
+
+@pytest.mark.asyncio
+async def test_cleanup_stops_at_max_batches_and_resumes_from_last_key():
+    """Test that max_batches bounds a run and last_key continues it in the next one."""
+    db = FakeSession([[(0,)], _session_ids(1, 2), [(0,)], _session_ids(3)])
+    service = UserSessionService(db)
+
+    sweep = await service.cleanup_expired_sessions(batch_size=2, max_batches=1)
+
+    assert (sweep.count, sweep.batches, sweep.last_key) == (2, 1, FIRST_RANGE_END)
+    assert len(db.statements) == 2
+
+    resumed = await service.cleanup_expired_sessions(batch_size=2, resume_from=sweep.last_key)
+
+    assert (resumed.count, resumed.batches, resumed.last_key) == (1, MIN_SWEEP_RANGES - 1, None)
+
+
+def test_sweep_throughput():
+    """Test that rows_per_second divides by the elapsed time and tolerates zero."""
+    assert SessionSweepResult(count=10, elapsed_seconds=2.0).rows_per_second == 5.0
+    assert SessionSweepResult(count=10).rows_per_second == 0.0
+
+
+@pytest.mark.asyncio
+async def test_create_session_insert_carries_python_defaults(revocations):
+    """Test that id, status and counters are bound explicitly, since the CTE insert skips Python defaults."""
+    inserted = {}
+
+    def answer(statement, params):
+        if statement.is_insert:
+            inserted.update(statement.compile(dialect=postgresql.dialect()).params)
+            return [(UserSession(session_id="new-session"), None)]
+        return []
+
+    await UserSessionService(FakeSession(answer)).create_session(
+        user_id="00000000-0000-0000-0000-000000000001", device_info={}
+    )
+
+    assert isinstance(inserted["id"], uuid.UUID)
+    assert inserted["status"] == SessionStatus.ACTIVE
+    assert (inserted["refresh_count"], inserted["max_refresh_count"]) == (0, 1000)